@@ -0,0 +1,173 @@
+"""
+Account State & Order Sizing
+============================
+Collateral / margin kept current off the trading loop:
+
+- fills: fee + realized PnL from the fill ledger adjust the balance as
+  they happen (estimate)
+- reconcile: a background task re-reads get_collateral every
+  ACCOUNT_RECONCILE_SEC, and right away when asked (after a close); the
+  REST snapshot always wins, the difference to the running estimate is
+  kept as reconcile drift
+
+The exchange wrapper has no account push stream, so reconciliation is
+poll-only: funding, deposits and anything else the fills don't explain
+show up at the next reconcile.
+
+The loop only reads attributes. `version` changes whenever a value does.
+
+OrderSizer caches the order size together with the mark price band in
+which it cannot change (same lot count), so the size is recomputed only
+when collateral / leverage / max size change or mark leaves the band.
+"""
+
+import asyncio
+import math
+import time
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from pricing import calc_order_size
+
+_BAND_EPS = 1e-9  # Relative margin kept inside band edges (float error in size / size_unit)
+
+
+class AccountState:
+    """Collateral / margin snapshot + background reconciliation"""
+
+    def __init__(self, exchange, reconcile_interval: float = 30.0,
+                 log_fn: Optional[Callable[[str], None]] = None):
+        self.exchange = exchange
+        self.reconcile_interval = reconcile_interval
+        self.log_fn = log_fn or (lambda _msg: None)
+
+        self.available_collateral = 0.0
+        self.total_collateral = 0.0
+        self.version = 0
+        self.updated_at = 0.0
+        self.source = "-"
+        self.fill_updates = 0
+        self.reconciles = 0
+        self.errors = 0
+        self.last_drift = 0.0           # REST total - running estimate at last reconcile
+
+        self._refresh = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------- updates ----------
+
+    def apply_snapshot(self, collateral: Optional[Dict[str, Any]], source: str = "rest") -> bool:
+        """Take a get_collateral() result, True if anything changed"""
+        if not collateral:
+            return False
+        available = float(collateral.get("available_collateral", 0) or 0)
+        total = float(collateral.get("total_collateral", 0) or 0)
+        if self.updated_at > 0:
+            self.last_drift = total - self.total_collateral
+        self.updated_at = time.time()
+        self.source = source
+        if available == self.available_collateral and total == self.total_collateral:
+            return False
+        self.available_collateral, self.total_collateral = available, total
+        self.version += 1
+        return True
+
+    def on_fill(self, realized_pnl: float, fee: float) -> None:
+        """Fill ledger listener: balance moves by realized PnL minus fee"""
+        delta = realized_pnl - fee
+        if delta == 0:
+            return
+        self.total_collateral += delta
+        self.available_collateral += delta
+        self.version += 1
+        self.fill_updates += 1
+        self.source = "fills"
+
+    def request_refresh(self) -> None:
+        """Reconcile now (background, never blocks the caller)"""
+        self._refresh.set()
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        """Start the reconcile task (call from inside the loop)"""
+        self._task = asyncio.create_task(self._run(), name="account-reconcile")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        interval = self.reconcile_interval if self.reconcile_interval > 0 else None
+        while True:
+            try:
+                await asyncio.wait_for(self._refresh.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh.clear()
+            try:
+                self.apply_snapshot(await self.exchange.get_collateral(), source="rest")
+                self.reconciles += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                self.log_fn(f"ACCOUNT RECONCILE FAILED | {e}")
+
+    def summary_line(self) -> str:
+        age = time.time() - self.updated_at if self.updated_at > 0 else float("nan")
+        margin_used = self.total_collateral - self.available_collateral
+        return (
+            f"Account: ${self.total_collateral:,.2f} total  ${self.available_collateral:,.2f} avail  "
+            f"margin ${margin_used:,.2f}  ({self.source}, synced {age:.0f}s ago, drift ${self.last_drift:+.2f})"
+        )
+
+
+class OrderSizer:
+    """calc_order_size + lot quantization, cached per mark price band"""
+
+    def __init__(self, size_unit: float, quantize: Optional[Callable[[float], float]] = None):
+        self.size_unit = size_unit
+        self.quantize = quantize or (lambda size: size)
+        self.recomputes = 0
+        self.hits = 0
+        self._key: Optional[Tuple[float, float, Optional[float]]] = None
+        self._band = (0.0, 0.0)
+        self._size = 0.0
+
+    def size(self, collateral: float, mark_price: float, leverage: float, max_size: Optional[float]) -> float:
+        key = (collateral, leverage, max_size)
+        lo, hi = self._band
+        if key == self._key and lo < mark_price < hi:
+            self.hits += 1
+            return self._size
+        self.recomputes += 1
+        self._size = self.quantize(calc_order_size(collateral, mark_price, leverage=leverage,
+                                                   size_unit=self.size_unit, max_size=max_size))
+        self._key = key
+        self._band = self._mark_band(collateral * leverage / 2, mark_price, max_size)
+        return self._size
+
+    def _mark_band(self, budget: float, mark_price: float, max_size: Optional[float]) -> Tuple[float, float]:
+        """Open mark interval around mark_price with the same calc_order_size result"""
+        if budget <= 0 or mark_price <= 0:
+            return (0.0, 0.0)
+        cap = budget / max_size if max_size is not None and max_size > 0 else 0.0  # mark <= cap -> capped
+        if mark_price < cap:
+            return (0.0, cap * (1 - _BAND_EPS))
+        # round(budget / mark / unit) stays n while budget / mark / unit is in (n - 0.5, n + 0.5)
+        n = round(budget / mark_price / self.size_unit)
+        lo = budget / ((n + 0.5) * self.size_unit)
+        hi = budget / ((n - 0.5) * self.size_unit) if n > 0 else math.inf
+        return (max(lo, cap) * (1 + _BAND_EPS), hi * (1 - _BAND_EPS))
+
+    @property
+    def last_size(self) -> float:
+        """Size from the latest size() call (shadow strategies between decisions)"""
+        return self._size
+
+    def summary_line(self) -> str:
+        return f"Sizing: {self.recomputes} recomputes / {self.hits} cached"
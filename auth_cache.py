@@ -0,0 +1,170 @@
+"""
+Session Token Cache
+===================
+Reuse the exchange session across restarts (hourly RESTART_INTERVAL,
+channel restarts) instead of logging in again every time.
+
+The token is read from whichever attribute the exchange wrapper exposes
+(see TOKEN_ATTRS) and handed back on the next start through the key
+namespace (`key.session_token`). File is written atomically with 0600
+permissions and bound to the wallet address; expired entries are ignored.
+
+TOKEN_ATTRS and `key.session_token` are not a documented mpdex interface,
+so both ends are checked at startup (session_warning): no token attribute
+on the wrapper, or a cached token the wrapper did not adopt, is logged and
+the cache is not used for that run.
+
+The entry expires at the token's own expiry (JWT `exp`) when it is known,
+capped by the TTL, and re-saving the token that was loaded from the cache
+keeps its original expiry. The cache is dropped when the exchange
+rejects the session (clear_cached_auth), so the next start logs in again.
+"""
+
+import base64
+import json
+import os
+import re
+import time
+from typing import Optional, Any
+
+# Attributes checked on the exchange (and its auth/client helpers) for a session token
+TOKEN_ATTRS = ("session_token", "jwt", "access_token", "token")
+_HOLDER_ATTRS = ("", "auth", "client", "session")
+
+EXPIRY_MARGIN_SEC = 60  # Stop reusing a token this long before its own expiry
+
+# HTTP status of a rejected / expired session, read from the error (or its response)
+AUTH_STATUS = 401
+_STATUS_ATTRS = ("status", "status_code", "code")
+
+# Error text of a rejected / expired session: 401 as a standalone number, or a whole phrase
+AUTH_ERROR_PATTERN = re.compile(
+    r"(?<![\d.])401(?!\.?\d)"
+    r"|\b(?:unauthori[sz]ed|unauthenticated|invalid token|token expired|jwt expired)\b"
+)
+
+
+def find_session_token(exchange) -> Optional[str]:
+    """Session token exposed by the exchange wrapper, None if not found"""
+    for holder_name in _HOLDER_ATTRS:
+        holder = getattr(exchange, holder_name, None) if holder_name else exchange
+        if holder is None:
+            continue
+        for attr in TOKEN_ATTRS:
+            value = getattr(holder, attr, None)
+            if isinstance(value, str) and value:
+                return value
+    return None
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """`exp` claim of a JWT (unix time, signature not checked), None if not a JWT / no exp"""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+        return float(payload["exp"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    for holder in (error, getattr(error, "response", None)):
+        if holder is None:
+            continue
+        for attr in _STATUS_ATTRS:
+            value = getattr(holder, attr, None)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+    return None
+
+
+def is_auth_error(error: BaseException) -> bool:
+    """Exchange error caused by a rejected / expired session"""
+    if _status_code(error) == AUTH_STATUS:
+        return True
+    return AUTH_ERROR_PATTERN.search(str(error).lower()) is not None
+
+
+def session_warning(exchange, cached_token: Optional[str]) -> Optional[str]:
+    """
+    Why the cache cannot work with this exchange wrapper, None if it can:
+    no token attribute found, or the cached token was not adopted.
+    """
+    token = find_session_token(exchange)
+    if token is None:
+        checked = ", ".join(f"{h}.{a}" if h else a for h in _HOLDER_ATTRS for a in TOKEN_ATTRS)
+        return f"no session token on the exchange wrapper (checked {checked})"
+    if cached_token and token != cached_token:
+        return "cached token not consumed (key.session_token ignored, the wrapper logged in again)"
+    return None
+
+
+def _read(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_cached_auth(key: Any, path: str, ttl: float) -> bool:
+    """
+    Put a cached, unexpired token for key.wallet_address into key.session_token.
+    Returns True if a token was loaded.
+    """
+    if ttl <= 0 or not os.path.exists(path):
+        return False
+    data = _read(path)
+    wallet = (getattr(key, "wallet_address", None) or "").lower()
+    if data.get("wallet", "").lower() != wallet or not data.get("token"):
+        return False
+    expires_at = float(data.get("expires_at", 0))
+    exp = token_expiry(data["token"])
+    if exp is not None:
+        expires_at = min(expires_at, exp - EXPIRY_MARGIN_SEC)
+    if time.time() >= expires_at:
+        return False
+    key.session_token = data["token"]
+    return True
+
+
+def save_cached_auth(exchange, wallet_address: Optional[str], path: str, ttl: float) -> bool:
+    """Persist the exchange's current session token (0600, atomic). Returns True if saved."""
+    if ttl <= 0 or not wallet_address:
+        return False
+    token = find_session_token(exchange)
+    if not token:
+        return False
+    now = time.time()
+    cached = _read(path) if os.path.exists(path) else {}
+    if cached.get("token") == token and cached.get("wallet", "").lower() == wallet_address.lower():
+        return False  # Reused from the cache: keep its original expiry
+    expires_at = now + ttl
+    exp = token_expiry(token)
+    if exp is not None:
+        expires_at = min(expires_at, exp - EXPIRY_MARGIN_SEC)
+    if expires_at <= now:
+        return False
+    data = {
+        "wallet": wallet_address.lower(),
+        "token": token,
+        "saved_at": now,
+        "expires_at": expires_at,
+    }
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+    return True
+
+
+def clear_cached_auth(path: str) -> None:
+    """Drop cached token (e.g. after it was rejected)"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
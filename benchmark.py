@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+===============
+Times the bot's hot functions and a full main() loop iteration against the
+in-process fake exchange (fake_exchange.py), and saves the results as JSON
+so runs on different commits can be compared.
+
+- micro benchmarks: timeit (autorange, best/median of N repeats), ns per call;
+  runtime.* decodes / encodes one message with every installed JSON codec
+  and moves 100 messages over a local socket with every installed event
+  loop (runtime_profile.py)
+- loop: the real main() in TEST mode, headless, REFRESH_INTERVAL=0;
+  per-iteration time is taken from IterationBudget (same span as the
+  loop.iteration_ms metric: one decision + its order calls, sleeps excluded);
+  ingest / signal / reporting run as their own tasks (pipeline.py) and are
+  reported per stage (p50 / p99 ms)
+
+Settings come from config.example.py by default so every commit is measured
+with the same parameters; MODE is forced to TEST and restarts are disabled.
+
+Usage:
+    python benchmark.py                          # all -> bench_results/<commit>.json
+    python benchmark.py --quick                  # fewer repeats / loop iterations
+    python benchmark.py --only pricing,loop      # name prefix filter
+    python benchmark.py --compare bench_results/abc1234.json
+    python benchmark.py --config config.py       # use your own settings
+    python benchmark.py --runtime fast           # loop benchmark on uvloop + orjson / ujson
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+import runtime_profile
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(REPO_DIR, "bench_results")
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+# ==================== Environment ====================
+
+def load_config(path: str):
+    """Load a config file as the `config` module (TEST mode, no restarts)"""
+    spec = importlib.util.spec_from_file_location("config", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.MODE = "TEST"
+    module.RESTART_INTERVAL = 0
+    module.CANCEL_AFTER_DELAY = 0  # Post-cancel sleep is not part of an iteration
+    sys.modules["config"] = module
+    return module
+
+
+def git_revision() -> str:
+    """Short commit hash (+ "-dirty" with uncommitted changes), "unknown" outside git"""
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f"{rev}-dirty" if dirty else rev
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ==================== Micro Benchmarks ====================
+
+def time_call(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """ns per call of fn (best and median of `repeat` timeit runs)"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [t / number * 1e9 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "unit": "ns/call",
+        "min": round(min(runs), 1),
+        "median": round(statistics.median(runs), 1),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def micro_benchmarks(main_module, config) -> Dict[str, Callable[[], Any]]:
+    """name -> zero-argument callable"""
+    from pricing import calc_order_prices, check_maker_taker, calc_drift_bps, calc_order_size
+    from instrument import Instrument
+    from account_state import OrderSizer
+    from dashboard import order_view, build_dashboard_from_state
+    from runtime_config import RuntimeConfig
+    from signals import SignalEngine, AdaptiveQuoting
+    from pipeline import LatestValue, build_tick
+
+    mark = 100000.0
+    rc = RuntimeConfig.from_module(config)
+
+    sim_mgr = main_module.SimOrderManager()
+    for side, price in (("buy", mark * 0.99935), ("sell", mark * 1.00065)):
+        order_id = f"SIM-{side.upper()}"
+        sim_mgr.orders[order_id] = main_module.SimOrder(
+            id=order_id, side=side, price=price, size=0.01, reference_price=mark, message="success")
+    # Steady state: history already at MAX_HISTORY, every append trims
+    sim_mgr.history = [{"action": "PLACE", "order_id": str(i)} for i in range(config.MAX_HISTORY)]
+    record = {"action": "PLACE", "order_id": "SIM-X", "side": "buy", "price": mark, "time": datetime.now()}
+
+    live_mgr = main_module.LiveOrderManager(exchange=None, symbol="BTC-USD")
+    for side, price in (("buy", mark * 0.99935), ("sell", mark * 1.00065)):
+        live_mgr._cached_orders[side] = {"client_order_id": f"MM-{side.upper()}", "side": side,
+                                         "price": str(price), "size": "0.01"}
+        live_mgr.reference_prices[side] = mark
+
+    instrument = Instrument("BTC-USD", tick_size=0.1, lot_size=0.0001, min_notional=1.0)
+
+    sizer = OrderSizer(config.SIZE_UNIT, instrument.quantize_size)
+    sizer_marks = [mark * (1 + 0.00001 * (i % 7 - 3)) for i in range(64)]
+    sizer_i = [0]
+
+    def sizer_size():
+        sizer_i[0] = (sizer_i[0] + 1) & 63
+        return sizer.size(1000.0, sizer_marks[sizer_i[0]], 6.0, None)
+
+    signals = SignalEngine(halflife_sec=30)
+    adaptive = AdaptiveQuoting(horizon_sec=10, vol_ref_bps=3, spread_vol_mult=1, drift_vol_mult=0.5,
+                               spread_range=(3, 20), drift_range=(2, 10), hysteresis_bps=0.5)
+    bids = [[mark - 0.1 * (i + 1), 0.5 + 0.1 * i] for i in range(5)]
+    asks = [[mark + 0.1 * (i + 1), 0.4 + 0.1 * i] for i in range(5)]
+    clock = [time.time()]
+
+    def signals_tick():
+        clock[0] += 0.05
+        signals.on_tick(clock[0], mark, bids, asks)
+
+    orderbook = {"bids": bids, "asks": asks}
+    channel = LatestValue("market")
+
+    benches = {
+        "pricing.calc_order_prices": lambda: calc_order_prices(mark, 6.5),
+        "pricing.check_maker_taker": lambda: check_maker_taker(99935.0, 100065.0, 99999.9, 100000.1),
+        "pricing.calc_drift_bps": lambda: calc_drift_bps(mark, 99990.0),
+        "pricing.calc_order_size": lambda: calc_order_size(1000.0, mark),
+        "instrument.quantize_quotes": lambda: instrument.quantize_quotes(99934.987654, 100065.012345),
+        "instrument.quantize_size": lambda: instrument.quantize_size(0.0059999, 99934.9),
+        "account.order_size": sizer_size,
+        "orders.sim.append_history": lambda: sim_mgr._append_history(record),
+        "orders.sim.get_buy_sell": lambda: (sim_mgr.get_buy_order(), sim_mgr.get_sell_order()),
+        "orders.live.get_buy_sell": lambda: (live_mgr.get_buy_order(), live_mgr.get_sell_order()),
+        "signals.on_tick": signals_tick,
+        "signals.adaptive_update": lambda: adaptive.update(signals, 6.5, 3.5),
+        "pipeline.build_tick": lambda: build_tick(clock[0], mark, orderbook),
+        "pipeline.latest_publish": lambda: channel.publish(mark),
+    }
+    benches.update(runtime_benchmarks())
+
+    try:
+        from rich.console import Console
+    except ImportError:
+        return benches  # Dashboard benchmarks need rich
+
+    state = {
+        "symbol": "BTC-USD", "mark_price": mark, "best_bid": 99999.9, "best_ask": 100000.1,
+        "best_bid_size": 0.5, "best_ask_size": 0.4, "buy_is_maker": True, "sell_is_maker": True,
+        "drift_bps": 1.2, "status": "MONITORING", "countdown": 0.0, "spread_bps": 0.02,
+        "orders": order_view(sim_mgr), "available_collateral": 1000.0, "total_collateral": 1000.0,
+        "order_size": 0.15, "position": None, "pos_stats": dict(main_module.position_stats),
+        "last_action": "Placed BUY @ 99,935.00, SELL @ 100,065.00", "mode": "TEST",
+        "health_lines": ["Loop lag: p99 1ms", "Iteration: p99 1ms", "Feed: ok", "Channels: ok"],
+        "rc": rc,
+    }
+    render_console = Console(file=open(os.devnull, "w"), width=120, force_terminal=True)
+    panel = build_dashboard_from_state(state)
+    benches["dashboard.build"] = lambda: build_dashboard_from_state(state)
+    benches["dashboard.render"] = lambda: render_console.print(panel)
+    return benches
+
+
+def runtime_benchmarks() -> Dict[str, Callable[[], Any]]:
+    """Per-message JSON cost and per-turn loop cost for each installed codec / event loop"""
+    depth = 20
+    bids = ",".join(f'["{99999.9 - i * 0.1:.2f}","{0.5 + 0.01 * i:.4f}"]' for i in range(depth))
+    asks = ",".join(f'["{100000.1 + i * 0.1:.2f}","{0.4 + 0.01 * i:.4f}"]' for i in range(depth))
+    depth_msg = (f'{{"channel":"depth_book","data":{{"symbol":"BTC-USD","bids":[{bids}],'
+                 f'"asks":[{asks}],"time":1735689600000}}}}')
+    price_msg = '{"channel":"price","data":{"symbol":"BTC-USD","mark_price":"100000.00","time":1735689600000}}'
+    record = {"t": 12.345678, "m": "create_order", "a": ["BTC-USD", "buy", 0.15, 99935.0],
+              "k": {"order_type": "limit"}, "d": 0.004512, "r": {"code": 0, "message": "success", "request_id": "x" * 36}}
+
+    benches: Dict[str, Callable[[], Any]] = {}
+    for name, (loads, dumps) in runtime_profile.CODECS.items():
+        benches[f"runtime.{name}.decode_depth"] = lambda loads=loads: loads(depth_msg)
+        benches[f"runtime.{name}.decode_price"] = lambda loads=loads: loads(price_msg)
+        benches[f"runtime.{name}.encode_record"] = lambda dumps=dumps: dumps(record)
+
+    loops = {"asyncio": asyncio.SelectorEventLoop()}
+    if runtime_profile.uvloop is not None:
+        loops["uvloop"] = runtime_profile.uvloop.new_event_loop()
+    for name, loop in loops.items():
+        benches[f"runtime.{name}.socket_100msg"] = socket_messages(loop, price_msg.encode() + b"\n", 100)
+    return benches
+
+
+def socket_messages(loop, message: bytes, count: int) -> Callable[[], Any]:
+    """Send `count` messages through a socketpair, each awaited by a protocol on `loop` (like a WS feed)"""
+    import socket
+
+    class Receiver(asyncio.Protocol):
+        waiter: Optional[asyncio.Future] = None
+
+        def data_received(self, data: bytes) -> None:
+            if self.waiter is not None and not self.waiter.done():
+                self.waiter.set_result(data)
+
+    sender, receiving = socket.socketpair()
+    sender.setblocking(False)
+    receiving.setblocking(False)
+    receiver = Receiver()
+    loop.run_until_complete(loop.connect_accepted_socket(lambda: receiver, receiving))
+
+    async def run() -> None:
+        for _ in range(count):
+            receiver.waiter = loop.create_future()
+            sender.send(message)
+            await receiver.waiter
+
+    return lambda: loop.run_until_complete(run())
+
+
+# ==================== Full Loop ====================
+
+async def bench_loop(main_module, iterations: int, warmup: int) -> Dict[str, Any]:
+    """Run main() until `warmup + iterations` completed iterations, time each one"""
+    import fake_exchange
+    from deadlines import IterationBudget
+    from metrics import metrics
+    from plain_console import PlainConsole
+
+    samples: List[float] = []
+    task: Optional[asyncio.Task] = None
+
+    class RecordingBudget(IterationBudget):
+        def finish(self) -> float:
+            elapsed_ms = super().finish()
+            samples.append(elapsed_ms)
+            if len(samples) == warmup + iterations:
+                task.cancel()
+            return elapsed_ms
+
+    main_module.IterationBudget = RecordingBudget
+    main_module.REFRESH_INTERVAL = 0
+    main_module.console = PlainConsole(file=open(os.devnull, "w"))
+
+    start = time.perf_counter()
+    task = asyncio.create_task(main_module.main())
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    wall = time.perf_counter() - start
+
+    measured = sorted(samples[warmup:])
+    if not measured:
+        raise RuntimeError("main() exited before completing an iteration (see console_log.txt)")
+
+    def pct(q: float) -> float:
+        return round(measured[min(len(measured) - 1, int(q / 100 * len(measured)))] * 1000, 1)
+
+    exchange = fake_exchange.last_exchange
+    return {
+        "unit": "us/iteration",
+        "iterations": len(measured),
+        "min": round(measured[0] * 1000, 1),
+        "median": pct(50),
+        "p90": pct(90),
+        "p99": pct(99),
+        "max": round(measured[-1] * 1000, 1),
+        "mean": round(statistics.fmean(measured) * 1000, 1),
+        "iterations_per_sec": round(len(samples) / wall, 1),
+        "exchange_calls": dict(exchange.calls) if exchange else {},
+        "stages": {
+            name.split(".", 1)[1][:-3]: [round(hist.percentile(50), 3), round(hist.percentile(99), 3)]
+            for name, hist in metrics.histograms.items()
+            if name.startswith("pipeline.") and name.endswith("_ms") and hist.count
+        },
+    }
+
+
+# ==================== Reporting ====================
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'Benchmark':<30}{'median':>12}{'min':>12}  unit")
+    for name, r in results.items():
+        print(f"{name:<30}{r['median']:>12,.1f}{r['min']:>12,.1f}  {r['unit']}")
+        if "p99" in r:
+            print(f"{'':<30}p90 {r['p90']:,.1f}  p99 {r['p99']:,.1f}  max {r['max']:,.1f}  "
+                  f"({r['iterations']} iterations, {r['iterations_per_sec']:,.0f}/s)")
+        if r.get("stages"):
+            print(f"{'':<30}stages (p50/p99 ms): " + "  ".join(
+                f"{stage} {p50:g}/{p99:g}" for stage, (p50, p99) in r["stages"].items()))
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold_pct: float) -> int:
+    """Print median change per benchmark, return number of regressions"""
+    print(f"\nvs {old.get('commit', '?')} ({old.get('time', '?')})")
+    print(f"{'Benchmark':<30}{'old':>12}{'new':>12}{'change':>10}")
+    regressions = 0
+    for name, r in new["results"].items():
+        prev = old.get("results", {}).get(name)
+        if not prev or not prev.get("median"):
+            print(f"{name:<30}{'-':>12}{r['median']:>12,.1f}{'new':>10}")
+            continue
+        change = (r["median"] - prev["median"]) / prev["median"] * 100
+        flag = ""
+        if change > threshold_pct:
+            flag = "  SLOWER"
+            regressions += 1
+        elif change < -threshold_pct:
+            flag = "  faster"
+        print(f"{name:<30}{prev['median']:>12,.1f}{r['median']:>12,.1f}{change:>+9.1f}%{flag}")
+    print(f"Regressions (> +{threshold_pct:.0f}%): {regressions}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark hot functions and the main loop")
+    parser.add_argument("--quick", action="store_true", help="Fewer repeats and loop iterations")
+    parser.add_argument("--only", default="", help="Comma-separated name prefixes (e.g. pricing,loop)")
+    parser.add_argument("--config", default=os.path.join(REPO_DIR, "config.example.py"),
+                        help="Config file (default: config.example.py)")
+    parser.add_argument("--iterations", type=int, default=0, help="Loop iterations (default 2000, quick 300)")
+    parser.add_argument("--seed", type=int, default=0, help="Fake exchange random seed")
+    parser.add_argument("--output", default="", help="Result file (default: bench_results/<commit>.json)")
+    parser.add_argument("--compare", default="", help="Previous result file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold (%%) for --compare")
+    parser.add_argument("--runtime", default="", choices=("",) + runtime_profile.PROFILES,
+                        help="Runtime profile for the loop benchmark (default: RUNTIME_PROFILE from the config)")
+    args = parser.parse_args()
+
+    repeat = 3 if args.quick else 7
+    iterations = args.iterations or (300 if args.quick else 2000)
+    prefixes = [p.strip() for p in args.only.split(",") if p.strip()]
+    config_path = os.path.abspath(args.config)
+    output = os.path.abspath(args.output) if args.output else ""
+    compare_path = os.path.abspath(args.compare) if args.compare else ""
+
+    def selected(name: str) -> bool:
+        return not prefixes or any(name.startswith(p) for p in prefixes)
+
+    # main.py runs against the fake exchange, headless, with its log files in a scratch dir
+    import fake_exchange
+    fake_exchange.EXCHANGE_OPTIONS = {"seed": args.seed}
+    sys.modules["exchange_factory"] = fake_exchange
+    os.environ["MM_HEADLESS"] = "1"
+    config = load_config(config_path)
+    runtime = runtime_profile.apply_profile(args.runtime or getattr(config, "RUNTIME_PROFILE", "default"))
+    workdir = tempfile.mkdtemp(prefix="mm-bench-")
+    os.chdir(workdir)
+    try:
+        import main as main_module
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for name, fn in micro_benchmarks(main_module, config).items():
+            if selected(name):
+                results[name] = time_call(fn, repeat)
+                print(f"  {name:<30}{results[name]['median']:>12,.1f} ns", file=sys.stderr)
+        if selected("loop"):
+            results["loop.iteration"] = asyncio.run(bench_loop(main_module, iterations, warmup=iterations // 10))
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    commit = git_revision()
+    report = {
+        "commit": commit,
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": os.path.relpath(config_path, REPO_DIR),
+        "quick": args.quick,
+        "seed": args.seed,
+        "runtime": {"profile": runtime.name, "loop": runtime.loop, "json": runtime.codec},
+        "results": results,
+    }
+
+    print(f"\nCommit {commit} | Python {report['python']} | {report['platform']} | {runtime.summary_line()}\n")
+    print_results(results)
+
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{commit}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved: {os.path.relpath(output, REPO_DIR)}")
+
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as f:
+            compare(json.load(f), report, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Channel Health Monitor
+======================
+Per-channel health model for the exchange connections:
+
+    ws_client        market data (mark price, orderbook)
+    order_ws_client  order entry (create / cancel)
+
+Each channel keeps an EWMA of call latency and error rate. Errors come from
+failed/timed-out calls and from REST fallbacks reported by
+`exchange.get_fallback_stats()` (each new fallback = one WS error).
+
+Health only changes on evidence: the first samples are averaged (no single
+cold-start call sets the estimate), idle time ages old samples so the next
+ones count more, and a channel is only degraded while it has at least
+MIN_SAMPLES calls within HEALTH_WINDOW_SEC. A quiet channel (resting
+quotes, no order traffic) is therefore never stuck degraded.
+
+Used to:
+- route order entry: WS-only while order_ws is healthy, allow REST when degraded
+- hedge critical cancels: second request on the other path if the first
+  has not acked within the channel's typical latency
+- recover a degraded market-data channel by resubscribing, instead of
+  restarting the whole process
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Callable, Awaitable, Any, Optional, Tuple, Deque
+
+from metrics import metrics
+
+# Exchange operation -> channel
+OP_CHANNELS = {
+    "get_mark_price": "ws_client",
+    "get_orderbook": "ws_client",
+    "create_order": "order_ws_client",
+    "cancel_order": "order_ws_client",
+    "cancel_orders": "order_ws_client",
+}
+
+MIN_SAMPLES = 5            # Calls needed within HEALTH_WINDOW_SEC before a channel can be degraded
+HEALTH_WINDOW_SEC = 30.0
+IDLE_HALF_LIFE_SEC = 10.0  # Idle time after which the old average only counts half against a new sample
+
+
+class ChannelHealth:
+    """Rolling latency / error rate of one channel"""
+
+    def __init__(self, name: str, alpha: float = 0.1):
+        self.name = name
+        self.alpha = alpha
+        self.latency_ms = 0.0      # EWMA
+        self.error_rate = 0.0      # EWMA of 0/1 outcomes
+        self.calls = 0
+        self.errors = 0
+        self.latency_samples = 0
+        self.last_sample = 0.0
+        self.unhealthy_since = 0.0 # 0 = healthy
+        self._recent: Deque[float] = deque(maxlen=MIN_SAMPLES)  # Times of the last calls
+
+    def record(self, latency_ms: Optional[float], ok: bool, now: Optional[float] = None) -> None:
+        """Record one call outcome"""
+        now = time.time() if now is None else now
+        aged = 0.5 ** ((now - self.last_sample) / IDLE_HALF_LIFE_SEC) if self.last_sample else 1.0
+        self.calls += 1
+        if latency_ms is not None:
+            self.latency_samples += 1
+            self.latency_ms = self._blend(self.latency_ms, latency_ms, self.latency_samples, aged)
+        if not ok:
+            self.errors += 1
+        self.error_rate = self._blend(self.error_rate, 0.0 if ok else 1.0, self.calls, aged)
+        self.last_sample = now
+        self._recent.append(now)
+
+    def _blend(self, average: float, sample: float, n: int, aged: float) -> float:
+        """Plain mean over the first 1/alpha samples, EWMA after; idle time ages the old average"""
+        keep = (1 - max(self.alpha, 1.0 / n)) * aged
+        return keep * average + (1 - keep) * sample
+
+    def has_evidence(self, now: float) -> bool:
+        """Enough recent calls to judge the channel"""
+        return len(self._recent) == MIN_SAMPLES and now - self._recent[0] <= HEALTH_WINDOW_SEC
+
+    def hedge_delay(self, floor_ms: float) -> float:
+        """Time to wait for an ack before hedging (sec): ~2x typical latency"""
+        return max(floor_ms, self.latency_ms * 2) / 1000
+
+
+class ChannelMonitor:
+    """Health of all channels + routing decisions"""
+
+    def __init__(self, max_error_rate: float = 0.3, max_latency_ms: float = 500.0, hedge_floor_ms: float = 50.0):
+        self.max_error_rate = max_error_rate
+        self.max_latency_ms = max_latency_ms
+        self.hedge_floor_ms = hedge_floor_ms
+        self.channels: Dict[str, ChannelHealth] = {
+            "ws_client": ChannelHealth("ws_client"),
+            "order_ws_client": ChannelHealth("order_ws_client"),
+        }
+        self._fallback_totals: Dict[str, int] = {}
+
+    # ---------- inputs ----------
+
+    def on_call(self, op: str, latency_ms: float, ok: bool) -> None:
+        """Exchange call hook (wired into DeadlineExchange)"""
+        channel = OP_CHANNELS.get(op)
+        if channel:
+            self.channels[channel].record(latency_ms, ok)
+
+    def update_fallbacks(self, fallback_stats: Dict[str, Any]) -> None:
+        """Count new REST fallbacks as errors on the corresponding WS channel"""
+        for name, health in self.channels.items():
+            total = int((fallback_stats.get(name) or {}).get("total", 0))
+            prev = self._fallback_totals.get(name, total)
+            self._fallback_totals[name] = total
+            for _ in range(max(0, total - prev)):
+                health.record(None, ok=False)
+                metrics.inc(f"channel.{name}.fallbacks")
+
+    # ---------- state ----------
+
+    def is_healthy(self, name: str) -> bool:
+        health = self.channels[name]
+        now = time.time()
+        healthy = (not health.has_evidence(now)
+                   or (health.error_rate < self.max_error_rate and health.latency_ms < self.max_latency_ms))
+        if healthy:
+            health.unhealthy_since = 0.0
+        elif health.unhealthy_since == 0.0:
+            health.unhealthy_since = now
+            metrics.inc(f"channel.{name}.degraded")
+        return healthy
+
+    def unhealthy_for(self, name: str) -> float:
+        """Seconds the channel has been continuously unhealthy (0 if healthy)"""
+        self.is_healthy(name)  # Refresh: a channel without recent calls recovers here
+        since = self.channels[name].unhealthy_since
+        return time.time() - since if since > 0 else 0.0
+
+    def order_skip_rest(self) -> bool:
+        """Order routing: WS only while order_ws is healthy, allow REST fallback otherwise"""
+        return self.is_healthy("order_ws_client")
+
+    def summary_line(self) -> str:
+        parts = []
+        for name, h in self.channels.items():
+            state = "ok" if self.is_healthy(name) else "DEGRADED"
+            parts.append(f"{name.replace('_client', '')} {state} {h.latency_ms:.0f}ms err {h.error_rate * 100:.0f}%")
+        return "Channels: " + "  ".join(parts)
+
+    # ---------- hedging ----------
+
+    async def hedged(
+        self,
+        channel: str,
+        primary: Callable[[], Awaitable[Any]],
+        secondary: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, str]:
+        """
+        Hedged request: start primary; if it has not succeeded within the
+        channel's hedge delay (or the channel is unhealthy), start secondary too.
+        Returns (result, "primary"|"secondary") of the first success.
+        The loser is left to finish on its own (a duplicate cancel is harmless).
+        """
+        delay = 0.0 if not self.is_healthy(channel) else self.channels[channel].hedge_delay(self.hedge_floor_ms)
+        first = asyncio.ensure_future(primary())
+        tasks = {first: "primary"}
+
+        if delay > 0:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if first in done and first.exception() is None:
+                return first.result(), "primary"
+
+        metrics.inc("hedge.fired")
+        tasks[asyncio.ensure_future(secondary())] = "secondary"
+
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.add_done_callback(_consume_result)
+                    if tasks[task] == "secondary":
+                        metrics.inc("hedge.won_secondary")
+                    return task.result(), tasks[task]
+                last_error = task.exception()
+        raise last_error if last_error else RuntimeError("hedged request failed")
+
+
+def _consume_result(task: "asyncio.Future") -> None:
+    """Retrieve a background task's exception so asyncio doesn't warn about it"""
+    if not task.cancelled():
+        task.exception()
@@ -15,7 +15,7 @@ USE_MID_DRIFT = True    # True: mark drift + mid drift combined, False: mark dri
 MARK_MID_DIFF_LIMIT = 1.0  # Wait if mark-mid diff exceeds this (bps), 0 to disable
 MID_UNSTABLE_COOLDOWN = 0  # Extra wait after mid unstable (sec), 0 for immediate
 MIN_WAIT_SEC = 0.1      # Minimum wait before order modification (sec)
-REFRESH_INTERVAL = 0.05 # Screen refresh interval (sec)
+REFRESH_INTERVAL = 0.05 # Market data poll interval of the ingest stage (sec)
 CANCEL_AFTER_DELAY = 0.5 # Delay after order cancellation (sec)
 
 # Size Settings
@@ -49,8 +49,137 @@ CLOSE_MAX_ITERATIONS = 20      # Max iterations (market fallback if exceeded)
 # Snapshot Settings (for status check without tmux)
 SNAPSHOT_INTERVAL = 60         # Snapshot save interval (sec), 0 to disable
 SNAPSHOT_FILE = "status.txt"   # Snapshot filename
+STATUS_JSON_FILE = "status.json"  # Machine-readable snapshot (used by supervisor.py), "" to disable
 
 # Auto Restart
 RESTART_INTERVAL = 3600        # Auto restart interval (sec), 0 to disable
-RESTART_DELAY = 10             # Delay before restart after cancelling orders (sec)
-MAX_WS_FALLBACK = 10           # Force restart if WS fallback count exceeds this, 0 to disable
\ No newline at end of file
+RESTART_DELAY = 10             # Wait before restart when cancels could not be confirmed (sec), no wait once the book is verified empty
+
+# Loop Lag Monitor
+LOOP_LAG_INTERVAL = 0.1        # Lag sampling interval (sec)
+LOOP_LAG_THRESHOLD_MS = 100    # Log + stack sample when loop is blocked longer than this (ms), 0 to disable
+LOOP_DEBUG_SLOW_CALLBACKS = False  # True: asyncio debug mode, log slow callbacks (adds overhead)
+
+# On-demand Profiling (Unix: kill -USR1 <pid> to start, -USR2 to stop)
+PROFILE_DURATION = 30          # Auto stop after this many seconds
+PROFILE_DIR = "profiles"       # Output directory (profile + asyncio task stacks)
+
+# Exchange Call Deadlines
+EXCHANGE_TIMEOUT_DEFAULT = 3.0 # Timeout for any exchange call not listed below (sec), 0 to disable
+EXCHANGE_TIMEOUTS = {          # Per-operation timeout (sec)
+    "get_mark_price": 1.0,
+    "get_orderbook": 1.0,
+    "get_position": 1.5,
+    "get_open_orders": 1.5,
+    "get_collateral": 3.0,
+    "create_order": 2.0,
+    "cancel_order": 3.0,
+    "cancel_orders": 3.0,
+    "close_position": 5.0,
+}
+ITERATION_BUDGET = 1.0         # Per-decision time budget (sec), its dashboard/snapshot update is skipped when exceeded, 0 to disable
+
+# Market Data Staleness (quoting paused with STALE status when exceeded)
+STALE_DATA_MS = 2000           # Max data age vs exchange timestamp (ms), 0 to disable
+STALE_UNCHANGED_MS = 15000     # Max time mark/top-of-book may stay unchanged if no exchange timestamp (ms), 0 to disable
+
+# Channel Health (ws_client = market data, order_ws_client = orders)
+CHANNEL_MAX_ERROR_RATE = 0.3   # Degraded above this error rate (failed calls + REST fallbacks, EWMA 0~1)
+CHANNEL_MAX_LATENCY_MS = 500   # Degraded above this call latency (ms, EWMA)
+CHANNEL_RESUBSCRIBE_INTERVAL = 5  # Min interval between WS resubscribe attempts while degraded (sec)
+CHANNEL_HEDGE_FLOOR_MS = 50    # Min wait for cancel ack before hedging via per-order cancel (ms)
+CHANNEL_RESTART_SEC = 120      # Last resort: force restart if a channel stays degraded this long (sec), 0 to disable
+
+# Startup
+STARTUP_READY_TIMEOUT = 5.0    # Max wait for first valid mark price + orderbook (sec)
+AUTH_CACHE_FILE = ".auth_cache.json"  # Cached session token (0600, reused across restarts)
+AUTH_CACHE_TTL = 43200         # Session token reuse period (sec, capped by the token's own expiry), 0 to disable caching
+
+# Config Hot Reload (Order/Size/Close settings above apply without restart)
+CONFIG_RELOAD_INTERVAL = 1.0   # config.py change check interval (sec), 0 to disable (SIGHUP still reloads)
+
+# Split UI (dashboard, console/position logs and snapshot rendered by a separate process)
+SPLIT_UI = False               # True = same as `python main.py --split-ui`
+UI_QUEUE_SIZE = 1000           # Max pending UI messages, extra dashboard updates are dropped instead of blocking trading (log lines are written directly)
+
+# Shared-Memory Market Data Bus (one feed_daemon.py serves many bots on the same machine)
+FEED_BUS_PATH = ""             # "" = subscribe directly; e.g. "/dev/shm/standx_feed_{symbol}.bin" to read from feed_daemon.py
+FEED_BUS_SLOTS = 256           # Ring size (updates kept) per symbol
+FEED_BUS_LEVELS = 5            # Book levels per side published by feed_daemon.py (keep >= ADAPTIVE_MICRO_LEVELS)
+FEED_BUS_MAX_AGE_MS = 1000     # Daemon heartbeat older than this -> read from exchange directly (ms)
+FEED_DAEMON_POLL_MS = 5        # feed_daemon.py WS cache -> bus copy interval (ms)
+
+# Multi-Account Supervisor (python supervisor.py)
+SUPERVISOR_MANIFEST = "accounts.json"  # Accounts manifest (see accounts.example.json)
+SUPERVISOR_DIR = "accounts"    # Per-account working dirs (logs, status.txt, auth cache)
+SUPERVISOR_PIN_CPUS = True     # Pin each worker to one CPU core (Linux)
+SUPERVISOR_RESTART_GAP = 10    # Min time between two worker (re)launches (sec)
+SUPERVISOR_STATUS_INTERVAL = 10  # Aggregated status print interval (sec)
+SUPERVISOR_STOP_TIMEOUT = 30   # Max wait for workers to cancel orders and exit on stop (sec)
+
+# Shadow Strategies (simulated variants on the same market data, see shadow.py)
+SHADOW_VARIANTS = []           # e.g. [{"name": "wide", "spread_bps": 10}, {"name": "fast", "drift_threshold": 2, "close_method": "market"}], [] to disable
+SHADOW_REPORT_INTERVAL = 300   # Shadow report interval (sec), written to SHADOW_REPORT_FILE + console_log.txt
+SHADOW_REPORT_FILE = "shadow_report.txt"
+SHADOW_MAKER_FEE_BPS = 0.0     # Simulated maker fee (bps, negative = rebate)
+SHADOW_TAKER_FEE_BPS = 0.0     # Simulated taker fee (bps)
+
+# TEST Mode Fill Simulation (queue position model, see fill_model.py)
+SIM_FILLS = True               # Simulate fills / position in TEST mode (False = orders never fill)
+SIM_TRADE_SHARE = 0.5          # Share of size decrease at the best price treated as trades (0~1, rest = cancels)
+
+# Adaptive Spread / Drift (streaming signals, see signals.py)
+ADAPTIVE_QUOTING = False       # True: spread / drift follow volatility (SPREAD_BPS / DRIFT_THRESHOLD = values at ADAPTIVE_VOL_REF_BPS)
+SIGNAL_HALFLIFE_SEC = 30       # EWMA half-life for volatility / poll change rate (sec)
+ADAPTIVE_VOL_HORIZON_SEC = 10  # Volatility is measured as expected move over this horizon (sec)
+ADAPTIVE_VOL_REF_BPS = 3.0     # "Normal" volatility (bps per horizon): below -> tighter, above -> wider
+ADAPTIVE_SPREAD_VOL_MULT = 1.0 # Spread change per bps of volatility above/below reference
+ADAPTIVE_DRIFT_VOL_MULT = 0.5  # Drift threshold change per bps of volatility above/below reference
+ADAPTIVE_SPREAD_RANGE = (3.0, 20.0)  # Min / max spread (bps)
+ADAPTIVE_DRIFT_RANGE = (2.0, 10.0)   # Min / max drift threshold (bps)
+ADAPTIVE_HYSTERESIS_BPS = 0.5  # Keep current spread / drift until the target moves more than this (bps)
+ADAPTIVE_MICRO_LEVELS = 3      # Book levels used for the microprice
+ADAPTIVE_MICRO_SKEW = 0.0      # Shift quotes toward the microprice (0 = off, 1 = full offset)
+
+# Fill Ledger (realized PnL / fees from fills, kept across restarts, see fill_ledger.py)
+FILL_LEDGER_FILE = "fills.db"  # SQLite file (per working dir), "" to disable
+FILL_LEDGER_FLUSH_SEC = 1.0    # Batched write interval (sec), writes never block the trading loop
+FILL_LEDGER_MAKER_FEE_BPS = 0.0  # Maker fee (bps, negative = rebate)
+FILL_LEDGER_TAKER_FEE_BPS = 0.0  # Taker fee (bps)
+
+# Instrument Metadata (tick / lot quantization of every order, see instrument.py)
+INSTRUMENT_CACHE_FILE = ".instrument_cache.json"  # Symbol metadata cache, "" to disable
+INSTRUMENT_CACHE_TTL = 86400   # Metadata reuse period (sec), 0 to always fetch
+INSTRUMENT_TICK_SIZE = None    # Override price tick (None = from exchange, fallback 0.01)
+INSTRUMENT_LOT_SIZE = None     # Override size step (None = from exchange, fallback SIZE_UNIT)
+INSTRUMENT_MIN_NOTIONAL = None # Override min order value in USD (None = from exchange, fallback 0)
+
+# Account State (collateral / margin kept off the trading loop, see account_state.py)
+ACCOUNT_RECONCILE_SEC = 30     # Background get_collateral reconcile interval (sec), also right after each close; 0 = only after closes
+
+# Reference Feeds (other venues' books, pull quotes when they lead our mark, see reference_feeds.py)
+REFERENCE_VENUES = []          # e.g. [{"exchange": "hyperliquid", "coin": "BTC", "weight": 1.0}], {"file": "ref.jsonl"} to replay a recording, [] to disable
+REFERENCE_POLL_MS = 20         # Per-venue book poll interval (ms)
+REFERENCE_MAX_AGE_MS = 1000    # Venue data older than this is left out of the composite (ms)
+REFERENCE_BASIS_HALFLIFE_SEC = 60  # EWMA half-life of each venue's price offset to our mark (sec)
+REFERENCE_CANCEL_BPS = 4.0     # Composite ahead of our mark by more than this -> cancel now, hold new quotes (bps, keep above DRIFT_THRESHOLD)
+
+# Dead Man's Switch (LIVE: watchdog process cancels all orders if the bot stalls or dies, see deadman.py)
+DEADMAN_TIMEOUT_SEC = 10       # No successful loop iteration for this long -> cancel-all (sec), 0 to disable
+DEADMAN_FILE = ".deadman_heartbeat"  # Heartbeat file shared with the watchdog (per working dir)
+DEADMAN_LOG_FILE = "deadman_log.txt"  # Watchdog log
+
+# Session Recording (every exchange call + response + timing, replay with replay.py, see recorder.py)
+RECORD_FILE = ""               # e.g. "recordings/session_{time}.jsonl.gz" ({time} = start time, .gz = compressed), "" to disable
+
+# Pipeline (ingest / signal / decision / reporting as separate tasks, see pipeline.py)
+PIPELINE_IDLE_SEC = 0.5        # Decision loop re-runs time-based checks (restart, config reload) after this long without a new tick (sec)
+PIPELINE_FILL_QUEUE = 10000    # Fill queue to the ledger; when full the producer books the backlog inline (nothing dropped)
+
+# Runtime Profile (faster event loop / JSON codec when installed, see runtime_profile.py)
+RUNTIME_PROFILE = "default"    # "fast": uvloop + orjson / ujson (pip install uvloop orjson), missing pieces fall back to asyncio / json
+
+# Shutdown (LIVE: verified cancel-all on exit / restart, see shutdown.py)
+SHUTDOWN_CANCEL_TIMEOUT = 5.0  # Deadline for cancel + confirm + retries (sec)
+SHUTDOWN_CANCEL_RETRIES = 3    # Cancel rounds, each one only for orders still open
+SHUTDOWN_VERIFY_POLL_MS = 100  # Open-order check interval while waiting for the book to empty (ms)
@@ -0,0 +1,343 @@
+"""
+Dashboard & Snapshot Rendering
+==============================
+Everything the reporting side needs, without touching the trading loop:
+
+- build_dashboard: rich Panel (rich is imported lazily)
+- dashboard state: plain, picklable dict of everything shown on screen,
+  so rendering can also happen in the UI companion process
+- write_snapshot: status.txt for checking the bot without tmux
+- write_status_json: machine-readable status (read by supervisor.py)
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Optional, Dict, Any, List
+
+import config as config_module
+from config import COIN
+from pricing import calc_drift_bps, format_price
+from runtime_config import RuntimeConfig
+
+
+def _order_tuple(order) -> Optional[tuple]:
+    if order is None:
+        return None
+    return (order.id, order.price, order.size, order.reference_price, order.status)
+
+
+def order_view(order_mgr) -> Dict[str, Any]:
+    """Picklable snapshot of an order manager (current orders + counters)"""
+    return {
+        "buy": _order_tuple(order_mgr.get_buy_order()),
+        "sell": _order_tuple(order_mgr.get_sell_order()),
+        "total_placed": order_mgr.total_placed,
+        "total_cancelled": order_mgr.total_cancelled,
+        "total_rebalanced": order_mgr.total_rebalanced,
+    }
+
+
+class OrderView:
+    """Read-only order manager stand-in built from order_view() data"""
+
+    def __init__(self, view: Dict[str, Any]):
+        self._view = view
+        self.total_placed = view["total_placed"]
+        self.total_cancelled = view["total_cancelled"]
+        self.total_rebalanced = view["total_rebalanced"]
+
+    def _order(self, side: str):
+        data = self._view.get(side)
+        if data is None:
+            return None
+        order_id, price, size, reference_price, status = data
+        return SimpleNamespace(id=order_id, side=side, price=price, size=size,
+                               reference_price=reference_price, status=status)
+
+    def get_buy_order(self):
+        return self._order("buy")
+
+    def get_sell_order(self):
+        return self._order("sell")
+
+
+def build_dashboard(
+    symbol: str,
+    mark_price: float,
+    best_bid: float,
+    best_ask: float,
+    best_bid_size: float,
+    best_ask_size: float,
+    buy_is_maker: bool,
+    sell_is_maker: bool,
+    drift_bps: float,
+    status: str,
+    countdown: float,
+    spread_bps: float,
+    order_mgr,  # SimOrderManager or LiveOrderManager
+    available_collateral: float,
+    total_collateral: float,
+    order_size: float,
+    position: Optional[Dict[str, Any]],
+    pos_stats: Dict[str, Any],
+    last_action: str = "",
+    mode: str = "TEST",
+    health_lines: Optional[List[str]] = None,
+    rc: Optional[RuntimeConfig] = None
+) -> "Panel":
+    """Build dashboard as rich Panel"""
+    from rich.table import Table
+    from rich.text import Text
+    from rich.panel import Panel
+
+    now = datetime.now().strftime("%H:%M:%S")
+    is_live = mode == "LIVE"
+    rc = rc or RuntimeConfig.from_module(config_module)
+
+    # Get current orders
+    buy_order = order_mgr.get_buy_order()
+    sell_order = order_mgr.get_sell_order()
+
+    # Calculate order value (USD)
+    order_value = order_size * mark_price
+
+    # ========== Main Table ==========
+    table = Table.grid(padding=(0, 1))
+    table.add_column(justify="left")
+    table.add_column(justify="left")
+
+    # -- Header --
+    header = Text()
+    header.append(f"Symbol: ", style="bold")
+    header.append(f"{symbol}", style="bold cyan")
+    header.append(f"    Time: {now}    Target: ±{rc.spread_bps}bps")
+    table.add_row(header, "")
+    table.add_row("", "")
+
+    # -- ACCOUNT Section --
+    table.add_row(Text("▌ ACCOUNT", style="bold cyan"), "")
+    table.add_row(
+        Text(f"  Total: ${total_collateral:,.2f}  Available: ${available_collateral:,.2f}", style="green"),
+        Text(f"  Order Size: {order_size:.4f} {COIN} (${order_value:,.2f}) x{rc.leverage:.0f}", style="bold")
+    )
+
+    # Position display
+    if position and position.get("size", 0) != 0:
+        pos_side = position.get("side", "").upper()
+        pos_size = float(position.get("size", 0))
+        pos_entry = float(position.get("entry_price", 0))
+        pos_upnl = float(position.get("unrealized_pnl", 0))
+        pos_color = "green" if pos_side == "LONG" else "red"
+        upnl_color = "green" if pos_upnl >= 0 else "red"
+        pos_text = Text("  Position: ")
+        pos_text.append(f"{pos_side} ", style=pos_color)
+        pos_text.append(f"{pos_size:.4f} @ {format_price(pos_entry)}  uPnL: ")
+        pos_text.append(f"${pos_upnl:+,.2f}", style=upnl_color)
+    else:
+        pos_text = Text("  Position: No position", style="dim")
+    table.add_row(pos_text, "")
+    table.add_row("", "")
+
+    # -- MARKET DATA Section --
+    table.add_row(Text("▌ MARKET DATA", style="bold cyan"), "")
+    # Mid price (size-weighted average)
+    total_size = best_bid_size + best_ask_size
+    mid_price = (best_bid * best_bid_size + best_ask * best_ask_size) / total_size if total_size > 0 else (best_bid + best_ask) / 2
+    mid_diff_bps = (mid_price - mark_price) / mark_price * 10000 if mark_price > 0 else 0
+    mid_diff_style = "green" if abs(mid_diff_bps) < 3 else ("yellow" if abs(mid_diff_bps) < 6 else "red")
+
+    # Spread color
+    if spread_bps < 5:
+        spread_style = "green"
+    elif spread_bps < 10:
+        spread_style = "yellow"
+    else:
+        spread_style = "red"
+    drift_style = "yellow" if drift_bps > rc.drift_threshold else "green"
+
+    # Aligned output (fixed width 12 chars)
+    table.add_row(Text(f"  Mark:   {format_price(mark_price):>12}  │  Mid:    {format_price(mid_price):>12}"), "")
+    table.add_row(Text(f"  Bid:    {format_price(best_bid):>12}  │  Ask:    {format_price(best_ask):>12}"), "")
+    spread_line = Text(f"  Spread: ")
+    spread_line.append(f"{spread_bps:.2f} bps".rjust(12), style=spread_style)
+    spread_line.append(f"  │  Drift:  ")
+    spread_line.append(f"{drift_bps:.2f}".rjust(6), style=drift_style)
+    spread_line.append(" / ")
+    spread_line.append(f"{mid_diff_bps:+.2f} bps", style=mid_diff_style)
+    table.add_row(spread_line, "")
+    table.add_row("", "")
+
+    # -- SIMULATED ORDERS Section --
+    table.add_row(Text("▌ SIMULATED ORDERS", style="bold cyan"), "")
+
+    # SELL Order (displayed above)
+    sell_maker_text = Text("[MAKER]", style="green") if sell_is_maker else Text("[TAKER]", style="red")
+    if sell_order:
+        sell_drift = calc_drift_bps(mark_price, sell_order.reference_price)
+        sell_line = Text("  SELL: ", style="red")
+        sell_line.append("● OPEN  ", style="red bold")
+        sell_line.append(f"{sell_order.id}  @ {format_price(sell_order.price)}  x{sell_order.size}")
+        sell_drift_text = Text(f"        (drift: {sell_drift:.1f}bps)  ")
+    else:
+        sell_line = Text("  SELL: ", style="red")
+        sell_line.append("○ No order", style="dim")
+        sell_drift_text = Text("        ")
+    sell_drift_text.append_text(sell_maker_text)
+    table.add_row(sell_line, "")
+    table.add_row(sell_drift_text, "")
+
+    # BUY Order (displayed below)
+    buy_maker_text = Text("[MAKER]", style="green") if buy_is_maker else Text("[TAKER]", style="red")
+    if buy_order:
+        buy_drift = calc_drift_bps(mark_price, buy_order.reference_price)
+        buy_line = Text("  BUY:  ", style="green")
+        buy_line.append("● OPEN  ", style="green bold")
+        buy_line.append(f"{buy_order.id}  @ {format_price(buy_order.price)}  x{buy_order.size}")
+        buy_drift_text = Text(f"        (drift: {buy_drift:.1f}bps)  ")
+    else:
+        buy_line = Text("  BUY:  ", style="green")
+        buy_line.append("○ No order", style="dim")
+        buy_drift_text = Text("        ")
+    buy_drift_text.append_text(buy_maker_text)
+    table.add_row(buy_line, "")
+    table.add_row(buy_drift_text, "")
+    table.add_row("", "")
+
+    # -- STATUS Section --
+    table.add_row(Text("▌ STATUS", style="bold cyan"), "")
+
+    # Status color
+    if status == "MONITORING":
+        status_text = Text("● MONITORING - Orders active", style="green bold")
+    elif status == "PLACING":
+        status_text = Text("▶ PLACING orders...", style="cyan bold")
+    elif status == "NO_SIZE":
+        status_text = Text("✗ NO SIZE - Insufficient collateral", style="red bold")
+    elif status == "WAITING":
+        status_text = Text("◌ WAITING - Would be TAKER", style="yellow bold")
+    elif status == "MID_WAIT":
+        status_text = Text("◌ MID_WAIT - Mid drift unstable", style="yellow bold")
+    elif status == "REBALANCING":
+        status_text = Text("⟳ REBALANCING - Cancelling & replacing", style="yellow bold")
+    elif status == "STALE":
+        status_text = Text("⚠ STALE - Market data too old, quoting paused", style="red bold")
+    elif status == "REF_LEAD":
+        status_text = Text("⚠ REF_LEAD - Reference venues ahead of mark, quoting paused", style="yellow bold")
+    else:
+        status_text = Text(status)
+
+    table.add_row(Text("  ").append_text(status_text), "")
+
+    if last_action:
+        table.add_row(Text(f"  Last: {last_action}", style="dim"), "")
+
+    if countdown > 0 and rc.min_wait_sec > 0:
+        countdown_str = f"{countdown:.1f}s" if countdown < 10 else f"{int(countdown)}s"
+        table.add_row(Text(f"  Next check in: {countdown_str}", style="dim"), "")
+
+    table.add_row("", "")
+
+    # -- STATS Section --
+    pnl_style = "green" if pos_stats['total_pnl'] >= 0 else "red"
+
+    # First line: Order statistics
+    stats_line1 = Text(
+        f"Placed: {order_mgr.total_placed}  Cancelled: {order_mgr.total_cancelled}  Rebalanced: {order_mgr.total_rebalanced}",
+        style="dim"
+    )
+    table.add_row(stats_line1, "")
+
+    # Second line: Close statistics
+    stats_line2 = Text(f"Closes: {pos_stats['total_closes']} (", style="dim")
+    stats_line2.append(f"{pos_stats['total_volume']:.4f} BTC", style="dim")
+    stats_line2.append(", ", style="dim")
+    stats_line2.append(f"${pos_stats['total_pnl']:+.2f}", style=pnl_style)
+    # Close time display
+    if pos_stats.get('total_close_time', 0) > 0:
+        stats_line2.append(f", total: {pos_stats['total_close_time']:.1f}s", style="dim")
+    if pos_stats.get('last_close_time', 0) > 0:
+        stats_line2.append(f", last: {pos_stats['last_close_time']:.1f}s", style="dim")
+    stats_line2.append(")", style="dim")
+    table.add_row(stats_line2, "")
+
+    # Health lines: loop lag, timeouts, ...
+    for line in health_lines or []:
+        table.add_row(Text(line, style="dim"), "")
+
+    # Wrap in Panel
+    if is_live:
+        title = "[bold red]StandX Market Making [LIVE][/bold red]"
+        border = "red"
+    else:
+        title = "[bold cyan]StandX Market Making [TEST][/bold cyan]"
+        border = "cyan"
+
+    return Panel(
+        table,
+        title=title,
+        subtitle="[dim]Press Ctrl+C to exit[/dim]",
+        border_style=border
+    )
+
+
+def build_dashboard_from_state(state: Dict[str, Any]) -> "Panel":
+    """build_dashboard() from a dashboard state dict (orders as order_view data)"""
+    kwargs = {k: v for k, v in state.items() if k != "orders"}
+    return build_dashboard(order_mgr=OrderView(state["orders"]), **kwargs)
+
+
+def write_snapshot(path: str, state: Dict[str, Any]) -> None:
+    """Write status snapshot from a dashboard state dict"""
+    orders = OrderView(state["orders"])
+    buy_order = orders.get_buy_order()
+    sell_order = orders.get_sell_order()
+    position = state.get("position")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"[{state['mode']}] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Mark: {state['mark_price']:,.2f} | Spread: {state['spread_bps']:.1f}bps\n")
+        f.write(f"Total: ${state['total_collateral']:,.2f} | Available: ${state['available_collateral']:,.2f} | Size: {state['order_size']:.4f} BTC\n")
+        if buy_order:
+            f.write(f"BUY:  {buy_order.price:,.2f} ({buy_order.status})\n")
+        if sell_order:
+            f.write(f"SELL: {sell_order.price:,.2f} ({sell_order.status})\n")
+        if position and float(position.get("size", 0)) != 0:
+            f.write(f"Position: {position.get('side')} {position.get('size')} uPnL: ${position.get('unrealized_pnl', 0):+.2f}\n")
+        f.write(f"Status: {state['status']}\n")
+        for line in state.get("health_lines") or []:
+            f.write(f"{line}\n")
+
+
+def write_status_json(path: str, state: Dict[str, Any]) -> None:
+    """Write machine-readable status from a dashboard state dict (atomic)"""
+    orders = state["orders"]
+    position = state.get("position") or {}
+    pos_stats = state.get("pos_stats") or {}
+    data = {
+        "pid": os.getpid(),
+        "time": time.time(),
+        "mode": state["mode"],
+        "symbol": state["symbol"],
+        "status": state["status"],
+        "mark_price": state["mark_price"],
+        "total_collateral": state["total_collateral"],
+        "available_collateral": state["available_collateral"],
+        "order_size": state["order_size"],
+        "open_orders": int(orders["buy"] is not None) + int(orders["sell"] is not None),
+        "total_placed": orders["total_placed"],
+        "total_cancelled": orders["total_cancelled"],
+        "total_rebalanced": orders["total_rebalanced"],
+        "position_size": float(position.get("size", 0) or 0),
+        "position_side": position.get("side", ""),
+        "unrealized_pnl": float(position.get("unrealized_pnl", 0) or 0),
+        "total_closes": pos_stats.get("total_closes", 0),
+        "realized_pnl": pos_stats.get("total_pnl", 0.0),
+        "last_action": state.get("last_action", ""),
+        "health_lines": state.get("health_lines") or [],
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,148 @@
+"""
+Exchange Call Deadlines
+=======================
+- DeadlineExchange: proxy around the exchange wrapper that puts a per-operation
+  timeout on every `await exchange.*` call. A hung call raises DeadlineExceeded
+  (counted as an error by the main loop) instead of freezing it.
+- IterationBudget: per-iteration time budget with a skip policy. Optional stages
+  (dashboard, snapshot) are skipped once the budget is spent; critical stages
+  (cancel, close) are never skipped. After finish() the elapsed time is
+  frozen, so a later stage (reporting task) judges the decision itself,
+  not how long the report waited in its channel.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Optional, Callable
+
+from metrics import metrics
+
+# Stages that may be dropped when the iteration budget is exhausted
+SKIPPABLE_STAGES = ("dashboard", "snapshot")
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Exchange call exceeded its deadline"""
+
+    def __init__(self, op: str, timeout: float):
+        super().__init__(f"{op} timed out after {timeout:.2f}s")
+        self.op = op
+        self.timeout = timeout
+
+
+async def with_deadline(
+    aw,
+    op: str,
+    timeout: float,
+    on_call: Optional[Callable[[str, float, bool], None]] = None,
+):
+    """
+    Await with timeout, count timeouts and latency per operation.
+    on_call(op, latency_ms, ok) is invoked after every call (channel health).
+    """
+    start = time.perf_counter()
+    ok = False
+    try:
+        result = await asyncio.wait_for(aw, timeout)
+        ok = True
+        return result
+    except asyncio.TimeoutError:
+        metrics.inc("deadline.timeouts")
+        metrics.inc(f"deadline.timeouts.{op}")
+        raise DeadlineExceeded(op, timeout) from None
+    finally:
+        latency_ms = (time.perf_counter() - start) * 1000
+        metrics.observe(f"exchange.{op}_ms", latency_ms)
+        if on_call is not None:
+            on_call(op, latency_ms, ok)
+
+
+class DeadlineExchange:
+    """Exchange proxy: async methods get a timeout, everything else passes through"""
+
+    def __init__(
+        self,
+        exchange,
+        timeouts: Dict[str, float],
+        default_timeout: float,
+        on_call: Optional[Callable[[str, float, bool], None]] = None,
+    ):
+        self._exchange = exchange
+        self._timeouts = timeouts
+        self._default_timeout = default_timeout
+        self._on_call = on_call
+        self._wrapped: Dict[str, Any] = {}
+
+    @property
+    def inner(self):
+        """Underlying exchange object"""
+        return self._exchange
+
+    def __getattr__(self, name: str):
+        wrapped = self._wrapped.get(name)
+        if wrapped is not None:
+            return wrapped
+
+        attr = getattr(self._exchange, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr  # ws_client, get_fallback_stats, ...
+
+        timeout = self._timeouts.get(name, self._default_timeout)
+        if timeout is None or timeout <= 0:
+            timeout = None  # no deadline, still measured
+
+        async def call(*args, **kwargs):
+            return await with_deadline(attr(*args, **kwargs), name, timeout, self._on_call)
+
+        self._wrapped[name] = call
+        return call
+
+
+class IterationBudget:
+    """Time budget for one main loop iteration"""
+
+    def __init__(self, budget_sec: float):
+        self.budget_sec = budget_sec
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None  # Elapsed (sec) frozen by finish()
+        self._exhausted_counted = False
+
+    def elapsed(self) -> float:
+        if self.finished is not None:
+            return self.finished
+        return time.perf_counter() - self.started
+
+    def remaining(self) -> float:
+        if self.budget_sec <= 0:
+            return float("inf")
+        return self.budget_sec - self.elapsed()
+
+    def allow(self, stage: str) -> bool:
+        """
+        Skip policy: False only for skippable stages once the budget is spent.
+        Critical stages (cancel, close, place) always return True.
+        """
+        if stage not in SKIPPABLE_STAGES or self.remaining() > 0:
+            return True
+        if not self._exhausted_counted:
+            self._exhausted_counted = True
+            metrics.inc("budget.exhausted")
+        metrics.inc(f"budget.skipped.{stage}")
+        return False
+
+    def finish(self) -> float:
+        """Record iteration time (ms), freeze it and return it"""
+        self.finished = time.perf_counter() - self.started
+        elapsed_ms = self.finished * 1000
+        metrics.observe("loop.iteration_ms", elapsed_ms)
+        return elapsed_ms
+
+
+def deadline_summary_line() -> str:
+    """One-line timeout/budget summary for dashboard / snapshot"""
+    hist = metrics.histogram("loop.iteration_ms")
+    iter_str = f"p99 {hist.percentile(99):.0f}ms" if hist and hist.count else "-"
+    return (
+        f"Iteration: {iter_str}  Timeouts: {metrics.get('deadline.timeouts'):.0f}  "
+        f"Budget skips: {metrics.get('budget.exhausted'):.0f}"
+    )
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Dead Man's Switch
+=================
+Resting orders must not outlive a frozen or disconnected bot. A watchdog
+process (own interpreter, own exchange connection) expects heartbeats from
+the trading loop and cancels all orders on the symbol when they stop:
+
+    trading process                          watchdog (python deadman.py)
+    ---------------                          ----------------------------
+    beat() after each good iteration  --->   heartbeat file (mmap)
+    (no beats on errors / timeouts)          armed and older than timeout -> cancel-all
+                                             trading process gone (even SIGKILL) -> cancel-all, exit
+
+beat() is one store into the shared mapping, no syscall. The switch is
+disarmed while the bot does something long on purpose (strategic close)
+and on clean shutdown / restart, where the bot cancels its own orders.
+
+If those cancels could not be verified, the watchdog is left running and
+armed, heartbeat file included. After a restart (execv, same pid) the new
+process takes over that file: its beats keep the old watchdog quiet, and
+if it does not beat within the timeout the old watchdog cancels what was
+left behind.
+
+When the exchange wrapper offers a venue-side switch (cancel-all-after,
+see VENUE_METHODS), it is refreshed from a background task as a second
+line of defence that also covers the whole machine going away.
+
+Heartbeat file layout (little endian, 24 B):
+    beat      double   time.monotonic() of the last beat (system-wide clock)
+    armed     uint32
+    stop      uint32   set by the trading process: watchdog exits quietly
+    fired     uint32   cancel-alls issued by the watchdog
+"""
+
+import argparse
+import asyncio
+import importlib
+import mmap
+import os
+import signal
+import struct
+import subprocess
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Optional, Callable
+
+STATE = struct.Struct("<dIII")
+BEAT = struct.Struct("<d")
+FLAG = struct.Struct("<I")
+ARMED_OFFSET, STOP_OFFSET, FIRED_OFFSET = 8, 12, 16
+
+# Venue cancel-on-disconnect / cancel-all-after methods, called with the timeout in seconds
+VENUE_METHODS = ("cancel_all_after", "set_cancel_on_disconnect", "set_dead_man_switch", "schedule_cancel_all")
+
+CANCEL_RETRIES = 3
+CANCEL_TIMEOUT = 5.0
+
+
+def _map(path: str, create: bool):
+    """Map the heartbeat file -> (file, mmap, reused); an existing file is reused in place"""
+    reused = os.path.exists(path) and os.path.getsize(path) == STATE.size
+    if create and not reused:
+        with open(path, "wb") as f:
+            f.write(b"\0" * STATE.size)
+    f = open(path, "r+b")
+    return f, mmap.mmap(f.fileno(), STATE.size), reused
+
+
+class DeadmanSwitch:
+    """Trading-process side: heartbeat + watchdog process lifecycle"""
+
+    def __init__(self, path: str, timeout_sec: float, log_fn: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.timeout_sec = timeout_sec
+        self.log_fn = log_fn or (lambda _msg: None)
+        # Never truncated: a watchdog left armed before a restart still maps this file
+        self._file, self._mm, reused = _map(path, create=True)
+        self.took_over = reused and FLAG.unpack_from(self._mm, ARMED_OFFSET)[0] == 1
+        BEAT.pack_into(self._mm, 0, time.monotonic())
+        FLAG.pack_into(self._mm, STOP_OFFSET, 0)
+        self._process: Optional[subprocess.Popen] = None
+        self._venue_task: Optional[asyncio.Task] = None
+        self.venue_method = ""
+
+    def start(self, exchange_module: str = "exchange_factory", log_file: str = "deadman_log.txt") -> None:
+        """Launch the watchdog (config.py / .env are read by the watchdog itself)"""
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deadman.py")
+        self._process = subprocess.Popen(
+            [sys.executable, script, "--pid", str(os.getpid()), "--file", self.path,
+             "--timeout", str(self.timeout_sec), "--module", exchange_module, "--log", log_file],
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,  # Ctrl+C / terminal hangup must not reach it
+        )
+
+    # ---------- hot path ----------
+
+    def beat(self) -> None:
+        BEAT.pack_into(self._mm, 0, time.monotonic())
+        FLAG.pack_into(self._mm, ARMED_OFFSET, 1)
+
+    def disarm(self) -> None:
+        FLAG.pack_into(self._mm, ARMED_OFFSET, 0)
+
+    @property
+    def fired(self) -> int:
+        return FLAG.unpack_from(self._mm, FIRED_OFFSET)[0]
+
+    # ---------- venue-side switch ----------
+
+    def start_venue_switch(self, exchange) -> bool:
+        """Refresh the exchange's cancel-all-after timer in the background, if it has one"""
+        for name in VENUE_METHODS:
+            method = getattr(exchange, name, None)
+            if callable(method):
+                self.venue_method = name
+                self._venue_task = asyncio.create_task(self._refresh_venue(method), name="deadman-venue")
+                self.log_fn(f"DEADMAN | venue switch {name}({self.timeout_sec:g}s)")
+                return True
+        return False
+
+    async def _refresh_venue(self, method) -> None:
+        while True:
+            try:
+                result = method(self.timeout_sec)
+                if hasattr(result, "__await__"):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.log_fn(f"DEADMAN | venue switch refresh failed: {e}")
+            await asyncio.sleep(self.timeout_sec / 3)
+
+    # ---------- shutdown ----------
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Disarm and stop the watchdog (the caller cancels its own orders), without blocking the loop"""
+        if self._venue_task is not None:
+            self._venue_task.cancel()
+            try:
+                await self._venue_task
+            except asyncio.CancelledError:
+                pass
+            self._venue_task = None
+        self._signal_stop()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._process is not None and self._process.poll() is None and loop.time() < deadline:
+            await asyncio.sleep(0.02)
+        self.stop_watchdog(0)
+
+    def _signal_stop(self) -> None:
+        self.disarm()
+        FLAG.pack_into(self._mm, STOP_OFFSET, 1)
+
+    def stop_watchdog(self, timeout: float = 5.0) -> None:
+        """Synchronous stop (close() is the non-blocking version)"""
+        self._signal_stop()
+        if self._process is not None:
+            try:
+                self._process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self._process.terminate()
+            self._process = None
+        self._mm.close()
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def summary_line(self) -> str:
+        beat, armed, _stop, fired = STATE.unpack_from(self._mm, 0)
+        age = f"{(time.monotonic() - beat) * 1000:.0f}ms ago" if beat > 0 else "-"
+        venue = f"  venue {self.venue_method}" if self.venue_method else ""
+        return (f"Deadman: {'armed' if armed else 'disarmed'}  beat {age}  "
+                f"timeout {self.timeout_sec:g}s  fired {fired}{venue}")
+
+
+# ==================== Watchdog process ====================
+
+async def _connect(factory, exchange_name: str, coin: str):
+    from auth_cache import load_cached_auth
+    from config import AUTH_CACHE_FILE, AUTH_CACHE_TTL
+    key = SimpleNamespace(
+        wallet_address=os.getenv("WALLET_ADDRESS"),
+        chain='bsc',
+        evm_private_key=os.getenv("PRIVATE_KEY"),
+        open_browser=False,  # Never prompt from the background
+    )
+    if load_cached_auth(key, AUTH_CACHE_FILE, AUTH_CACHE_TTL):
+        try:
+            exchange = await factory.create_exchange(exchange_name, key)
+            return exchange, factory.symbol_create(exchange_name, coin)
+        except Exception:
+            vars(key).pop("session_token", None)  # Cached session rejected: log in with the key
+    exchange = await factory.create_exchange(exchange_name, key)
+    return exchange, factory.symbol_create(exchange_name, coin)
+
+
+async def _cancel_all(exchange, symbol: str, log_line) -> bool:
+    for attempt in range(1, CANCEL_RETRIES + 1):
+        try:
+            await asyncio.wait_for(exchange.cancel_orders(symbol=symbol), timeout=CANCEL_TIMEOUT)
+            return True
+        except Exception as e:
+            log_line(f"DEADMAN | cancel-all attempt {attempt}/{CANCEL_RETRIES} failed: {e}")
+            await asyncio.sleep(0.2 * attempt)
+    return False
+
+
+async def watch(parent_pid: int, path: str, timeout_sec: float, exchange_module: str, log_line) -> None:
+    from config import EXCHANGE, COIN
+    factory = importlib.import_module(exchange_module)
+    f, mm, _reused = _map(path, create=False)
+
+    # Connect up front: a cancel must not wait for a login
+    exchange, symbol = None, ""
+    try:
+        exchange, symbol = await _connect(factory, EXCHANGE, COIN)
+        log_line(f"DEADMAN | watching pid {parent_pid} | {symbol} | timeout {timeout_sec:g}s")
+    except Exception as e:
+        log_line(f"DEADMAN | connect failed ({e}), retrying on trigger")
+
+    poll_sec = max(0.05, min(timeout_sec / 4, 1.0))
+    tripped = False         # Fired for the current stall, wait for beats to resume
+    connect_failures = 0
+    try:
+        while True:
+            await asyncio.sleep(poll_sec)
+            beat, armed, stop, _fired = STATE.unpack_from(mm, 0)
+            if stop:
+                break
+            parent_gone = os.getppid() != parent_pid
+            stalled_ms = (time.monotonic() - beat) * 1000
+            if not parent_gone:
+                if not armed or stalled_ms < timeout_sec * 1000:
+                    if tripped:
+                        log_line("DEADMAN | heartbeat resumed")
+                    tripped = False
+                    continue
+                if tripped:
+                    continue
+
+            reason = "trading process gone" if parent_gone else f"no heartbeat for {stalled_ms:.0f}ms"
+            if exchange is None:
+                try:
+                    exchange, symbol = await _connect(factory, EXCHANGE, COIN)
+                except Exception as e:
+                    connect_failures += 1
+                    log_line(f"DEADMAN | {reason} | connect failed: {e}")
+                    if parent_gone and connect_failures >= CANCEL_RETRIES:
+                        break
+                    continue
+            ok = await _cancel_all(exchange, symbol, log_line)
+            FLAG.pack_into(mm, FIRED_OFFSET, FLAG.unpack_from(mm, FIRED_OFFSET)[0] + 1)
+            tripped = True
+            log_line(f"DEADMAN | {reason} | cancel-all {'sent' if ok else 'FAILED'}")
+            if parent_gone:
+                break
+    finally:
+        mm.close()
+        f.close()
+        if exchange is not None:
+            try:
+                await exchange.close()
+            except Exception:
+                pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Order watchdog (started by main.py with DEADMAN_TIMEOUT_SEC)")
+    parser.add_argument("--pid", type=int, required=True, help="Trading process pid")
+    parser.add_argument("--file", required=True, help="Heartbeat file")
+    parser.add_argument("--timeout", type=float, required=True, help="Heartbeat timeout (sec)")
+    parser.add_argument("--module", default="exchange_factory", help="Exchange factory module")
+    parser.add_argument("--log", default="deadman_log.txt", help="Log file")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    with open(args.log, "a", encoding="utf-8") as log:
+        def log_line(message: str) -> None:
+            log.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
+            log.flush()
+
+        asyncio.run(watch(args.pid, args.file, args.timeout, args.module, log_line))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+In-process Fake Exchange
+========================
+Deterministic stand-in for the mpdex exchange wrapper (same method names,
+argument style and return shapes main.py relies on). No network, no keys:
+used by benchmark.py to run the real main() loop in-process.
+
+- mark price: seeded random walk (vol_bps per get_mark_price call)
+- orderbook: `depth` levels each side around the mark, ms "timestamp"
+- orders rest until cancelled (no fills; SimExchange simulates those)
+- latency_ms > 0 adds an await per call (simulated round trip)
+
+Usage as a module replacement for exchange_factory:
+
+    import fake_exchange
+    sys.modules["exchange_factory"] = fake_exchange
+"""
+
+import asyncio
+import random
+import time
+from typing import Optional, List, Dict, Any
+
+
+class FakeWSClient:
+    """ws_client stand-in (subscriptions are no-ops)"""
+
+    def __init__(self):
+        self.subscriptions: List[tuple] = []
+
+    async def subscribe_price(self, symbol: str) -> None:
+        self.subscriptions.append(("price", symbol))
+
+    async def subscribe_orderbook(self, symbol: str) -> None:
+        self.subscriptions.append(("orderbook", symbol))
+
+
+class FakeExchange:
+    """Exchange wrapper stand-in with a synthetic market"""
+
+    def __init__(self, mark_price: float = 100000.0, vol_bps: float = 0.5, depth: int = 5,
+                 tick: float = 0.1, collateral: float = 1000.0, latency_ms: float = 0.0,
+                 seed: Optional[int] = 0):
+        self.ws_client = FakeWSClient()
+        self.order_ws_client = None
+        self.mark_price = mark_price
+        self.vol_bps = vol_bps
+        self.depth = depth
+        self.tick = tick
+        self.collateral = collateral
+        self.latency_ms = latency_ms
+        self.rng = random.Random(seed)
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.calls: Dict[str, int] = {}
+
+    async def _call(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    # ---------- market data ----------
+
+    def step(self) -> float:
+        """Advance the random walk one step"""
+        self.mark_price *= 1 + self.rng.gauss(0, self.vol_bps / 10000)
+        return self.mark_price
+
+    async def get_mark_price(self, symbol: str) -> str:
+        await self._call("get_mark_price")
+        return str(self.step())
+
+    async def get_orderbook(self, symbol: str) -> Dict[str, Any]:
+        await self._call("get_orderbook")
+        mid = round(self.mark_price / self.tick) * self.tick
+        rng = self.rng
+        return {
+            "bids": [[mid - self.tick * (i + 1), round(rng.uniform(0.1, 2.0), 4)] for i in range(self.depth)],
+            "asks": [[mid + self.tick * (i + 1), round(rng.uniform(0.1, 2.0), 4)] for i in range(self.depth)],
+            "timestamp": time.time() * 1000,
+        }
+
+    async def get_symbol_info(self, symbol: str) -> Dict[str, Any]:
+        await self._call("get_symbol_info")
+        return {"symbol": symbol, "tick_size": self.tick, "lot_size": 0.0001, "min_notional": 1.0}
+
+    # ---------- account ----------
+
+    async def get_collateral(self) -> Dict[str, float]:
+        await self._call("get_collateral")
+        return {"available_collateral": self.collateral, "total_collateral": self.collateral}
+
+    async def get_position(self, symbol: str) -> Optional[Dict[str, Any]]:
+        await self._call("get_position")
+        return None
+
+    async def get_open_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        await self._call("get_open_orders")
+        return list(self.orders.values())
+
+    # ---------- orders ----------
+
+    async def create_order(self, symbol: str, side: str, amount: float, price: Optional[float] = None,
+                           order_type: str = "limit", client_order_id: Optional[str] = None,
+                           **_kwargs) -> Dict[str, Any]:
+        await self._call("create_order")
+        order_id = client_order_id or f"FAKE-{len(self.orders)}-{time.time_ns()}"
+        if order_type != "market":
+            self.orders[order_id] = {"client_order_id": order_id, "side": side, "price": price, "size": amount}
+        return {"code": 0, "message": "success", "request_id": order_id}
+
+    async def cancel_order(self, client_order_id: Optional[str] = None, **_kwargs) -> Dict[str, Any]:
+        await self._call("cancel_order")
+        self.orders.pop(client_order_id, None)
+        return {"code": 0}
+
+    async def cancel_orders(self, symbol: Optional[str] = None, open_orders: Optional[List[Dict]] = None) -> List:
+        await self._call("cancel_orders")
+        if open_orders is None:
+            self.orders.clear()
+        else:
+            for order in open_orders:
+                self.orders.pop(order.get("client_order_id"), None)
+        return []
+
+    async def close_position(self, symbol: str, position: Dict[str, Any]) -> Dict[str, Any]:
+        await self._call("close_position")
+        return {"code": 0}
+
+    # ---------- wrapper housekeeping ----------
+
+    def get_fallback_stats(self) -> Dict[str, Dict[str, int]]:
+        return {"ws_client": {"total": 0}, "order_ws_client": {"total": 0}}
+
+    async def close(self) -> None:
+        pass
+
+
+# ==================== exchange_factory API ====================
+
+# Keyword arguments for the next create_exchange() call (set by the benchmark)
+EXCHANGE_OPTIONS: Dict[str, Any] = {}
+last_exchange: Optional[FakeExchange] = None
+
+
+async def create_exchange(exchange_name: str, key=None) -> FakeExchange:
+    global last_exchange
+    last_exchange = FakeExchange(**EXCHANGE_OPTIONS)
+    return last_exchange
+
+
+def symbol_create(exchange_name: str, coin: str) -> str:
+    return f"{coin}-USD"
@@ -0,0 +1,282 @@
+"""
+Shared-Memory Market Data Bus
+=============================
+One feed daemon (feed_daemon.py) owns the market-data subscriptions and
+publishes mark price + the first N book levels (FEED_BUS_LEVELS) into a
+memory-mapped ring; every bot process on the same machine reads from it
+instead of subscribing itself.
+
+File layout (little endian, one file per symbol, /dev/shm by default):
+
+    header  72 B   magic, version, slots, levels, symbol, head, heartbeat
+    slot           seq, mark, exchange_ts, publish_ts,
+                   levels x (bid, bid_size), levels x (ask, ask_size)
+    ...            (slots entries, ring)
+
+Missing levels are written as price 0 and left out on read. Readers take
+the level count from the header; consumers that want more levels than
+the bus carries (microprice, SimExchange queue model) work with what is
+there, and main.py logs that at startup.
+
+Each slot is a seqlock: the writer sets the slot seq to 2n-1 (odd = write
+in progress), writes the payload, then sets it to 2n, and finally
+advances the header head to n. Readers unpack straight from the mapping
+(no intermediate buffer) and retry if the seq was odd or changed while
+reading. Single writer, any number of readers, no locks.
+"""
+
+import mmap
+import os
+import struct
+import time
+from typing import Optional, NamedTuple, Dict, Any, List, Tuple
+
+from market_data import extract_exchange_ts
+from metrics import metrics
+
+MAGIC = b"MMFEED02"
+VERSION = 2
+
+HEADER = struct.Struct("<8sIII32s4xQd")  # magic, version, slots, levels, symbol, (pad), head, heartbeat
+SLOT_SEQ = struct.Struct("<Q")
+HEAD = struct.Struct("<Qd")              # head, heartbeat (header offset 56)
+HEAD_OFFSET = 56
+SLOT_FIXED = 3                           # mark, exchange_ts, publish_ts
+
+_READ_RETRIES = 100
+
+
+def _payload(levels: int) -> struct.Struct:
+    return struct.Struct(f"<{SLOT_FIXED + 4 * levels}d")
+
+
+class FeedTick(NamedTuple):
+    """One market data update"""
+    seq: int
+    mark: float
+    exchange_ts: float   # 0.0 = unknown
+    publish_ts: float    # daemon receive/publish time
+    bids: List[List[float]]
+    asks: List[List[float]]
+
+    @property
+    def bid(self) -> float:
+        return self.bids[0][0] if self.bids else 0.0
+
+    @property
+    def ask(self) -> float:
+        return self.asks[0][0] if self.asks else 0.0
+
+
+def bus_path(template: str, symbol: str) -> str:
+    """FEED_BUS_PATH template -> file path ({symbol} is replaced)"""
+    return template.format(symbol=symbol.replace("/", "_").replace(":", "_"))
+
+
+def _flatten(levels: List, depth: int) -> List[float]:
+    """First `depth` [price, size] levels as a flat list, zero padded"""
+    flat = []
+    for level in levels[:depth]:
+        flat.append(float(level[0]))
+        flat.append(float(level[1]) if len(level) > 1 else 0.0)
+    flat.extend([0.0] * (2 * depth - len(flat)))
+    return flat
+
+
+def _levels(flat: Tuple[float, ...]) -> List[List[float]]:
+    return [[flat[i], flat[i + 1]] for i in range(0, len(flat), 2) if flat[i] > 0]
+
+
+class FeedBusWriter:
+    """Feed daemon side: single writer for one symbol"""
+
+    def __init__(self, path: str, symbol: str, slots: int = 256, levels: int = 5):
+        if levels < 1:
+            raise ValueError("feed bus needs at least 1 book level")
+        self.path = path
+        self.symbol = symbol
+        self.slots = slots
+        self.levels = levels
+        self._payload = _payload(levels)
+        self.slot_size = SLOT_SEQ.size + self._payload.size
+        size = HEADER.size + self.slot_size * slots
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"\0" * size)
+        self._file = open(tmp_path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, slots, levels, symbol.encode()[:32], 0, time.time())
+        os.replace(tmp_path, path)  # Readers never see a half-initialized file
+        self.head = 0
+        self._last: Optional[tuple] = None
+
+    def publish(self, mark: float, bids: List, asks: List, exchange_ts: float = 0.0) -> Optional[int]:
+        """Write one update if anything changed; returns its seq (None = unchanged)"""
+        book = (*_flatten(bids, self.levels), *_flatten(asks, self.levels))
+        values = (mark, exchange_ts, book)
+        now = time.time()
+        if values == self._last:
+            self.heartbeat(now)
+            return None
+        self._last = values
+        seq = self.head + 1
+        offset = HEADER.size + (seq % self.slots) * self.slot_size
+        mm = self._mm
+        SLOT_SEQ.pack_into(mm, offset, 2 * seq - 1)
+        self._payload.pack_into(mm, offset + SLOT_SEQ.size, mark, exchange_ts, now, *book)
+        SLOT_SEQ.pack_into(mm, offset, 2 * seq)
+        HEAD.pack_into(mm, HEAD_OFFSET, seq, now)
+        self.head = seq
+        metrics.inc("feed_bus.published")
+        return seq
+
+    def publish_book(self, mark_price: Any, orderbook: Dict[str, Any]) -> Optional[int]:
+        """publish() from get_mark_price() / get_orderbook() results"""
+        bids = orderbook.get("bids") or []
+        asks = orderbook.get("asks") or []
+        if not bids or not asks:
+            return None
+        return self.publish(float(mark_price), bids, asks, extract_exchange_ts(orderbook))
+
+    def heartbeat(self, now: Optional[float] = None) -> None:
+        """Mark the daemon alive without a new update"""
+        HEAD.pack_into(self._mm, HEAD_OFFSET, self.head, now if now is not None else time.time())
+
+    def close(self, unlink: bool = True) -> None:
+        self._mm.close()
+        self._file.close()
+        if unlink:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class FeedBusReader:
+    """Bot side: lock-free reader for one symbol"""
+
+    def __init__(self, path: str, symbol: Optional[str] = None):
+        self.path = path
+        self._open(symbol)
+
+    def _open(self, symbol: Optional[str]) -> None:
+        path = self.path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        magic, version, slots, levels, raw_symbol, _head, _hb = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a feed bus file (v{VERSION})")
+        self.slots = slots
+        self.levels = levels
+        self._payload = _payload(levels)
+        self.slot_size = SLOT_SEQ.size + self._payload.size
+        self.symbol = raw_symbol.rstrip(b"\0").decode()
+        if symbol is not None and self.symbol != symbol:
+            self.close()
+            raise ValueError(f"{path}: symbol {self.symbol!r}, expected {symbol!r}")
+
+    def reopen_if_replaced(self) -> bool:
+        """Remap if the daemon restarted (new file at path). Returns True if reopened."""
+        try:
+            if os.stat(self.path).st_ino == os.fstat(self._file.fileno()).st_ino:
+                return False
+        except OSError:
+            return False
+        fresh = FeedBusReader(self.path, self.symbol)  # Raises before touching the current mapping
+        self.close()
+        self._file, self._mm, self.slots = fresh._file, fresh._mm, fresh.slots
+        self.levels, self._payload, self.slot_size = fresh.levels, fresh._payload, fresh.slot_size
+        metrics.inc("feed_bus.reopened")
+        return True
+
+    def head(self) -> int:
+        """Latest published seq (0 = nothing yet)"""
+        return HEAD.unpack_from(self._mm, HEAD_OFFSET)[0]
+
+    def heartbeat_age_ms(self, now: Optional[float] = None) -> float:
+        """Time since the daemon last wrote (ms)"""
+        heartbeat = HEAD.unpack_from(self._mm, HEAD_OFFSET)[1]
+        return max(0.0, ((now if now is not None else time.time()) - heartbeat) * 1000)
+
+    def read(self, seq: int) -> Optional[FeedTick]:
+        """Update #seq, None if not published yet or already overwritten"""
+        if seq <= 0:
+            return None
+        offset = HEADER.size + (seq % self.slots) * self.slot_size
+        mm = self._mm
+        for _ in range(_READ_RETRIES):
+            before = SLOT_SEQ.unpack_from(mm, offset)[0]
+            if before & 1:
+                continue  # Write in progress
+            payload = self._payload.unpack_from(mm, offset + SLOT_SEQ.size)
+            if SLOT_SEQ.unpack_from(mm, offset)[0] != before:
+                continue  # Torn read
+            if before != 2 * seq:
+                return None  # Lapped (or not written yet)
+            mark, exchange_ts, publish_ts = payload[:SLOT_FIXED]
+            split = SLOT_FIXED + 2 * self.levels
+            return FeedTick(seq, mark, exchange_ts, publish_ts, _levels(payload[SLOT_FIXED:split]), _levels(payload[split:]))
+        metrics.inc("feed_bus.read_retries_exhausted")
+        return None
+
+    def latest(self) -> Optional[FeedTick]:
+        """Most recent update (retries if the writer laps us mid-read)"""
+        for _ in range(_READ_RETRIES):
+            seq = self.head()
+            if seq == 0:
+                return None
+            tick = self.read(seq)
+            if tick is not None:
+                return tick
+        return None
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+class FeedBusExchange:
+    """
+    Exchange proxy: get_mark_price / get_orderbook are served from the bus.
+    Falls back to the wrapped exchange while the daemon's heartbeat is
+    older than max_age_ms (daemon down) so the bot never quotes off a dead bus.
+    ws_client is None: the bot does not subscribe itself.
+    """
+
+    ws_client = None
+
+    def __init__(self, exchange, reader: FeedBusReader, max_age_ms: float = 1000.0):
+        self._exchange = exchange
+        self.reader = reader
+        self.max_age_ms = max_age_ms
+
+    def __getattr__(self, name: str):
+        return getattr(self._exchange, name)
+
+    def _tick(self) -> Optional[FeedTick]:
+        if self.reader.heartbeat_age_ms() > self.max_age_ms:
+            try:
+                reopened = self.reader.reopen_if_replaced()
+            except (OSError, ValueError):
+                reopened = False
+            if not reopened or self.reader.heartbeat_age_ms() > self.max_age_ms:
+                metrics.inc("feed_bus.fallbacks")
+                return None
+        return self.reader.latest()
+
+    async def get_mark_price(self, symbol: str):
+        tick = self._tick()
+        if tick is None:
+            return await self._exchange.get_mark_price(symbol)
+        return tick.mark
+
+    async def get_orderbook(self, symbol: str, *args, **kwargs):
+        tick = self._tick()
+        if tick is None:
+            return await self._exchange.get_orderbook(symbol, *args, **kwargs)
+        orderbook = {"bids": tick.bids, "asks": tick.asks}
+        if tick.exchange_ts > 0:
+            orderbook["timestamp"] = tick.exchange_ts
+        return orderbook
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Market Data Feed Daemon
+=======================
+Owns the market-data WS subscriptions and publishes mark price + top of
+book into the shared-memory bus (feed_bus.py). Run one per machine;
+every bot with FEED_BUS_PATH set reads from it instead of subscribing.
+
+Usage:
+    python feed_daemon.py            # COIN from config.py
+    python feed_daemon.py BTC ETH    # several symbols, one bus file each
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import time
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+from exchange_factory import create_exchange, symbol_create
+from config import (
+    EXCHANGE, COIN,
+    FEED_BUS_PATH, FEED_BUS_SLOTS, FEED_BUS_LEVELS, FEED_DAEMON_POLL_MS,
+    EXCHANGE_TIMEOUT_DEFAULT,
+    RUNTIME_PROFILE,
+)
+from deadlines import with_deadline
+from feed_bus import FeedBusWriter, bus_path
+from metrics import metrics
+from plain_console import PlainConsole
+import runtime_profile
+
+load_dotenv()
+
+console = PlainConsole()
+
+STANDX_KEY = SimpleNamespace(
+    wallet_address=os.getenv("WALLET_ADDRESS"),
+    chain='bsc',
+    evm_private_key=os.getenv("PRIVATE_KEY"),
+    open_browser=True,
+)
+
+DEFAULT_BUS_PATH = "/dev/shm/standx_feed_{symbol}.bin"
+STATUS_INTERVAL = 60  # Status line interval (sec)
+
+
+async def pump(exchange, symbol: str, writer: FeedBusWriter, poll_sec: float) -> None:
+    """Copy the WS cache into the bus; heartbeat only while reads succeed"""
+    errors = 0
+    while True:
+        try:
+            mark_price, orderbook = await asyncio.gather(
+                with_deadline(exchange.get_mark_price(symbol), "get_mark_price", EXCHANGE_TIMEOUT_DEFAULT),
+                with_deadline(exchange.get_orderbook(symbol), "get_orderbook", EXCHANGE_TIMEOUT_DEFAULT),
+            )
+            if float(mark_price) > 0:
+                writer.publish_book(mark_price, orderbook)
+            errors = 0
+        except Exception as e:
+            errors += 1
+            metrics.inc("feed_daemon.errors")
+            if errors == 1 or errors % 100 == 0:
+                console.print(f"[{symbol}] read failed ({errors}x): {e}")
+        await asyncio.sleep(poll_sec)
+
+
+async def main() -> None:
+    coins = sys.argv[1:] or [COIN]
+    template = FEED_BUS_PATH or DEFAULT_BUS_PATH
+
+    console.print(f"Feed daemon | {EXCHANGE} | {', '.join(coins)}")
+    try:
+        # systemd stop: unwind normally so bus files are removed
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+    exchange = await create_exchange(EXCHANGE, STANDX_KEY)
+    if runtime_profile.active.name != "default":
+        runtime_profile.patch_json()
+        console.print(runtime_profile.active.summary_line())
+    writers = {}
+    try:
+        for coin in coins:
+            symbol = symbol_create(EXCHANGE, coin)
+            if exchange.ws_client:
+                await exchange.ws_client.subscribe_price(symbol)
+                await exchange.ws_client.subscribe_orderbook(symbol)
+            path = bus_path(template, symbol)
+            writers[symbol] = FeedBusWriter(path, symbol, slots=FEED_BUS_SLOTS, levels=FEED_BUS_LEVELS)
+            console.print(f"  {symbol} -> {path}")
+
+        tasks = [
+            asyncio.create_task(pump(exchange, symbol, writer, FEED_DAEMON_POLL_MS / 1000))
+            for symbol, writer in writers.items()
+        ]
+        start = time.time()
+        while True:
+            await asyncio.sleep(STATUS_INTERVAL)
+            published = metrics.get("feed_bus.published")
+            elapsed = time.time() - start
+            console.print(
+                f"Published {published:.0f} updates ({published / elapsed:.1f}/s), "
+                f"errors {metrics.get('feed_daemon.errors'):.0f}, "
+                f"fallbacks {exchange.get_fallback_stats()}"
+            )
+            if any(t.done() for t in tasks):
+                break
+    finally:
+        for writer in writers.values():
+            writer.close()
+        await exchange.close()
+
+
+if __name__ == "__main__":
+    try:
+        runtime_profile.apply_profile(RUNTIME_PROFILE)
+        asyncio.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
@@ -0,0 +1,225 @@
+"""
+Fill Ledger
+===========
+Realized PnL, fees and maker/taker split computed incrementally from fill
+events, persisted to SQLite (WAL) in batched transactions by a background
+thread, so the trading loop never waits on disk.
+
+- record() is O(1): updates running totals + the ledger's own position
+  (average entry price) and queues the row
+- the writer thread commits queued fills together with the updated totals
+  every flush interval (or sooner when the batch is full), one transaction
+- on startup the totals row is loaded, so lifetime figures and the open
+  position survive restarts (RESTART_INTERVAL os.execv included) without
+  scanning the fills table
+- totals are kept per ledger key (mode + symbol): TEST and LIVE never mix
+
+Fill sources: TEST mode with SIM_FILLS gets exact fills from SimExchange.
+LIVE derives them from what the bot observes (position entry when a
+position is detected, close order prices while closing).
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, List, Tuple, Callable
+
+from fill_model import SimPosition
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ledger TEXT NOT NULL,
+    ts REAL NOT NULL,
+    order_id TEXT,
+    side TEXT NOT NULL,
+    size REAL NOT NULL,
+    price REAL NOT NULL,
+    maker INTEGER NOT NULL,
+    fee REAL NOT NULL,
+    realized_pnl REAL NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS fills_ledger_ts ON fills (ledger, ts);
+CREATE TABLE IF NOT EXISTS totals (
+    ledger TEXT PRIMARY KEY,
+    fills INTEGER NOT NULL,
+    maker_fills INTEGER NOT NULL,
+    taker_fills INTEGER NOT NULL,
+    volume REAL NOT NULL,
+    maker_volume REAL NOT NULL,
+    taker_volume REAL NOT NULL,
+    notional REAL NOT NULL,
+    fees REAL NOT NULL,
+    realized_pnl REAL NOT NULL,
+    position_size REAL NOT NULL,
+    entry_price REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+TOTAL_FIELDS = ("fills", "maker_fills", "taker_fills", "volume", "maker_volume", "taker_volume",
+                "notional", "fees", "realized_pnl")
+
+
+class FillLedger:
+    """Running fill totals + batched SQLite persistence"""
+
+    def __init__(self, path: str, ledger: str, maker_fee_bps: float = 0.0, taker_fee_bps: float = 0.0,
+                 flush_interval: float = 1.0, batch_size: int = 500):
+        self.path = path
+        self.ledger = ledger
+        self.maker_fee_bps = maker_fee_bps
+        self.taker_fee_bps = taker_fee_bps
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self.totals: Dict[str, float] = {name: 0 for name in TOTAL_FIELDS}
+        self.position = SimPosition()
+        self.listeners: List[Callable[[float, float], None]] = []  # realized_pnl, fee (loop thread)
+        self.flush_errors = 0
+        self.last_error = ""
+
+        self._pending: deque = deque()
+        self._lock = threading.Lock()       # totals/position snapshot vs writer thread
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+            row = conn.execute(
+                f"SELECT {', '.join(TOTAL_FIELDS)}, position_size, entry_price FROM totals WHERE ledger = ?",
+                (ledger,),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row:
+            self.totals = dict(zip(TOTAL_FIELDS, row[:len(TOTAL_FIELDS)]))
+            self.position.size, self.position.entry_price = row[-2], row[-1]
+            self.position.realized_pnl = self.totals["realized_pnl"]
+        self.session_start = dict(self.totals)
+
+        self._thread = threading.Thread(target=self._writer, name="fill-ledger", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ---------- hot path ----------
+
+    def record(self, side: str, size: float, price: float, maker: bool,
+               order_id: str = "", source: str = "", ts: Optional[float] = None) -> float:
+        """Apply one fill, return its realized PnL (before fees)"""
+        if size <= 0 or price <= 0:
+            return 0.0
+        notional = size * price
+        fee = notional * (self.maker_fee_bps if maker else self.taker_fee_bps) / 10000
+        with self._lock:
+            realized = self.position.apply(side, size, price)
+            t = self.totals
+            t["fills"] += 1
+            t["volume"] += size
+            t["notional"] += notional
+            t["fees"] += fee
+            t["realized_pnl"] += realized
+            if maker:
+                t["maker_fills"] += 1
+                t["maker_volume"] += size
+            else:
+                t["taker_fills"] += 1
+                t["taker_volume"] += size
+            self._pending.append((self.ledger, ts or time.time(), order_id, side, size, price,
+                                  int(maker), fee, realized, source))
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+        for listener in self.listeners:
+            listener(realized, fee)
+        return realized
+
+    def sync_position(self, side: str, size: float, entry_price: float, mark_price: float, source: str = "sync") -> None:
+        """
+        Record the fills implied by an exchange position the ledger has not seen
+        (LIVE: resting orders filled between polls). Added exposure is booked as
+        maker at the price that reproduces the exchange entry price; anything
+        else (reduced / flipped outside the bot) as taker at mark.
+        """
+        target = size if side.lower() in ("long", "buy") else -size
+        current = self.position.size
+        delta = target - current
+        if abs(delta) <= 1e-12:
+            return
+        fill_side = "buy" if delta > 0 else "sell"
+        adds = current == 0 or (current > 0) == (delta > 0)
+        if adds and entry_price > 0:
+            # abs(target) * entry = abs(current) * old_entry + abs(delta) * fill_price
+            price = (abs(target) * entry_price - abs(current) * self.position.entry_price) / abs(delta)
+            self.record(fill_side, abs(delta), price if price > 0 else entry_price, maker=True, source=source)
+        else:
+            self.record(fill_side, abs(delta), mark_price, maker=False, source=source)
+
+    # ---------- queries (running totals, no I/O) ----------
+
+    @property
+    def net_pnl(self) -> float:
+        return self.totals["realized_pnl"] - self.totals["fees"]
+
+    def session(self) -> Dict[str, float]:
+        """Totals since this process started"""
+        return {k: self.totals[k] - self.session_start[k] for k in TOTAL_FIELDS}
+
+    def summary_line(self) -> str:
+        t = self.totals
+        return (
+            f"Ledger: {t['fills']:.0f} fills (maker {t['maker_fills']:.0f} / taker {t['taker_fills']:.0f})  "
+            f"vol {t['volume']:.4f}  fees ${t['fees']:.2f}  realized ${t['realized_pnl']:+.2f}  net ${self.net_pnl:+.2f}"
+        )
+
+    # ---------- persistence (writer thread) ----------
+
+    def _take_batch(self) -> Tuple[List[tuple], tuple]:
+        with self._lock:
+            rows = list(self._pending)
+            self._pending.clear()
+            totals = (self.ledger, *(self.totals[k] for k in TOTAL_FIELDS),
+                      self.position.size, self.position.entry_price, time.time())
+        return rows, totals
+
+    def _flush(self, conn: sqlite3.Connection) -> None:
+        rows, totals = self._take_batch()
+        if not rows:
+            return
+        try:
+            with conn:  # One transaction: fills + totals stay consistent
+                conn.executemany(
+                    "INSERT INTO fills (ledger, ts, order_id, side, size, price, maker, fee, realized_pnl, source) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO totals (ledger, {', '.join(TOTAL_FIELDS)}, position_size, entry_price, updated_at) "
+                    f"VALUES ({', '.join('?' * (len(TOTAL_FIELDS) + 4))})", totals)
+        except sqlite3.Error as e:
+            self.flush_errors += 1
+            self.last_error = str(e)
+            with self._lock:
+                self._pending.extendleft(reversed(rows))  # Retry with the next batch
+
+    def _writer(self) -> None:
+        conn = self._connect()
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self._flush(conn)
+            self._flush(conn)
+        finally:
+            conn.close()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending fills and stop the writer (call before exit / execv)"""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
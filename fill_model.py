@@ -0,0 +1,320 @@
+"""
+Simulated Fills (TEST mode)
+===========================
+Queue-position fill model for simulated orders, plus an exchange facade so
+TEST mode goes through the same position / auto-close flow as LIVE.
+
+QueueFillModel (pure, no I/O - usable at full tick rate and on replayed data):
+- on placement, queue ahead = book size already resting at our price
+  (0 if we improve the price)
+- on each book update the size at our price is compared with the last one:
+    increase           new orders join behind us, queue unchanged
+    decrease           cancels spread evenly over the level shrink our queue
+                       proportionally; at the touch, a share (trade_share)
+                       is assumed to be trades, which eat the queue from
+                       the front and then fill us (partial fills)
+    level traded away  touch level gone and price moved through us: filled
+    book crossed       opposite best price at/through our price: filled
+- on_trade() (if a trade feed is available) consumes the queue exactly
+
+SimExchange wraps the real exchange: market data passes through, orders /
+positions are simulated (get_position, create_order incl. market and
+reduce-only, cancel_order(s), close_position, get_open_orders). A resting
+reduce-only order never fills beyond the opposing position and is
+cancelled once there is nothing left to reduce.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Callable, Tuple
+
+_PRICE_TOL = 1e-9  # Relative tolerance for "same price level"
+
+
+@dataclass
+class QueuedOrder:
+    """Resting simulated order with its estimated queue position"""
+    id: str
+    side: str              # "buy" / "sell"
+    price: float
+    size: float
+    filled: float = 0.0
+    queue_ahead: float = 0.0
+    level_size: float = 0.0    # Book size at our price at last update
+    reduce_only: bool = False
+
+    @property
+    def remaining(self) -> float:
+        return self.size - self.filled
+
+
+def _same_price(a: float, b: float) -> bool:
+    return abs(a - b) <= _PRICE_TOL * max(abs(a), abs(b))
+
+
+def level_size(levels: List[List[float]], price: float, side: str) -> float:
+    """Size resting at price on one side (levels best-first)"""
+    for level in levels:
+        px = float(level[0])
+        if _same_price(px, price):
+            return float(level[1]) if len(level) > 1 else 0.0
+        # Sorted best-first: stop once past our price
+        if (side == "buy" and px < price) or (side == "sell" and px > price):
+            break
+    return 0.0
+
+
+class QueueFillModel:
+    """Queue position + fills for resting simulated orders"""
+
+    def __init__(self, trade_share: float = 0.5):
+        """
+        Args:
+            trade_share: Share of a size decrease at the touch assumed to be
+                trades (rest = cancels). 1.0 = optimistic, 0.0 = fill only on
+                trade-through / crossing.
+        """
+        self.trade_share = trade_share
+        self.orders: Dict[str, QueuedOrder] = {}
+        self.bids: List[List[float]] = []
+        self.asks: List[List[float]] = []
+
+    def add(self, order: QueuedOrder) -> None:
+        """Start tracking an order; queue ahead = current size at its price"""
+        levels = self.bids if order.side == "buy" else self.asks
+        order.level_size = level_size(levels, order.price, order.side)
+        order.queue_ahead = order.level_size
+        self.orders[order.id] = order
+
+    def remove(self, order_id: str) -> Optional[QueuedOrder]:
+        return self.orders.pop(order_id, None)
+
+    def on_book(self, bids: List[List[float]], asks: List[List[float]]) -> List[Tuple[QueuedOrder, float, float]]:
+        """
+        Apply a book update. Returns fills as (order, size, price);
+        fully filled orders are removed.
+        """
+        self.bids, self.asks = bids, asks
+        if not self.orders:
+            return []
+        best_bid = float(bids[0][0]) if bids else 0.0
+        best_ask = float(asks[0][0]) if asks else 0.0
+        fills = []
+
+        for order in list(self.orders.values()):
+            if order.side == "buy":
+                levels, best_same, best_opp = bids, best_bid, best_ask
+                crossed = best_opp > 0 and best_opp <= order.price
+                passed = best_same > 0 and best_same < order.price
+                at_touch = best_same > 0 and _same_price(best_same, order.price)
+            else:
+                levels, best_same, best_opp = asks, best_ask, best_bid
+                crossed = best_opp > 0 and best_opp >= order.price
+                passed = best_same > 0 and best_same > order.price
+                at_touch = best_same > 0 and _same_price(best_same, order.price)
+
+            prev = order.level_size
+            now_size = level_size(levels, order.price, order.side)
+            order.level_size = now_size
+            fill = 0.0
+
+            if crossed or (prev > 0 and now_size == 0 and passed):
+                fill = order.remaining  # Book crossed us / our level traded away
+            elif now_size < prev:
+                decrease = prev - now_size
+                trades = decrease * self.trade_share if at_touch else 0.0
+                cancels = decrease - trades
+                order.queue_ahead = max(0.0, order.queue_ahead - cancels * order.queue_ahead / prev)
+                if trades > order.queue_ahead:
+                    fill = min(order.remaining, trades - order.queue_ahead)
+                order.queue_ahead = max(0.0, order.queue_ahead - trades)
+
+            if fill > 0:
+                fills.append(self._fill(order, fill))
+        return fills
+
+    def on_trade(self, price: float, size: float, aggressor: str) -> List[Tuple[QueuedOrder, float, float]]:
+        """Apply a trade print (aggressor "sell" hits bids, "buy" lifts asks)"""
+        fills = []
+        for order in list(self.orders.values()):
+            if aggressor == "sell" and order.side == "buy" and price <= order.price:
+                through = price < order.price
+            elif aggressor == "buy" and order.side == "sell" and price >= order.price:
+                through = price > order.price
+            else:
+                continue
+            if through:
+                fill = order.remaining
+            else:
+                fill = min(order.remaining, max(0.0, size - order.queue_ahead))
+                order.queue_ahead = max(0.0, order.queue_ahead - size)
+            if fill > 0:
+                fills.append(self._fill(order, fill))
+        return fills
+
+    def _fill(self, order: QueuedOrder, size: float) -> Tuple[QueuedOrder, float, float]:
+        order.filled += size
+        if order.remaining <= 1e-12:
+            self.orders.pop(order.id, None)
+        return order, size, order.price
+
+
+class SimPosition:
+    """Net position from simulated fills (average entry price)"""
+
+    def __init__(self):
+        self.size = 0.0          # Signed: + long, - short
+        self.entry_price = 0.0
+        self.realized_pnl = 0.0
+
+    def apply(self, side: str, size: float, price: float) -> float:
+        """Apply a fill, return realized PnL of this fill"""
+        signed = size if side == "buy" else -size
+        realized = 0.0
+        if self.size == 0 or (self.size > 0) == (signed > 0):
+            total = abs(self.size) + size
+            self.entry_price = (self.entry_price * abs(self.size) + price * size) / total
+            self.size += signed
+        else:
+            closed = min(abs(self.size), size)
+            direction = 1 if self.size > 0 else -1
+            realized = (price - self.entry_price) * closed * direction
+            self.size += signed
+            if abs(self.size) <= 1e-12:
+                self.size = 0.0
+                self.entry_price = 0.0
+            elif (self.size > 0) != (direction > 0):
+                self.entry_price = price  # Flipped: remainder opened at fill price
+        self.realized_pnl += realized
+        return realized
+
+    def as_dict(self, mark_price: float) -> Optional[Dict[str, Any]]:
+        """Position in the exchange wrapper's format (None when flat)"""
+        if self.size == 0:
+            return None
+        return {
+            "size": abs(self.size),
+            "side": "long" if self.size > 0 else "short",
+            "entry_price": self.entry_price,
+            "unrealized_pnl": (mark_price - self.entry_price) * self.size if mark_price > 0 else 0.0,
+        }
+
+
+class SimExchange:
+    """
+    Exchange facade for TEST mode: market data from the real exchange,
+    orders / fills / position simulated with QueueFillModel.
+    """
+
+    def __init__(self, exchange, symbol: str, trade_share: float = 0.5):
+        self._exchange = exchange
+        self.symbol = symbol
+        self.model = QueueFillModel(trade_share=trade_share)
+        self.position = SimPosition()
+        self.mark_price = 0.0
+        self.fill_count = 0
+        self.fill_listeners: List[Callable[[str, str, float, float, bool], None]] = []  # id, side, size, price, maker
+
+    def __getattr__(self, name: str):
+        return getattr(self._exchange, name)
+
+    # ---------- market data (feeds the model) ----------
+
+    async def get_mark_price(self, symbol: str):
+        raw = await self._exchange.get_mark_price(symbol)
+        self.mark_price = float(raw)
+        return raw
+
+    async def get_orderbook(self, symbol: str, *args, **kwargs):
+        orderbook = await self._exchange.get_orderbook(symbol, *args, **kwargs)
+        self.on_book(orderbook.get("bids") or [], orderbook.get("asks") or [])
+        return orderbook
+
+    def on_book(self, bids, asks) -> None:
+        for order, size, price in self.model.on_book(bids, asks):
+            self._resting_fill(order, size, price)
+
+    def on_trade(self, price: float, size: float, aggressor: str) -> None:
+        for order, fill_size, fill_price in self.model.on_trade(price, size, aggressor):
+            self._resting_fill(order, fill_size, fill_price)
+
+    def _reducible(self, side: str) -> float:
+        """Position size an order on `side` can reduce (0 if it would only add)"""
+        return max(0.0, self.position.size if side == "sell" else -self.position.size)
+
+    def _resting_fill(self, order: QueuedOrder, size: float, price: float) -> None:
+        if order.reduce_only:
+            size = min(size, self._reducible(order.side))
+        if size > 0:
+            self._apply_fill(order.id, order.side, size, price, maker=True)
+        if order.reduce_only and self._reducible(order.side) <= 0:
+            self.model.remove(order.id)  # Nothing left to reduce: the venue cancels it
+
+    def _apply_fill(self, order_id: str, side: str, size: float, price: float, maker: bool) -> None:
+        self.position.apply(side, size, price)
+        self.fill_count += 1
+        for listener in self.fill_listeners:
+            listener(order_id, side, size, price, maker)
+
+    def _best(self, side: str) -> float:
+        """Price a marketable order on `side` executes at"""
+        levels = self.model.asks if side == "buy" else self.model.bids
+        if levels:
+            return float(levels[0][0])
+        return self.mark_price
+
+    # ---------- account ----------
+
+    async def get_position(self, symbol: str):
+        # Close loops poll only the position: refresh the book so resting close orders can fill
+        await self.get_orderbook(symbol)
+        return self.position.as_dict(self.mark_price)
+
+    async def get_open_orders(self, symbol: str):
+        return [
+            {"client_order_id": o.id, "side": o.side, "price": o.price, "size": o.remaining}
+            for o in self.model.orders.values()
+        ]
+
+    # ---------- orders ----------
+
+    async def create_order(self, symbol: str, side: str, amount: float, price: Optional[float] = None,
+                           order_type: str = "limit", client_order_id: Optional[str] = None,
+                           is_reduce_only: bool = False, **_kwargs) -> Dict[str, Any]:
+        order_id = client_order_id or f"SIMX-{time.time_ns()}"
+        if is_reduce_only:
+            amount = min(amount, self._reducible(side))
+            if amount <= 0:
+                return {"code": 1, "message": "reduce-only: no position to reduce"}
+
+        best = self._best(side)
+        marketable = order_type == "market" or (
+            price is not None and best > 0 and (price >= best if side == "buy" else price <= best))
+        if marketable:
+            self._apply_fill(order_id, side, amount, best, maker=False)
+            return {"code": 0, "message": "success"}
+
+        self.model.add(QueuedOrder(id=order_id, side=side, price=float(price), size=amount, reduce_only=is_reduce_only))
+        return {"code": 0, "message": "success"}
+
+    async def cancel_order(self, client_order_id: Optional[str] = None, **_kwargs):
+        self.model.remove(client_order_id)
+        return {"code": 0}
+
+    async def cancel_orders(self, symbol: Optional[str] = None, open_orders: Optional[List[Dict]] = None):
+        ids = [o.get("client_order_id") for o in open_orders] if open_orders else list(self.model.orders)
+        for order_id in ids:
+            self.model.remove(order_id)
+        return []
+
+    async def close_position(self, symbol: str, position: Dict[str, Any]):
+        if self.position.size == 0:
+            return {}
+        side = "sell" if self.position.size > 0 else "buy"
+        self._apply_fill(f"CLOSE-{time.time_ns()}", side, abs(self.position.size), self._best(side), maker=False)
+        return {"code": 0}
+
+    def summary_line(self) -> str:
+        """Simulated fills line for dashboard / snapshot"""
+        return (f"SimFills: {self.fill_count}  resting {len(self.model.orders)}  "
+                f"pos {self.position.size:+.4f}  realized ${self.position.realized_pnl:+.2f}")
@@ -0,0 +1,238 @@
+"""
+Instrument Metadata & Quantization
+==================================
+Tick size, lot size and minimum order size / notional of the traded symbol,
+fetched once from the exchange wrapper, cached on disk with a TTL, and used
+to snap every order to what the venue accepts (no wasted round trip on a
+rejected quote).
+
+Quantization is integer arithmetic on tick / lot counts: a price becomes an
+integer number of ticks and is converted back with one int / int division,
+which Python rounds correctly, so the float sent is the float nearest to
+the exact on-tick decimal.
+
+- quotes round passive: buy down, sell up (never closer to the touch than asked)
+- closes round aggressive: sell down, buy up (fill at least as fast)
+- sizes round down to the lot; below min size / min notional -> 0
+
+Metadata lookup order: config overrides (INSTRUMENT_*), disk cache
+(INSTRUMENT_CACHE_FILE, INSTRUMENT_CACHE_TTL), exchange wrapper (first
+method in METADATA_METHODS that exists), built-in defaults.
+"""
+
+import json
+import math
+import os
+import time
+from typing import Optional, Dict, Any, Tuple
+
+# Exchange wrapper methods tried for symbol metadata (sync or async, called with the symbol)
+METADATA_METHODS = ("get_symbol_info", "get_market_info", "get_instrument", "get_contract_info", "get_symbol_config")
+
+# Payload key aliases (checked at the top level and one level down)
+TICK_KEYS = ("tick_size", "price_tick", "price_tick_size", "tickSize", "price_increment", "min_price_increment")
+LOT_KEYS = ("lot_size", "step_size", "qty_step", "size_increment", "stepSize", "qty_tick_size", "min_qty_increment")
+MIN_SIZE_KEYS = ("min_size", "min_qty", "min_order_size", "minQty", "min_order_qty")
+MIN_NOTIONAL_KEYS = ("min_notional", "min_order_value", "minNotional", "min_value")
+
+DEFAULT_TICK_SIZE = 0.01
+
+_EPS = 1e-9  # Tolerance (in ticks / lots) for values already on the grid
+
+
+def _decimals(step: float) -> int:
+    """Decimal places of a step size (0.01 -> 2, 5 -> 0)"""
+    text = f"{step:.12f}".rstrip("0")
+    return len(text.split(".")[1]) if "." in text else 0
+
+
+class Instrument:
+    """Symbol trading rules with precomputed integer quantization"""
+
+    __slots__ = ("symbol", "tick_size", "lot_size", "min_size", "min_notional", "source",
+                 "price_decimals", "size_decimals", "_tick_units", "_price_scale", "_lot_units", "_size_scale")
+
+    def __init__(self, symbol: str, tick_size: float, lot_size: float, min_size: float = 0.0,
+                 min_notional: float = 0.0, source: str = "default"):
+        if tick_size <= 0 or lot_size <= 0:
+            raise ValueError(f"{symbol}: tick / lot size must be > 0 (got {tick_size} / {lot_size})")
+        self.symbol = symbol
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+        self.min_size = min_size
+        self.min_notional = min_notional
+        self.source = source
+        # step = units / scale, both integers
+        self.price_decimals = _decimals(tick_size)
+        self._price_scale = 10 ** self.price_decimals
+        self._tick_units = round(tick_size * self._price_scale)
+        self.size_decimals = _decimals(lot_size)
+        self._size_scale = 10 ** self.size_decimals
+        self._lot_units = round(lot_size * self._size_scale)
+
+    # ---------- prices ----------
+
+    def price_ticks(self, price: float, round_up: bool) -> int:
+        """Price as an integer number of ticks"""
+        ticks = price / self.tick_size
+        return math.ceil(ticks - _EPS) if round_up else math.floor(ticks + _EPS)
+
+    def ticks_price(self, ticks: int) -> float:
+        return ticks * self._tick_units / self._price_scale
+
+    def round_price(self, price: float, side: str, passive: bool = True) -> float:
+        """Snap to the tick grid (passive: buy down / sell up, aggressive: the opposite)"""
+        round_up = (side == "sell") == passive
+        return self.ticks_price(self.price_ticks(price, round_up))
+
+    def quantize_quotes(self, buy_price: float, sell_price: float) -> Tuple[float, float]:
+        """Passive quotes on the tick grid"""
+        return (self.ticks_price(self.price_ticks(buy_price, False)),
+                self.ticks_price(self.price_ticks(sell_price, True)))
+
+    # ---------- sizes ----------
+
+    def quantize_size(self, size: float, price: float = 0.0) -> float:
+        """Round down to the lot; 0 if below min size or (with price) min notional"""
+        lots = math.floor(size / self.lot_size + _EPS)
+        size = lots * self._lot_units / self._size_scale
+        if size <= 0 or size < self.min_size - _EPS * self.lot_size:
+            return 0.0
+        if price > 0 and self.min_notional > 0 and size * price < self.min_notional:
+            return 0.0
+        return size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"symbol": self.symbol, "tick_size": self.tick_size, "lot_size": self.lot_size,
+                "min_size": self.min_size, "min_notional": self.min_notional}
+
+    def summary_line(self) -> str:
+        return (f"{self.symbol}: tick {self.tick_size:g}  lot {self.lot_size:g}  "
+                f"min size {self.min_size:g}  min notional {self.min_notional:g}  ({self.source})")
+
+
+# ==================== Metadata lookup ====================
+
+def _find(payload: Any, keys: Tuple[str, ...]) -> Optional[float]:
+    """First positive numeric value under any alias (top level, then nested dicts)"""
+    if not isinstance(payload, dict):
+        return None
+    nested = []
+    for key, value in payload.items():
+        if key in keys:
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                continue
+            if number > 0:
+                return number
+        elif isinstance(value, dict):
+            nested.append(value)
+    for value in nested:
+        found = _find(value, keys)
+        if found is not None:
+            return found
+    return None
+
+
+def parse_metadata(payload: Any) -> Dict[str, float]:
+    """Exchange symbol info -> {tick_size, lot_size, min_size, min_notional} (only keys found)"""
+    if isinstance(payload, list) and payload:
+        payload = payload[0]
+    found = {}
+    for name, keys in (("tick_size", TICK_KEYS), ("lot_size", LOT_KEYS),
+                       ("min_size", MIN_SIZE_KEYS), ("min_notional", MIN_NOTIONAL_KEYS)):
+        value = _find(payload, keys)
+        if value is not None:
+            found[name] = value
+    return found
+
+
+async def fetch_metadata(exchange, symbol: str) -> Dict[str, float]:
+    """Ask the exchange wrapper for symbol metadata ({} if it has no such method)"""
+    for name in METADATA_METHODS:
+        method = getattr(exchange, name, None)
+        if not callable(method):
+            continue
+        result = method(symbol)
+        if hasattr(result, "__await__"):
+            result = await result
+        found = parse_metadata(result)
+        if found:
+            return found
+    return {}
+
+
+def load_cache(path: str, key: str, ttl: float) -> Optional[Dict[str, float]]:
+    if ttl <= 0 or not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f).get(key)
+    except (OSError, ValueError, AttributeError):
+        return None
+    if not entry or time.time() >= float(entry.get("expires_at", 0)):
+        return None
+    return entry.get("metadata")
+
+
+def save_cache(path: str, key: str, metadata: Dict[str, float], ttl: float) -> None:
+    """Merge one entry into the cache file (atomic replace)"""
+    if ttl <= 0 or not path:
+        return
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            data = {}
+    except (OSError, ValueError):
+        data = {}
+    data[key] = {"metadata": metadata, "saved_at": time.time(), "expires_at": time.time() + ttl}
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+async def load_instrument(
+    exchange,
+    exchange_name: str,
+    symbol: str,
+    cache_file: str,
+    cache_ttl: float,
+    overrides: Dict[str, Optional[float]],
+    default_lot_size: float,
+) -> Instrument:
+    """
+    Build the Instrument for symbol. overrides: config values (None = not set).
+    Fetch errors fall back to defaults; the caller logs `instrument.source`.
+    """
+    key = f"{exchange_name}:{symbol}"
+    metadata = load_cache(cache_file, key, cache_ttl)
+    source = "cache"
+    if metadata is None:
+        source = "exchange"
+        try:
+            metadata = await fetch_metadata(exchange, symbol)
+        except Exception:
+            metadata = {}
+        if metadata:
+            try:
+                save_cache(cache_file, key, metadata, cache_ttl)
+            except OSError:
+                pass
+        else:
+            source = "default"
+
+    values = {
+        "tick_size": DEFAULT_TICK_SIZE,
+        "lot_size": default_lot_size,
+        "min_size": 0.0,
+        "min_notional": 0.0,
+    }
+    values.update(metadata)
+    overridden = {k: v for k, v in overrides.items() if v is not None}
+    if overridden:
+        values.update(overridden)
+        source += "+config"
+    return Instrument(symbol, source=source, **values)
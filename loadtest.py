@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Feed Load Test
+==============
+Drives the real main() loop (TEST mode, headless, in-process) with a
+synthetic WS feed at increasing message rates and reports where it stops
+keeping up.
+
+The feed runs in the bot's event loop like the exchange WS client does:
+every message is a JSON string that is decoded and written into a
+latest-value cache, which get_mark_price() / get_orderbook() read. Messages
+arrive in batches (whatever accumulated since the feed task last ran); a
+backlog above --buffer messages is dropped, like an overflowing socket
+buffer, and other tasks get a turn every FEED_CHUNK messages.
+
+Per rate step:
+    rate        achieved msg/s vs target
+    dropped     messages lost to backlog overflow
+    coalesced   updates overwritten before the bot read them (by design:
+                the bot only needs the latest value)
+    decision    time from arrival of the mark price used to the end of the
+                iteration that acted on it (p50 / p99)
+    iteration   loop iteration time (IterationBudget span)
+    loop lag    event loop scheduling delay (5ms probe)
+    memory      RSS at step end (+ tracemalloc current/peak with --tracemalloc)
+
+A step is degraded when decision p99 exceeds --latency-factor x the first
+step's p99 (but at least one REFRESH_INTERVAL), when messages are dropped,
+or when the achieved rate is below 95% of the target. The highest rate before the first degraded step is the
+sustainable rate.
+
+Usage:
+    python loadtest.py                                   # 1k..50k msg/s, normal profile
+    python loadtest.py --profile cascade --step-sec 20
+    python loadtest.py --rates 5000,10000,20000 --no-stop --output load.json
+    python loadtest.py --runtime fast                    # uvloop + orjson / ujson (runtime_profile.py)
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, Any, List, Optional
+
+import runtime_profile
+from benchmark import REPO_DIR, load_config
+
+DEFAULT_RATES = "1000,2000,5000,10000,20000,50000"
+LAG_PROBE_SEC = 0.005
+FEED_WAKE_SEC = 0.001
+FEED_CHUNK = 256    # Messages decoded per event loop turn
+SETTLE_SHARE = 0.1  # First 10% of each step is not measured (rate change settles)
+
+# Volatility per second (bps), drift per second (bps), jumps per second and size (bps),
+# book spread (ticks) and level size scale (cascade: wide, thin book)
+PROFILES: Dict[str, Dict[str, float]] = {
+    "calm":     {"vol_bps": 2, "drift_bps": 0, "jumps_per_sec": 0, "jump_bps": 0, "spread_ticks": 1, "size_scale": 1.0},
+    "normal":   {"vol_bps": 8, "drift_bps": 0, "jumps_per_sec": 0.05, "jump_bps": 5, "spread_ticks": 1, "size_scale": 1.0},
+    "volatile": {"vol_bps": 25, "drift_bps": 0, "jumps_per_sec": 0.5, "jump_bps": 10, "spread_ticks": 3, "size_scale": 0.5},
+    "cascade":  {"vol_bps": 60, "drift_bps": -40, "jumps_per_sec": 2, "jump_bps": 25, "spread_ticks": 10, "size_scale": 0.2},
+}
+
+
+def rss_mb() -> float:
+    """Current resident set size (MB); peak RSS where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class LoadFeedExchange:
+    """
+    Synthetic high-rate feed + latest-value cache behind the exchange API.
+    Orders / account calls go to the wrapped FakeExchange.
+    """
+
+    def __init__(self, exchange, profile: Dict[str, float], depth: int = 5, tick: float = 0.1,
+                 buffer: int = 10000, seed: int = 0):
+        self._exchange = exchange
+        self.ws_client = exchange.ws_client
+        self.profile = profile
+        self.depth = depth
+        self.tick = tick
+        self.buffer = buffer
+        self.rng = random.Random(seed)
+        self.mark = exchange.mark_price
+
+        # Latest-value cache (what the WS client keeps)
+        self.cache_mark = ""
+        self.cache_book: Dict[str, Any] = {}
+        self.seq = 0
+        self.arrival = 0.0          # perf_counter of the latest mark message
+        self.read_arrival = 0.0     # arrival of the mark the bot read this iteration
+        self._last_read_seq = 0
+
+        self.rate = 0.0
+        self.stats = self._new_stats()
+        self._emit(2)  # Valid market data before the bot starts
+
+    def __getattr__(self, name: str):
+        return getattr(self._exchange, name)
+
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        return {"processed": 0, "dropped": 0, "reads": 0, "fresh_reads": 0,
+                "decision_ms": [], "iteration_ms": [], "lag_ms": []}
+
+    # ---------- synthetic feed ----------
+
+    def _next_mark(self) -> float:
+        p = self.profile
+        rate = max(self.rate, 1.0)
+        move = self.rng.gauss(p["drift_bps"] / rate, p["vol_bps"] / math.sqrt(rate))
+        if p["jumps_per_sec"] and self.rng.random() < p["jumps_per_sec"] / rate:
+            move += self.rng.choice((-1, 1)) * p["jump_bps"]
+        self.mark *= 1 + move / 10000
+        return self.mark
+
+    def _message(self) -> str:
+        """Next WS message as the wire would carry it (mark / depth alternate)"""
+        mark = self._next_mark()
+        ts = int(time.time() * 1000)
+        if self.seq % 2 == 0:
+            return f'{{"channel":"price","data":{{"symbol":"BTC-USD","mark_price":"{mark:.2f}","time":{ts}}}}}'
+        half = self.profile["spread_ticks"] * self.tick / 2
+        mid = round(mark / self.tick) * self.tick
+        scale = self.profile["size_scale"]
+        rng = self.rng
+        bids = ",".join(f'["{mid - half - i * self.tick:.2f}","{rng.uniform(0.1, 2.0) * scale:.4f}"]' for i in range(self.depth))
+        asks = ",".join(f'["{mid + half + i * self.tick:.2f}","{rng.uniform(0.1, 2.0) * scale:.4f}"]' for i in range(self.depth))
+        return f'{{"channel":"depth_book","data":{{"symbol":"BTC-USD","bids":[{bids}],"asks":[{asks}],"time":{ts}}}}}'
+
+    def _on_message(self, raw: str) -> None:
+        """WS client side: decode and update the cache"""
+        msg = runtime_profile.loads(raw)
+        data = msg["data"]
+        self.seq += 1
+        if msg["channel"] == "price":
+            self.cache_mark = data["mark_price"]
+            self.arrival = time.perf_counter()
+        else:
+            self.cache_book = {
+                "bids": [[float(p), float(s)] for p, s in data["bids"]],
+                "asks": [[float(p), float(s)] for p, s in data["asks"]],
+                "timestamp": data["time"],
+            }
+
+    def _emit(self, count: int) -> None:
+        for _ in range(count):
+            self._on_message(self._message())
+
+    async def run_feed(self, rate: float, duration: float) -> None:
+        """Deliver `rate` msg/s for `duration` seconds in arrival batches"""
+        self.rate = rate
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            elapsed = time.perf_counter() - start
+            if elapsed >= duration:
+                break
+            due = int(rate * elapsed) - sent
+            if due > self.buffer:
+                self.stats["dropped"] += due - self.buffer
+                sent += due - self.buffer
+                due = self.buffer
+            while due > 0:
+                chunk = min(due, FEED_CHUNK)
+                self._emit(chunk)
+                sent += chunk
+                self.stats["processed"] += chunk
+                due -= chunk
+                if due:
+                    await asyncio.sleep(0)  # Let other tasks run between chunks, like a reader task
+            await asyncio.sleep(FEED_WAKE_SEC)
+
+    async def run_lag_probe(self) -> None:
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(LAG_PROBE_SEC)
+            self.stats["lag_ms"].append(max(0.0, (time.perf_counter() - before - LAG_PROBE_SEC) * 1000))
+
+    # ---------- exchange API (read side) ----------
+
+    async def get_mark_price(self, symbol: str) -> str:
+        self.stats["reads"] += 1
+        if self.seq != self._last_read_seq:
+            self.stats["fresh_reads"] += 1
+            self._last_read_seq = self.seq
+        self.read_arrival = self.arrival
+        return self.cache_mark
+
+    async def get_orderbook(self, symbol: str, *args, **kwargs) -> Dict[str, Any]:
+        return self.cache_book
+
+    def on_iteration(self, iteration_ms: float) -> None:
+        """End of a bot iteration (called from the recording IterationBudget)"""
+        self.stats["iteration_ms"].append(iteration_ms)
+        if self.read_arrival:
+            self.stats["decision_ms"].append((time.perf_counter() - self.read_arrival) * 1000)
+
+
+async def run_steps(main_module, feed: LoadFeedExchange, rates: List[float], step_sec: float,
+                    latency_factor: float, stop_on_degrade: bool, trace: bool) -> List[Dict[str, Any]]:
+    """Run main() once, step the feed rate, collect one result row per step"""
+    from deadlines import IterationBudget
+
+    class RecordingBudget(IterationBudget):
+        def finish(self) -> float:
+            elapsed_ms = super().finish()
+            feed.on_iteration(elapsed_ms)
+            return elapsed_ms
+
+    async def create_exchange(*_args, **_kwargs):
+        return feed
+
+    main_module.IterationBudget = RecordingBudget
+    main_module.create_exchange = create_exchange
+
+    bot = asyncio.create_task(main_module.main())
+    probe = asyncio.create_task(feed.run_lag_probe())
+    rows: List[Dict[str, Any]] = []
+    baseline_p99: Optional[float] = None
+    latency_limit = 0.0
+    refresh_ms = main_module.REFRESH_INTERVAL * 1000
+    try:
+        # Wait for the first iteration (startup done)
+        while not feed.stats["iteration_ms"]:
+            if bot.done():
+                raise RuntimeError("main() exited during startup (see console_log.txt)")
+            await asyncio.sleep(0.05)
+
+        for rate in rates:
+            feed.rate = rate
+            settle = step_sec * SETTLE_SHARE
+            feeder = asyncio.create_task(feed.run_feed(rate, step_sec + settle))
+            await asyncio.sleep(settle)
+            feed.stats = feed._new_stats()
+            if trace:
+                tracemalloc.reset_peak()
+            await feeder
+            if bot.done():
+                raise RuntimeError("main() exited during the load test (see console_log.txt)")
+
+            s = feed.stats
+            achieved = s["processed"] / step_sec
+            decision_p99 = percentile(s["decision_ms"], 99)
+            if baseline_p99 is None:
+                baseline_p99 = decision_p99
+                latency_limit = max(baseline_p99 * latency_factor, refresh_ms)
+            reasons = []
+            if s["dropped"]:
+                reasons.append("drops")
+            if achieved < rate * 0.95:
+                reasons.append("rate")
+            if decision_p99 > latency_limit:
+                reasons.append("latency")
+
+            row = {
+                "rate": rate,
+                "achieved": round(achieved, 1),
+                "dropped": s["dropped"],
+                "coalesced_pct": round((1 - s["fresh_reads"] / s["processed"]) * 100, 2) if s["processed"] else 0.0,
+                "iterations": len(s["iteration_ms"]),
+                "decision_p50_ms": round(percentile(s["decision_ms"], 50), 2),
+                "decision_p99_ms": round(decision_p99, 2),
+                "iteration_p99_ms": round(percentile(s["iteration_ms"], 99), 2),
+                "lag_p99_ms": round(percentile(s["lag_ms"], 99), 2),
+                "lag_max_ms": round(max(s["lag_ms"], default=0.0), 2),
+                "rss_mb": round(rss_mb(), 1),
+                "degraded": reasons,
+            }
+            if trace:
+                current, peak = tracemalloc.get_traced_memory()
+                row["traced_mb"] = round(current / 1e6, 2)
+                row["traced_peak_mb"] = round(peak / 1e6, 2)
+            rows.append(row)
+            print_row(row)
+            if reasons and stop_on_degrade:
+                break
+            gc.collect()
+    finally:
+        probe.cancel()
+        bot.cancel()
+        for task in (probe, bot):
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+    return rows
+
+
+def print_header() -> None:
+    print(f"{'rate':>8}{'achieved':>10}{'dropped':>9}{'coal%':>7}{'iters':>7}"
+          f"{'dec p50':>9}{'dec p99':>9}{'iter p99':>9}{'lag p99':>9}{'lag max':>9}{'RSS MB':>8}  verdict")
+
+
+def print_row(r: Dict[str, Any]) -> None:
+    verdict = "DEGRADED (" + ", ".join(r["degraded"]) + ")" if r["degraded"] else "ok"
+    print(f"{r['rate']:>8,.0f}{r['achieved']:>10,.0f}{r['dropped']:>9}{r['coalesced_pct']:>7.1f}{r['iterations']:>7}"
+          f"{r['decision_p50_ms']:>9.1f}{r['decision_p99_ms']:>9.1f}{r['iteration_p99_ms']:>9.2f}"
+          f"{r['lag_p99_ms']:>9.1f}{r['lag_max_ms']:>9.1f}{r['rss_mb']:>8.1f}  {verdict}", flush=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Find the feed rate the bot can sustain")
+    parser.add_argument("--rates", default=DEFAULT_RATES, help=f"Comma-separated msg/s steps (default {DEFAULT_RATES})")
+    parser.add_argument("--step-sec", type=float, default=10.0, help="Seconds per rate step")
+    parser.add_argument("--profile", default="normal", choices=sorted(PROFILES), help="Volatility profile")
+    parser.add_argument("--buffer", type=int, default=10000, help="Backlog (messages) before drops")
+    parser.add_argument("--latency-factor", type=float, default=2.0,
+                        help="Degraded when decision p99 exceeds this x the first step's p99 (min. REFRESH_INTERVAL)")
+    parser.add_argument("--no-stop", action="store_true", help="Keep going after the first degraded step")
+    parser.add_argument("--tracemalloc", action="store_true", help="Track Python allocations (slower)")
+    parser.add_argument("--config", default=os.path.join(REPO_DIR, "config.example.py"),
+                        help="Config file (default: config.example.py)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--runtime", default="", choices=("",) + runtime_profile.PROFILES,
+                        help="Runtime profile (default: RUNTIME_PROFILE from the config)")
+    parser.add_argument("--output", default="", help="Write results as JSON")
+    args = parser.parse_args()
+
+    rates = [float(r) for r in args.rates.split(",") if r.strip()]
+    output = os.path.abspath(args.output) if args.output else ""
+
+    import fake_exchange
+    sys.modules["exchange_factory"] = fake_exchange
+    os.environ["MM_HEADLESS"] = "1"
+    config = load_config(os.path.abspath(args.config))
+    runtime = runtime_profile.apply_profile(args.runtime or getattr(config, "RUNTIME_PROFILE", "default"))
+    workdir = tempfile.mkdtemp(prefix="mm-load-")
+    os.chdir(workdir)
+    if args.tracemalloc:
+        tracemalloc.start()
+    try:
+        import main as main_module
+        from plain_console import PlainConsole
+        main_module.console = PlainConsole(file=open(os.devnull, "w"))
+
+        feed = LoadFeedExchange(fake_exchange.FakeExchange(seed=args.seed), PROFILES[args.profile],
+                                buffer=args.buffer, seed=args.seed)
+        print(f"Load test | profile {args.profile} | {args.step_sec:.0f}s per step | "
+              f"REFRESH_INTERVAL {config.REFRESH_INTERVAL}s | buffer {args.buffer} msgs | {runtime.summary_line()}\n")
+        print_header()
+        rows = asyncio.run(run_steps(main_module, feed, rates, args.step_sec, args.latency_factor,
+                                     not args.no_stop, args.tracemalloc))
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    sustainable = 0.0
+    for row in rows:
+        if row["degraded"]:
+            break
+        sustainable = row["rate"]
+    if sustainable:
+        print(f"\nSustainable rate: {sustainable:,.0f} msg/s")
+    else:
+        print("\nSustainable rate: below the first step")
+    if len(rows) > 1:
+        print(f"RSS growth: {rows[-1]['rss_mb'] - rows[0]['rss_mb']:+.1f} MB over {len(rows)} steps")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"profile": args.profile, "step_sec": args.step_sec, "buffer": args.buffer,
+                       "runtime": {"profile": runtime.name, "loop": runtime.loop, "json": runtime.codec},
+                       "refresh_interval": config.REFRESH_INTERVAL, "sustainable_rate": sustainable,
+                       "steps": rows}, f, indent=2)
+        print(f"Saved: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
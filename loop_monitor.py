@@ -0,0 +1,181 @@
+"""
+Event Loop Lag Monitor
+======================
+Watchdog for the asyncio event loop.
+
+- Async ticker: sleeps `interval` and measures how late it woke up
+  (= scheduling lag). Every sample goes into the `loop.lag_ms` histogram.
+- Watchdog thread: if the ticker has not run for longer than the threshold,
+  the loop is blocked right now. Samples the loop thread's stack and the
+  current task so the blocking call can be attributed. The task comes from
+  the public asyncio.current_task(loop) (a callback scheduled into the
+  blocked loop would only run after the stall, outside the task); the
+  sample is kept only if the loop was still blocked afterwards, and the
+  task is reported as unknown if it cannot be read.
+- Optional asyncio debug mode: asyncio itself logs every callback slower
+  than `slow_callback_duration`; those records are counted and forwarded.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional, Callable, Dict, Any
+
+from metrics import metrics
+
+
+def _task_name(loop: Optional[asyncio.AbstractEventLoop]) -> str:
+    """Name of the task running on `loop` (read from the watchdog thread)"""
+    if loop is None:
+        return "<unknown: no loop>"
+    try:
+        task = asyncio.current_task(loop)
+    except Exception as e:
+        return f"<unknown: {type(e).__name__}>"
+    return task.get_name() if task is not None else "<callback>"
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Forward asyncio 'Executing <Handle> took X seconds' warnings"""
+
+    def __init__(self, monitor: "LoopLagMonitor"):
+        super().__init__(level=logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record: logging.LogRecord) -> None:
+        msg = record.getMessage()
+        if not msg.startswith("Executing"):
+            return
+        metrics.inc("loop.slow_callbacks")
+        self.monitor.last_slow_callback = msg
+        self.monitor.log_fn(f"SLOW CALLBACK | {msg}")
+
+
+class LoopLagMonitor:
+    """Measure loop scheduling lag and attribute stalls"""
+
+    def __init__(
+        self,
+        log_fn: Callable[[str], None],
+        interval: float = 0.1,
+        threshold_ms: float = 100.0,
+        debug_slow_callbacks: bool = False,
+        stack_depth: int = 12,
+    ):
+        self.log_fn = log_fn
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.debug_slow_callbacks = debug_slow_callbacks
+        self.stack_depth = stack_depth
+
+        self.last_stall: Optional[Dict[str, Any]] = None  # Last sampled stall
+        self.last_slow_callback = ""
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._stall_sampled = False  # One stack sample per stall
+        self._log_handler: Optional[_SlowCallbackHandler] = None
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        """Start ticker task + watchdog thread (call from inside the loop)"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+
+        if self.debug_slow_callbacks:
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold_ms / 1000
+            self._log_handler = _SlowCallbackHandler(self)
+            logging.getLogger("asyncio").addHandler(self._log_handler)
+
+        self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+        self._thread = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop ticker and watchdog"""
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._log_handler:
+            logging.getLogger("asyncio").removeHandler(self._log_handler)
+            self._log_handler = None
+
+    # ---------- async ticker ----------
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - scheduled) * 1000)
+            self._heartbeat = time.monotonic()
+            metrics.observe("loop.lag_ms", lag_ms)
+
+            if self.threshold_ms > 0 and lag_ms >= self.threshold_ms:
+                metrics.inc("loop.stalls")
+                where = ""
+                if self._stall_sampled and self.last_stall:
+                    where = f" | task: {self.last_stall['task']} | at: {self.last_stall['where']}"
+                self.log_fn(f"LOOP LAG | {lag_ms:.0f}ms{where}")
+            self._stall_sampled = False
+
+    # ---------- watchdog thread ----------
+
+    def _watchdog(self) -> None:
+        poll = max(self.interval / 2, 0.01)
+        while not self._stop.wait(poll):
+            if self.threshold_ms <= 0 or self._stall_sampled:
+                continue
+            blocked_ms = (time.monotonic() - self._heartbeat - self.interval) * 1000
+            if blocked_ms >= self.threshold_ms:
+                self._sample_stack(blocked_ms)
+
+    def _sample_stack(self, blocked_ms: float) -> None:
+        """Capture the loop thread's stack while it is blocked"""
+        heartbeat = self._heartbeat
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.format_stack(frame)[-self.stack_depth:]
+        # Innermost frame = the call that is blocking the loop
+        where = stack[-1].strip().splitlines()[0] if stack else "?"
+        task_name = _task_name(self._loop)
+        if self._heartbeat != heartbeat:
+            return  # Loop resumed while sampling: stack / task would not match
+
+        self.last_stall = {
+            "time": time.time(),
+            "blocked_ms": blocked_ms,
+            "task": task_name,
+            "where": where,
+            "stack": "".join(stack),
+        }
+        self._stall_sampled = True
+        metrics.inc("loop.stack_samples")
+        self.log_fn(f"LOOP BLOCKED | >{blocked_ms:.0f}ms | task: {task_name}\n{''.join(stack).rstrip()}")
+
+    # ---------- reporting ----------
+
+    def summary_line(self) -> str:
+        """One-line lag summary for dashboard / snapshot"""
+        hist = metrics.histogram("loop.lag_ms")
+        if hist is None or hist.count == 0:
+            return "Loop lag: -"
+        return (
+            f"Loop lag: p50 {hist.percentile(50):.0f}ms  p99 {hist.percentile(99):.0f}ms  "
+            f"max {hist.max:.0f}ms  stalls: {metrics.get('loop.stalls'):.0f}"
+        )
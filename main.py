@@ -6,43 +6,97 @@ Simulates bidirectional limit orders at ±bps from mark_price.
 Real-time monitoring of price and maker/taker status.
 
 Usage:
-    python main.py
+    python main.py                  # Rich dashboard
+    python main.py --headless       # No terminal UI (systemd/tmux), rich is never imported
+    python main.py --split-ui       # Dashboard, logs and snapshots rendered by a separate UI process
+    python main.py --startup-bench  # Report import/init cost per startup stage, then exit
 """
 
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import asyncio
 import time
+from startup import StartupTimer
+startup_timer = StartupTimer()
+
+import asyncio
 import uuid
 import logging
+import sqlite3
 from datetime import datetime
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Optional, Tuple, Dict, Any, List, Callable
 from types import SimpleNamespace
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+startup_timer.mark("stdlib")
 
-from rich.console import Console
-from rich.live import Live
-from rich.table import Table
-from rich.panel import Panel
-from rich.layout import Layout
-from rich.text import Text
+HEADLESS = "--headless" in sys.argv or os.getenv("MM_HEADLESS") == "1"
+STARTUP_BENCH = "--startup-bench" in sys.argv
 
 from exchange_factory import create_exchange, symbol_create
+startup_timer.mark("exchange_factory")
 from dotenv import load_dotenv
+import config as config_module
 from config import (
     MODE, EXCHANGE, COIN, AUTO_CONFIRM,
-    SPREAD_BPS, DRIFT_THRESHOLD, USE_MID_DRIFT, MARK_MID_DIFF_LIMIT, MID_UNSTABLE_COOLDOWN,
-    MIN_WAIT_SEC, REFRESH_INTERVAL,
-    SIZE_UNIT, LEVERAGE, MAX_SIZE_BTC,
+    REFRESH_INTERVAL,
     MAX_HISTORY, MAX_CONSECUTIVE_ERRORS,
-    AUTO_CLOSE_POSITION,
-    CLOSE_METHOD, CLOSE_AGGRESSIVE_BPS, CLOSE_WAIT_SEC,
-    CLOSE_MIN_SIZE_MARKET, CLOSE_MAX_ITERATIONS,
-    SNAPSHOT_INTERVAL, SNAPSHOT_FILE, CANCEL_AFTER_DELAY,
-    RESTART_INTERVAL, RESTART_DELAY, MAX_WS_FALLBACK,
+    SNAPSHOT_INTERVAL, SNAPSHOT_FILE, STATUS_JSON_FILE,
+    RESTART_INTERVAL, RESTART_DELAY,
+    LOOP_LAG_INTERVAL, LOOP_LAG_THRESHOLD_MS, LOOP_DEBUG_SLOW_CALLBACKS,
+    PROFILE_DURATION, PROFILE_DIR,
+    EXCHANGE_TIMEOUT_DEFAULT, EXCHANGE_TIMEOUTS, ITERATION_BUDGET,
+    STALE_DATA_MS, STALE_UNCHANGED_MS,
+    CHANNEL_MAX_ERROR_RATE, CHANNEL_MAX_LATENCY_MS, CHANNEL_RESUBSCRIBE_INTERVAL,
+    CHANNEL_HEDGE_FLOOR_MS, CHANNEL_RESTART_SEC,
+    STARTUP_READY_TIMEOUT, AUTH_CACHE_FILE, AUTH_CACHE_TTL,
+    CONFIG_RELOAD_INTERVAL,
+    SPLIT_UI, UI_QUEUE_SIZE,
+    FEED_BUS_PATH, FEED_BUS_MAX_AGE_MS,
+    SHADOW_VARIANTS, SHADOW_REPORT_INTERVAL, SHADOW_REPORT_FILE, SHADOW_MAKER_FEE_BPS, SHADOW_TAKER_FEE_BPS,
+    SIM_FILLS, SIM_TRADE_SHARE,
+    ADAPTIVE_QUOTING, SIGNAL_HALFLIFE_SEC, ADAPTIVE_VOL_HORIZON_SEC, ADAPTIVE_VOL_REF_BPS,
+    ADAPTIVE_SPREAD_VOL_MULT, ADAPTIVE_DRIFT_VOL_MULT, ADAPTIVE_SPREAD_RANGE, ADAPTIVE_DRIFT_RANGE,
+    ADAPTIVE_HYSTERESIS_BPS, ADAPTIVE_MICRO_LEVELS, ADAPTIVE_MICRO_SKEW,
+    FILL_LEDGER_FILE, FILL_LEDGER_FLUSH_SEC, FILL_LEDGER_MAKER_FEE_BPS, FILL_LEDGER_TAKER_FEE_BPS,
+    SIZE_UNIT, INSTRUMENT_CACHE_FILE, INSTRUMENT_CACHE_TTL,
+    INSTRUMENT_TICK_SIZE, INSTRUMENT_LOT_SIZE, INSTRUMENT_MIN_NOTIONAL,
+    ACCOUNT_RECONCILE_SEC,
+    REFERENCE_VENUES, REFERENCE_POLL_MS, REFERENCE_MAX_AGE_MS, REFERENCE_BASIS_HALFLIFE_SEC, REFERENCE_CANCEL_BPS,
+    DEADMAN_TIMEOUT_SEC, DEADMAN_FILE, DEADMAN_LOG_FILE,
+    RECORD_FILE,
+    PIPELINE_IDLE_SEC, PIPELINE_FILL_QUEUE,
+    RUNTIME_PROFILE,
+    SHUTDOWN_CANCEL_TIMEOUT, SHUTDOWN_CANCEL_RETRIES, SHUTDOWN_VERIFY_POLL_MS,
 )
+from pricing import calc_order_prices, calc_skewed_order_prices, check_maker_taker, calc_drift_bps, calc_spread_bps, format_price
+from dashboard import order_view, build_dashboard_from_state, write_snapshot, write_status_json
+from metrics import metrics
+from loop_monitor import LoopLagMonitor
+from profiler import ProfilerHooks
+from deadlines import DeadlineExchange, IterationBudget, deadline_summary_line
+from pipeline import Pipeline, LatestValue, build_tick
+from shutdown import ShutdownCoordinator
+from market_data import StalenessTracker
+from channel_health import ChannelMonitor
+from feed_bus import FeedBusReader, FeedBusExchange, bus_path
+from shadow import ShadowBook, build_variants
+from fill_model import SimExchange
+from signals import SignalEngine, AdaptiveQuoting
+from fill_ledger import FillLedger
+from instrument import Instrument, load_instrument
+from account_state import AccountState, OrderSizer
+from reference_feeds import build_reference_feeds
+from deadman import DeadmanSwitch
+from recorder import RecordingExchange, config_snapshot
+import runtime_profile
+from startup import wait_for_market_data
+from auth_cache import load_cached_auth, save_cached_auth, clear_cached_auth, is_auth_error, session_warning
+from runtime_config import RuntimeConfig, ConfigWatcher, RESTART_ONLY_KEYS
+startup_timer.mark("config+bot_modules")
+
+# Split UI: rendering / log files / snapshots in a companion process (ui_process.py)
+SPLIT_MODE = SPLIT_UI or "--split-ui" in sys.argv
 
 load_dotenv()
 
@@ -61,9 +115,15 @@ file_logger.addHandler(file_handler)
 # Console log file (cleared on startup)
 _console_log_file = open(CONSOLE_LOG_FILE, "w", encoding="utf-8")
 
+# Split UI mode: log lines go to the UI process instead (set in main())
+_log_sink = None
+
 
 def log_message(message: str) -> None:
     """Log message to console_log.txt with timestamp"""
+    if _log_sink is not None:
+        _log_sink(message)
+        return
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     _console_log_file.write(f"[{timestamp}] {message}\n")
     _console_log_file.flush()
@@ -75,7 +135,14 @@ STANDX_KEY = SimpleNamespace(
     open_browser=True,
 )
 
-console = Console()
+# UI imports are deferred: headless and split mode never load rich in the trading process
+if HEADLESS or SPLIT_MODE:
+    from plain_console import PlainConsole
+    console = PlainConsole()
+else:
+    from rich.console import Console
+    console = Console()
+startup_timer.mark("console")
 
 # ==================== Position Statistics ====================
 position_stats = {
@@ -100,17 +167,44 @@ class SimOrder:
     placed_at: datetime = field(default_factory=datetime.now)
     reference_price: float = 0.0  # mark_price at order placement
     message: str = ""
-    
+    filled: float = 0.0  # Simulated fill size (SIM_FILLS)
+
+
 class SimOrderManager:
-    """Simulation order manager"""
+    """Simulation order manager (fills simulated by SimExchange when given)"""
 
-    def __init__(self):
+    def __init__(self, sim_exchange: Optional[SimExchange] = None):
         self.orders: Dict[str, SimOrder] = {}
         self.history: List[Dict[str, Any]] = []  # Order history
         self.total_placed = 0
         self.total_cancelled = 0
         self.total_rebalanced = 0
+        self.total_filled = 0
         self.is_live = False
+        self.sim_exchange = sim_exchange
+        if sim_exchange is not None:
+            sim_exchange.fill_listeners.append(self._on_fill)
+
+    def _on_fill(self, order_id: str, side: str, size: float, price: float, maker: bool = True) -> None:
+        """Simulated fill callback (partial or full)"""
+        order = self.orders.get(order_id)
+        if order is None:
+            return  # Close order, not managed here
+        order.filled += size
+        if order.filled >= order.size - 1e-12:
+            order.status = "filled"
+            del self.orders[order_id]
+            self.total_filled += 1
+        else:
+            order.status = "partial"
+        self._append_history({
+            "action": "FILL",
+            "order_id": order_id,
+            "side": side,
+            "price": price,
+            "size": size,
+            "time": datetime.now()
+        })
 
     def _append_history(self, record: Dict[str, Any]) -> None:
         """Append to history (with memory limit)"""
@@ -130,6 +224,15 @@ class SimOrderManager:
             message="success"
         )
         self.orders[order_id] = order
+        if self.sim_exchange is not None:
+            await self.sim_exchange.create_order(
+                symbol=self.sim_exchange.symbol,
+                side=side,
+                amount=size,
+                price=price,
+                order_type="limit",
+                client_order_id=order_id,
+            )
         self.total_placed += 1
         self._append_history({
             "action": "PLACE",
@@ -143,6 +246,8 @@ class SimOrderManager:
     async def cancel_order(self, order_id: str, reason: str = "") -> bool:
         """Cancel order (simulation)"""
         if order_id in self.orders:
+            if self.sim_exchange is not None:
+                await self.sim_exchange.cancel_order(client_order_id=order_id)
             self.orders[order_id].status = "cancelled"
             del self.orders[order_id]
             self.total_cancelled += 1
@@ -188,9 +293,10 @@ class SimOrderManager:
 class LiveOrderManager:
     """Live order manager (LIVE mode) - Uses server data directly"""
 
-    def __init__(self, exchange, symbol: str):
+    def __init__(self, exchange, symbol: str, channels: Optional[ChannelMonitor] = None):
         self.exchange = exchange
         self.symbol = symbol
+        self.channels = channels  # Channel health (order routing + hedged cancels)
         # Only store reference_price locally (for drift calculation, server doesn't know this)
         self.reference_prices: Dict[str, float] = {}  # side -> reference_price
         self.history: List[Dict[str, Any]] = []
@@ -219,7 +325,7 @@ class LiveOrderManager:
                 price=price,
                 order_type="limit",
                 client_order_id=cl_ord_id,
-                skip_rest=True
+                skip_rest=self.channels.order_skip_rest() if self.channels else True
             )
             if result:
                 code = result.get("code", None)
@@ -247,6 +353,7 @@ class LiveOrderManager:
                     message=message
                 )
             else:
+                metrics.inc("orders.rejected")
                 console.print(f"[red]Order rejected: {result}[/red]")
         except Exception as e:
             console.print(f"[red]Order failed: {e}[/red]")
@@ -258,7 +365,7 @@ class LiveOrderManager:
             # Explicitly pass cached orders to cancel only those orders
             orders_to_cancel = list(self._cached_orders.values())
             if orders_to_cancel:
-                await self.exchange.cancel_orders(symbol=self.symbol, open_orders=orders_to_cancel)
+                await self._cancel_orders(orders_to_cancel)
             count = len(orders_to_cancel)
             self.total_cancelled += count
             if count > 0:
@@ -277,6 +384,26 @@ class LiveOrderManager:
             self._cached_orders.clear()
             return 0
 
+    async def _cancel_orders(self, orders: List[Dict]) -> None:
+        """Cancel given orders, hedged across both cancel paths when channel health is tracked"""
+        if self.channels is None:
+            await self.exchange.cancel_orders(symbol=self.symbol, open_orders=orders)
+            return
+        _result, winner = await self.channels.hedged(
+            "order_ws_client",
+            primary=lambda: self.exchange.cancel_orders(symbol=self.symbol, open_orders=orders),
+            secondary=lambda: self._cancel_each(orders),
+        )
+        if winner == "secondary":
+            log_message(f"HEDGED CANCEL | {len(orders)} orders acked via per-order cancel")
+
+    async def _cancel_each(self, orders: List[Dict]) -> None:
+        """Per-order cancel (hedge path for cancel_orders), fails if an order has no client id"""
+        ids = [o.get("client_order_id") for o in orders]
+        await asyncio.gather(*[self.exchange.cancel_order(client_order_id=i) for i in ids if i])
+        if not all(ids):
+            raise RuntimeError("per-order cancel needs client_order_id")
+
     async def fetch_orders(self) -> None:
         """Fetch orders from server and update cache"""
         try:
@@ -342,106 +469,19 @@ async def staggered_gather(*coros, delay: float = 0):
     return await asyncio.gather(*tasks)
 
 
-def calc_order_prices(mark_price: float, spread_bps: float) -> Tuple[float, float]:
-    """
-    Calculate order prices at ±spread_bps from mark_price
-
-    Returns:
-        (buy_price, sell_price)
-    """
-    buy_price = mark_price * (1 - spread_bps / 10000)
-    sell_price = mark_price * (1 + spread_bps / 10000)
-    return buy_price, sell_price
-
-
-def check_maker_taker(
-    buy_price: float,
-    sell_price: float,
-    best_bid: float,
-    best_ask: float
-) -> Tuple[bool, bool]:
-    """
-    Determine if order is maker or taker
-
-    Returns:
-        (buy_is_maker, sell_is_maker)
-    """
-    # buy order: maker if price < best_ask (inside the orderbook)
-    buy_is_maker = buy_price < best_ask
-    # sell order: maker if price > best_bid (inside the orderbook)
-    sell_is_maker = sell_price > best_bid
-    return buy_is_maker, sell_is_maker
-
-
-def calc_drift_bps(current_price: float, reference_price: float) -> float:
-    """
-    Calculate the difference between current price and reference price in bps
-    """
-    if reference_price == 0:
-        return 0.0
-    return abs(current_price - reference_price) / reference_price * 10000
-
-
-def calc_spread_bps(best_bid: float, best_ask: float) -> float:
-    """
-    Calculate orderbook spread in bps
-    """
-    if best_bid == 0:
-        return 0.0
-    mid = (best_bid + best_ask) / 2
-    return (best_ask - best_bid) / mid * 10000
-
-
-def format_price(price: float, decimals: int = 2) -> str:
-    """Format price with thousand separators"""
-    return f"{price:,.{decimals}f}"
-
-
-def calc_order_size(
-    available_collateral: float,
-    mark_price: float,
-    leverage: float = LEVERAGE,
-    size_unit: float = SIZE_UNIT,
-    max_size: Optional[float] = MAX_SIZE_BTC
-) -> float:
-    """
-    Calculate order size based on collateral.
-
-    Args:
-        available_collateral: Available collateral (USD)
-        mark_price: Current mark price
-        leverage: Leverage multiplier (6x -> 3x each side for bidirectional)
-        size_unit: Minimum order unit (default 0.001 BTC)
-        max_size: Manual max size limit (None for unlimited)
-
-    Returns:
-        Order size (BTC), floored to size_unit
-
-    Example:
-        $100 collateral, BTC=$100k, leverage=6
-        -> $100 * 6 / 2 / $100k = 0.003 BTC per side
-    """
-    if mark_price <= 0 or available_collateral <= 0:
-        return 0.0
-
-    # collateral * leverage / 2 (bidirectional) / mark_price
-    # Example: $100 * 6 / 2 / $100k = 0.003 BTC per side
-    collateral_based_size = available_collateral * leverage / 2 / mark_price
-
-    # Use smaller of collateral-based or max_size if set
-    if max_size is not None and max_size > 0:
-        size = min(collateral_based_size, max_size)
-    else:
-        size = collateral_based_size
-
-    # Floor to size_unit (e.g., 0.00367 -> 0.003)
-    # Use round to handle floating-point precision
-    size = round(size / size_unit) * size_unit
-
-    return round(size, 8)  # Final precision fix
+# ==================== Strategic Position Close ====================
 
+async def _market_fill_price(exchange, symbol: str, side: str) -> float:
+    """Expected price of a market order on `side` (best opposite level, mark fallback)"""
+    try:
+        orderbook = await exchange.get_orderbook(symbol)
+        levels = orderbook.get("asks" if side == "buy" else "bids") or []
+        if levels:
+            return float(levels[0][0])
+    except Exception:
+        pass
+    return float(await exchange.get_mark_price(symbol))
 
-# ==================== Strategic Position Close ====================
 
 async def close_position_strategic(
     exchange,
@@ -452,6 +492,8 @@ async def close_position_strategic(
     wait_sec: float,
     min_size_market: float,
     max_iterations: int,
+    on_fill: Optional[Callable[[str, float, float, bool], None]] = None,
+    instrument: Optional[Instrument] = None,
 ) -> Tuple[bool, float, int, str]:
     """
     Strategic position close.
@@ -465,6 +507,9 @@ async def close_position_strategic(
         wait_sec: Wait time (sec)
         min_size_market: Min size for market fallback
         max_iterations: Max retry iterations
+        on_fill: Called as (side, size, price, maker) for each observed close fill
+            (limit fills at the order price, market orders at the best opposite price)
+        instrument: Snap limit prices to the tick grid (chase passive, aggressive toward the fill)
 
     Returns:
         (success, elapsed_time, iterations, log_message)
@@ -479,7 +524,10 @@ async def close_position_strategic(
     # Market close - immediate market order
     if method == "market":
         file_logger.info(f"  → CLOSE: MARKET order {close_side.upper()} {remaining_size:.6f}")
+        fill_price = await _market_fill_price(exchange, symbol, close_side) if on_fill else 0.0
         await exchange.close_position(symbol, position)
+        if on_fill:
+            on_fill(close_side, remaining_size, fill_price, False)
         elapsed = time.time() - start_time
         return (True, elapsed, 1, f"MARKET close ({elapsed:.2f}s)")
 
@@ -490,6 +538,7 @@ async def close_position_strategic(
         # Max iterations exceeded - force market close
         if iterations > max_iterations:
             file_logger.info(f"  → CLOSE iter {iterations}: max iterations exceeded, MARKET fallback {remaining_size:.6f}")
+            fill_price = await _market_fill_price(exchange, symbol, close_side) if on_fill else 0.0
             await exchange.create_order(
                 symbol=symbol,
                 side=close_side,
@@ -497,12 +546,15 @@ async def close_position_strategic(
                 order_type="market",
                 is_reduce_only=True,
             )
+            if on_fill:
+                on_fill(close_side, remaining_size, fill_price, False)
             elapsed = time.time() - start_time
             return (True, elapsed, iterations, f"{method.upper()} close - max iterations exceeded, market fallback ({elapsed:.1f}s)")
 
         # Remaining size too small - market close
         if remaining_size < min_size_market:
             file_logger.info(f"  → CLOSE iter {iterations}: dust {remaining_size:.6f} < {min_size_market}, MARKET fallback")
+            fill_price = await _market_fill_price(exchange, symbol, close_side) if on_fill else 0.0
             await exchange.create_order(
                 symbol=symbol,
                 side=close_side,
@@ -510,6 +562,8 @@ async def close_position_strategic(
                 order_type="market",
                 is_reduce_only=True,
             )
+            if on_fill:
+                on_fill(close_side, remaining_size, fill_price, False)
             elapsed = time.time() - start_time
             return (True, elapsed, iterations, f"{method.upper()} close - dust market fallback ({elapsed:.1f}s, {iterations} iter)")
 
@@ -556,6 +610,7 @@ async def close_position_strategic(
             # No orderbook data - market fallback
             if limit_price is None:
                 file_logger.info(f"  → CLOSE iter {iterations}: no orderbook, MARKET fallback {remaining_size:.6f}")
+                fill_price = await _market_fill_price(exchange, symbol, close_side) if on_fill else 0.0
                 await exchange.create_order(
                     symbol=symbol,
                     side=close_side,
@@ -563,9 +618,14 @@ async def close_position_strategic(
                     order_type="market",
                     is_reduce_only=True,
                 )
+                if on_fill:
+                    on_fill(close_side, remaining_size, fill_price, False)
                 elapsed = time.time() - start_time
                 return (True, elapsed, iterations, f"CHASE close - no orderbook, market fallback ({elapsed:.1f}s)")
 
+        if instrument is not None:
+            limit_price = instrument.round_price(float(limit_price), close_side, passive=(method == "chase"))
+
         # Create limit order
         cl_ord_id = f"CLOSE-{uuid.uuid4().hex[:8].upper()}"
         file_logger.info(f"  → CLOSE iter {iterations}: {close_side.upper()} {remaining_size:.6f} @ {limit_price:,.2f} ({method})")
@@ -588,6 +648,7 @@ async def close_position_strategic(
             continue
 
         # Poll for fill confirmation (0.01s interval, up to wait_sec)
+        limit_is_maker = method == "chase"  # chase rests at the touch, aggressive crosses
         poll_interval = 0.01
         poll_start = time.time()
         filled = False
@@ -599,6 +660,8 @@ async def close_position_strategic(
             new_position = await exchange.get_position(symbol)
             if new_position is None or float(new_position.get("size", 0)) == 0:
                 # Fully closed
+                if on_fill:
+                    on_fill(close_side, remaining_size, limit_price, limit_is_maker)
                 elapsed = time.time() - start_time
                 file_logger.info(f"  → CLOSE iter {iterations}: filled completely")
                 return (True, elapsed, iterations, f"{method.upper()} close complete ({elapsed:.1f}s, {iterations} iter)")
@@ -609,12 +672,17 @@ async def close_position_strategic(
                 # Partial fill occurred
                 file_logger.info(f"  → CLOSE iter {iterations}: partial fill {remaining_size:.6f} -> {new_remaining:.6f}")
                 console.print(f"[dim]Partial fill: {remaining_size:.6f} -> {new_remaining:.6f}[/dim]")
+                if on_fill:
+                    on_fill(close_side, remaining_size - new_remaining, limit_price, limit_is_maker)
                 remaining_size = new_remaining
                 filled = True
 
         # Timeout with unfilled - cancel and retry
         if not filled:
-            remaining_size = abs(float((await exchange.get_position(symbol) or {}).get("size", 0)))
+            new_remaining = abs(float((await exchange.get_position(symbol) or {}).get("size", 0)))
+            if on_fill and new_remaining < remaining_size:
+                on_fill(close_side, remaining_size - new_remaining, limit_price, limit_is_maker)
+            remaining_size = new_remaining
             if remaining_size > 0:
                 file_logger.info(f"  → CLOSE iter {iterations}: timeout, cancelling and retry (remaining: {remaining_size:.6f})")
 
@@ -628,236 +696,65 @@ async def close_position_strategic(
     return (True, elapsed, iterations, f"{method.upper()} close complete ({elapsed:.1f}s, {iterations} iter)")
 
 
-# ==================== Dashboard Output (Rich) ====================
-
-def build_dashboard(
-    symbol: str,
-    mark_price: float,
-    best_bid: float,
-    best_ask: float,
-    best_bid_size: float,
-    best_ask_size: float,
-    buy_is_maker: bool,
-    sell_is_maker: bool,
-    drift_bps: float,
-    status: str,
-    countdown: float,
-    spread_bps: float,
-    order_mgr,  # SimOrderManager or LiveOrderManager
-    available_collateral: float,
-    total_collateral: float,
-    order_size: float,
-    position: Optional[Dict[str, Any]],
-    pos_stats: Dict[str, Any],
-    last_action: str = "",
-    mode: str = "TEST"
-) -> Panel:
-    """Build dashboard as rich Panel"""
-    from rich.table import Table
-    from rich.text import Text
-
-    now = datetime.now().strftime("%H:%M:%S")
-    is_live = mode == "LIVE"
-
-    # Get current orders
-    buy_order = order_mgr.get_buy_order()
-    sell_order = order_mgr.get_sell_order()
-
-    # Calculate order value (USD)
-    order_value = order_size * mark_price
-
-    # ========== Main Table ==========
-    table = Table.grid(padding=(0, 1))
-    table.add_column(justify="left")
-    table.add_column(justify="left")
-
-    # -- Header --
-    header = Text()
-    header.append(f"Symbol: ", style="bold")
-    header.append(f"{symbol}", style="bold cyan")
-    header.append(f"    Time: {now}    Target: ±{SPREAD_BPS}bps")
-    table.add_row(header, "")
-    table.add_row("", "")
-
-    # -- ACCOUNT Section --
-    table.add_row(Text("▌ ACCOUNT", style="bold cyan"), "")
-    table.add_row(
-        Text(f"  Total: ${total_collateral:,.2f}  Available: ${available_collateral:,.2f}", style="green"),
-        Text(f"  Order Size: {order_size:.4f} {COIN} (${order_value:,.2f}) x{LEVERAGE:.0f}", style="bold")
-    )
-
-    # Position display
-    if position and position.get("size", 0) != 0:
-        pos_side = position.get("side", "").upper()
-        pos_size = float(position.get("size", 0))
-        pos_entry = float(position.get("entry_price", 0))
-        pos_upnl = float(position.get("unrealized_pnl", 0))
-        pos_color = "green" if pos_side == "LONG" else "red"
-        upnl_color = "green" if pos_upnl >= 0 else "red"
-        pos_text = Text("  Position: ")
-        pos_text.append(f"{pos_side} ", style=pos_color)
-        pos_text.append(f"{pos_size:.4f} @ {format_price(pos_entry)}  uPnL: ")
-        pos_text.append(f"${pos_upnl:+,.2f}", style=upnl_color)
-    else:
-        pos_text = Text("  Position: No position", style="dim")
-    table.add_row(pos_text, "")
-    table.add_row("", "")
-
-    # -- MARKET DATA Section --
-    table.add_row(Text("▌ MARKET DATA", style="bold cyan"), "")
-    # Mid price (size-weighted average)
-    total_size = best_bid_size + best_ask_size
-    mid_price = (best_bid * best_bid_size + best_ask * best_ask_size) / total_size if total_size > 0 else (best_bid + best_ask) / 2
-    mid_diff_bps = (mid_price - mark_price) / mark_price * 10000 if mark_price > 0 else 0
-    mid_diff_style = "green" if abs(mid_diff_bps) < 3 else ("yellow" if abs(mid_diff_bps) < 6 else "red")
-
-    # Spread color
-    if spread_bps < 5:
-        spread_style = "green"
-    elif spread_bps < 10:
-        spread_style = "yellow"
-    else:
-        spread_style = "red"
-    drift_style = "yellow" if drift_bps > DRIFT_THRESHOLD else "green"
-
-    # Aligned output (fixed width 12 chars)
-    table.add_row(Text(f"  Mark:   {format_price(mark_price):>12}  │  Mid:    {format_price(mid_price):>12}"), "")
-    table.add_row(Text(f"  Bid:    {format_price(best_bid):>12}  │  Ask:    {format_price(best_ask):>12}"), "")
-    spread_line = Text(f"  Spread: ")
-    spread_line.append(f"{spread_bps:.2f} bps".rjust(12), style=spread_style)
-    spread_line.append(f"  │  Drift:  ")
-    spread_line.append(f"{drift_bps:.2f}".rjust(6), style=drift_style)
-    spread_line.append(" / ")
-    spread_line.append(f"{mid_diff_bps:+.2f} bps", style=mid_diff_style)
-    table.add_row(spread_line, "")
-    table.add_row("", "")
-
-    # -- SIMULATED ORDERS Section --
-    table.add_row(Text("▌ SIMULATED ORDERS", style="bold cyan"), "")
-
-    # SELL Order (displayed above)
-    sell_maker_text = Text("[MAKER]", style="green") if sell_is_maker else Text("[TAKER]", style="red")
-    if sell_order:
-        sell_drift = calc_drift_bps(mark_price, sell_order.reference_price)
-        sell_line = Text("  SELL: ", style="red")
-        sell_line.append("● OPEN  ", style="red bold")
-        sell_line.append(f"{sell_order.id}  @ {format_price(sell_order.price)}  x{sell_order.size}")
-        sell_drift_text = Text(f"        (drift: {sell_drift:.1f}bps)  ")
-    else:
-        sell_line = Text("  SELL: ", style="red")
-        sell_line.append("○ No order", style="dim")
-        sell_drift_text = Text("        ")
-    sell_drift_text.append_text(sell_maker_text)
-    table.add_row(sell_line, "")
-    table.add_row(sell_drift_text, "")
-
-    # BUY Order (displayed below)
-    buy_maker_text = Text("[MAKER]", style="green") if buy_is_maker else Text("[TAKER]", style="red")
-    if buy_order:
-        buy_drift = calc_drift_bps(mark_price, buy_order.reference_price)
-        buy_line = Text("  BUY:  ", style="green")
-        buy_line.append("● OPEN  ", style="green bold")
-        buy_line.append(f"{buy_order.id}  @ {format_price(buy_order.price)}  x{buy_order.size}")
-        buy_drift_text = Text(f"        (drift: {buy_drift:.1f}bps)  ")
-    else:
-        buy_line = Text("  BUY:  ", style="green")
-        buy_line.append("○ No order", style="dim")
-        buy_drift_text = Text("        ")
-    buy_drift_text.append_text(buy_maker_text)
-    table.add_row(buy_line, "")
-    table.add_row(buy_drift_text, "")
-    table.add_row("", "")
-
-    # -- STATUS Section --
-    table.add_row(Text("▌ STATUS", style="bold cyan"), "")
-
-    # Status color
-    if status == "MONITORING":
-        status_text = Text("● MONITORING - Orders active", style="green bold")
-    elif status == "PLACING":
-        status_text = Text("▶ PLACING orders...", style="cyan bold")
-    elif status == "NO_SIZE":
-        status_text = Text("✗ NO SIZE - Insufficient collateral", style="red bold")
-    elif status == "WAITING":
-        status_text = Text("◌ WAITING - Would be TAKER", style="yellow bold")
-    elif status == "MID_WAIT":
-        status_text = Text("◌ MID_WAIT - Mid drift unstable", style="yellow bold")
-    elif status == "REBALANCING":
-        status_text = Text("⟳ REBALANCING - Cancelling & replacing", style="yellow bold")
-    else:
-        status_text = Text(status)
-
-    table.add_row(Text("  ").append_text(status_text), "")
-
-    if last_action:
-        table.add_row(Text(f"  Last: {last_action}", style="dim"), "")
-
-    if countdown > 0 and MIN_WAIT_SEC > 0:
-        countdown_str = f"{countdown:.1f}s" if countdown < 10 else f"{int(countdown)}s"
-        table.add_row(Text(f"  Next check in: {countdown_str}", style="dim"), "")
-
-    table.add_row("", "")
-
-    # -- STATS Section --
-    pnl_style = "green" if pos_stats['total_pnl'] >= 0 else "red"
-
-    # First line: Order statistics
-    stats_line1 = Text(
-        f"Placed: {order_mgr.total_placed}  Cancelled: {order_mgr.total_cancelled}  Rebalanced: {order_mgr.total_rebalanced}",
-        style="dim"
-    )
-    table.add_row(stats_line1, "")
-
-    # Second line: Close statistics
-    stats_line2 = Text(f"Closes: {pos_stats['total_closes']} (", style="dim")
-    stats_line2.append(f"{pos_stats['total_volume']:.4f} BTC", style="dim")
-    stats_line2.append(", ", style="dim")
-    stats_line2.append(f"${pos_stats['total_pnl']:+.2f}", style=pnl_style)
-    # Close time display
-    if pos_stats.get('total_close_time', 0) > 0:
-        stats_line2.append(f", total: {pos_stats['total_close_time']:.1f}s", style="dim")
-    if pos_stats.get('last_close_time', 0) > 0:
-        stats_line2.append(f", last: {pos_stats['last_close_time']:.1f}s", style="dim")
-    stats_line2.append(")", style="dim")
-    table.add_row(stats_line2, "")
-
-    # Wrap in Panel
-    if is_live:
-        title = "[bold red]StandX Market Making [LIVE][/bold red]"
-        border = "red"
-    else:
-        title = "[bold cyan]StandX Market Making [TEST][/bold cyan]"
-        border = "cyan"
-
-    return Panel(
-        table,
-        title=title,
-        subtitle="[dim]Press Ctrl+C to exit[/dim]",
-        border_style=border
-    )
-
-
 # ==================== Main Logic ====================
 
 async def main():
+    global console, _log_sink  # Replaced in split UI mode
     is_live = MODE == "LIVE"
+
+    # Hot-reloadable strategy parameters
+    rc = RuntimeConfig.from_module(config_module)
+    config_errors = rc.validate()
+    if config_errors:
+        console.print(f"[red]Invalid config.py: {'; '.join(config_errors)}[/red]")
+        return
+
+    # Shadow strategies: simulated variants next to the running config ("live")
+    shadow = None
+    if SHADOW_VARIANTS:
+        try:
+            shadow = ShadowBook(build_variants(rc, SHADOW_VARIANTS), SHADOW_MAKER_FEE_BPS, SHADOW_TAKER_FEE_BPS)
+        except (ValueError, KeyError) as e:
+            console.print(f"[red]Invalid SHADOW_VARIANTS: {e}[/red]")
+            return
+
+    # Adaptive spread / drift from streaming signals (nothing runs per tick when disabled)
+    signals = adaptive = None
+    if ADAPTIVE_QUOTING:
+        try:
+            adaptive = AdaptiveQuoting(
+                horizon_sec=ADAPTIVE_VOL_HORIZON_SEC,
+                vol_ref_bps=ADAPTIVE_VOL_REF_BPS,
+                spread_vol_mult=ADAPTIVE_SPREAD_VOL_MULT,
+                drift_vol_mult=ADAPTIVE_DRIFT_VOL_MULT,
+                spread_range=ADAPTIVE_SPREAD_RANGE,
+                drift_range=ADAPTIVE_DRIFT_RANGE,
+                hysteresis_bps=ADAPTIVE_HYSTERESIS_BPS,
+                micro_skew=ADAPTIVE_MICRO_SKEW,
+            )
+        except ValueError as e:
+            console.print(f"[red]Invalid ADAPTIVE_* settings: {e}[/red]")
+            return
+        signals = SignalEngine(halflife_sec=SIGNAL_HALFLIFE_SEC, micro_levels=ADAPTIVE_MICRO_LEVELS)
     mode_str = "[red]LIVE[/red]" if is_live else "[cyan]TEST[/cyan]"
 
     # Log startup
-    log_message(f"Bot started | Mode: {MODE} | Coin: {COIN} | Spread: {SPREAD_BPS}bps | Drift: {DRIFT_THRESHOLD}bps")
+    log_message(f"Bot started | Mode: {MODE} | Coin: {COIN} | Spread: {rc.spread_bps}bps | Drift: {rc.drift_threshold}bps")
 
     console.print(f"\n{'='*60}")
     console.print(f"  StandX Market Making Bot")
     console.print(f"  Mode: {mode_str}")
-    mid_drift_str = "+mid" if USE_MID_DRIFT else ""
-    console.print(f"  Coin: {COIN}, Spread: {SPREAD_BPS}bps, Drift: {DRIFT_THRESHOLD}bps{mid_drift_str}, MarkMidLimit: {MARK_MID_DIFF_LIMIT}bps")
+    mid_drift_str = "+mid" if rc.use_mid_drift else ""
+    if adaptive is not None:
+        mid_drift_str += " (adaptive)"
+    console.print(f"  Coin: {COIN}, Spread: {rc.spread_bps}bps, Drift: {rc.drift_threshold}bps{mid_drift_str}, MarkMidLimit: {rc.mark_mid_diff_limit}bps")
     console.print(f"{'='*60}\n")
 
     # LIVE mode confirmation
     if is_live:
         console.print("[bold red]WARNING: LIVE MODE - Real orders will be placed![/bold red]")
-        console.print(f"  Max Size: {MAX_SIZE_BTC} {COIN}")
-        console.print(f"  Leverage: {LEVERAGE}x")
+        console.print(f"  Max Size: {rc.max_size_btc} {COIN}")
+        console.print(f"  Leverage: {rc.leverage}x")
         if AUTO_CONFIRM:
             console.print("[yellow]AUTO_CONFIRM enabled, skipping confirmation...[/yellow]")
         else:
@@ -868,144 +765,549 @@ async def main():
 
 
 
-    # Exchange initialization
+    # Split UI: from here on console output, logs and snapshots go to the UI process
+    ui_publisher = None
+    if SPLIT_MODE:
+        from ui_process import UIPublisher, ProxyConsole, PublisherLogHandler
+        ui_publisher = UIPublisher(maxsize=UI_QUEUE_SIZE)
+        _console_log_file.flush()
+        ui_publisher.start(
+            console_log_file=CONSOLE_LOG_FILE,
+            position_log_file=LOG_FILE,
+            snapshot_file=SNAPSHOT_FILE,
+            status_json_file=STATUS_JSON_FILE,
+            snapshot_interval=SNAPSHOT_INTERVAL,
+            headless=HEADLESS,
+        )
+        console = ProxyConsole(ui_publisher)
+        _log_sink = ui_publisher.log
+        file_logger.removeHandler(file_handler)
+        file_handler.close()
+        file_logger.addHandler(PublisherLogHandler(ui_publisher))
+
+    startup_timer.mark("banner+confirm")
+
+    # Exchange initialization (reuse cached session token if available)
     console.print("Initializing exchange...")
-    exchange = await create_exchange(EXCHANGE, STANDX_KEY)
+    init_start = time.perf_counter()
+    cached_auth = load_cached_auth(STANDX_KEY, AUTH_CACHE_FILE, AUTH_CACHE_TTL)
+    if cached_auth:
+        console.print("[dim]Using cached session token[/dim]")
+    # Channel health model (ws_client / order_ws_client)
+    channels = ChannelMonitor(
+        max_error_rate=CHANNEL_MAX_ERROR_RATE,
+        max_latency_ms=CHANNEL_MAX_LATENCY_MS,
+        hedge_floor_ms=CHANNEL_HEDGE_FLOOR_MS,
+    )
+
+    try:
+        raw_exchange = await create_exchange(EXCHANGE, STANDX_KEY)
+    except Exception as e:
+        clear_cached_auth(AUTH_CACHE_FILE)
+        if not cached_auth:
+            raise
+        # Cached session rejected (or expired early): log in again
+        log_message(f"AUTH CACHE | cached session failed ({e}), logging in again")
+        console.print("[yellow]Cached session token failed, logging in again...[/yellow]")
+        vars(STANDX_KEY).pop("session_token", None)
+        raw_exchange = await create_exchange(EXCHANGE, STANDX_KEY)
+
+    # RUNTIME_PROFILE = "fast": exchange client modules (loaded by now) decode with the fast codec
+    if runtime_profile.active.name != "default":
+        patched = runtime_profile.patch_json()
+        profile = runtime_profile.active
+        console.print(f"[dim]{profile.summary_line()}[/dim]")
+        log_message(f"RUNTIME | {profile.name} | loop {profile.loop} | json {profile.codec} | {patched} library modules")
+
+    # Session recording (innermost: exactly what the venue answered, replay with replay.py)
+    recorder = None
+    if RECORD_FILE:
+        try:
+            os.makedirs(os.path.dirname(RECORD_FILE) or ".", exist_ok=True)
+            recorder = RecordingExchange(raw_exchange, RECORD_FILE, meta={
+                "mode": MODE, "exchange": EXCHANGE, "coin": COIN,
+                "symbol": symbol_create(EXCHANGE, COIN),
+                "config": config_snapshot(config_module),
+            })
+            raw_exchange = recorder
+            log_message(f"RECORDING | {recorder.path}")
+        except OSError as e:
+            console.print(f"[yellow]Session recording unavailable ({e})[/yellow]")
+            log_message(f"RECORDING UNAVAILABLE | {e}")
+
+    # Every async exchange call gets a per-operation deadline (latency feeds channel health)
+    exchange = DeadlineExchange(
+        raw_exchange,
+        timeouts=EXCHANGE_TIMEOUTS,
+        default_timeout=EXCHANGE_TIMEOUT_DEFAULT,
+        on_call=channels.on_call,
+    )
     symbol = symbol_create(EXCHANGE, COIN)
     console.print(f"Symbol: {symbol}")
+    startup_timer.mark("create_exchange")
+    if AUTH_CACHE_TTL > 0:
+        # Token attribute / key.session_token are not a documented mpdex interface: check both ends
+        auth_warning = session_warning(exchange.inner, vars(STANDX_KEY).get("session_token"))
+        if auth_warning:
+            log_message(f"AUTH CACHE | {auth_warning}, caching disabled for this run")
+            clear_cached_auth(AUTH_CACHE_FILE)
+        else:
+            try:
+                save_cached_auth(exchange.inner, STANDX_KEY.wallet_address, AUTH_CACHE_FILE, AUTH_CACHE_TTL)
+            except OSError as e:
+                log_message(f"Auth cache save failed: {e}")
+
+    # Tick / lot / min notional: every quote and close order is snapped to what the venue accepts
+    instrument = await load_instrument(
+        exchange, EXCHANGE, symbol,
+        cache_file=INSTRUMENT_CACHE_FILE,
+        cache_ttl=INSTRUMENT_CACHE_TTL,
+        overrides={
+            "tick_size": INSTRUMENT_TICK_SIZE,
+            "lot_size": INSTRUMENT_LOT_SIZE,
+            "min_notional": INSTRUMENT_MIN_NOTIONAL,
+        },
+        default_lot_size=SIZE_UNIT,
+    )
+    console.print(f"[dim]Instrument {instrument.summary_line()}[/dim]")
+    log_message(f"INSTRUMENT | {instrument.summary_line()}")
+    startup_timer.mark("instrument")
+
+    # Market data from the shared feed bus (feed_daemon.py) instead of own subscriptions
+    if FEED_BUS_PATH:
+        feed_path = bus_path(FEED_BUS_PATH, symbol)
+        try:
+            reader = FeedBusReader(feed_path, symbol)
+            exchange = FeedBusExchange(exchange, reader, max_age_ms=FEED_BUS_MAX_AGE_MS)
+            console.print(f"[dim]Market data from feed bus: {feed_path} ({reader.levels} book levels)[/dim]")
+            log_message(f"FEED BUS | {feed_path} | {reader.levels} book levels")
+            if ADAPTIVE_QUOTING and ADAPTIVE_MICRO_LEVELS > reader.levels:
+                console.print(f"[yellow]Feed bus has {reader.levels} book levels, microprice uses {reader.levels} "
+                              f"of ADAPTIVE_MICRO_LEVELS {ADAPTIVE_MICRO_LEVELS} (raise FEED_BUS_LEVELS)[/yellow]")
+                log_message(f"FEED BUS LEVELS | microprice limited to {reader.levels} of {ADAPTIVE_MICRO_LEVELS} levels")
+        except (OSError, ValueError) as e:
+            console.print(f"[yellow]Feed bus unavailable ({e}), subscribing directly[/yellow]")
+            log_message(f"FEED BUS UNAVAILABLE | {e} | subscribing directly")
+
+    # TEST mode: simulated fills and position, same get_position / auto-close flow as LIVE
+    sim_exchange = None
+    if not is_live and SIM_FILLS:
+        sim_exchange = SimExchange(exchange, symbol, trade_share=SIM_TRADE_SHARE)
+        exchange = sim_exchange
 
     # Create order manager (based on mode)
     if is_live:
-        order_mgr = LiveOrderManager(exchange, symbol)
+        order_mgr = LiveOrderManager(exchange, symbol, channels=channels)
         console.print("[red]Using LIVE order manager[/red]")
     else:
-        order_mgr = SimOrderManager()
-        console.print("[cyan]Using SIMULATED order manager[/cyan]")
+        order_mgr = SimOrderManager(sim_exchange=sim_exchange)
+        console.print("[cyan]Using SIMULATED order manager[/cyan]" + (" (queue fill model)" if sim_exchange else ""))
+
+    # Fill ledger: realized PnL / fees from fills, persisted off the hot path
+    ledger = None
+    close_fill = None  # close_position_strategic fill callback (LIVE: fills seen while closing)
+    if FILL_LEDGER_FILE:
+        try:
+            ledger = FillLedger(
+                FILL_LEDGER_FILE, f"{MODE}:{symbol}",
+                maker_fee_bps=FILL_LEDGER_MAKER_FEE_BPS,
+                taker_fee_bps=FILL_LEDGER_TAKER_FEE_BPS,
+                flush_interval=FILL_LEDGER_FLUSH_SEC,
+            )
+            log_message(f"FILL LEDGER | {FILL_LEDGER_FILE} | {ledger.summary_line()}")
+        except sqlite3.Error as e:
+            console.print(f"[yellow]Fill ledger unavailable ({e}), PnL from position snapshots[/yellow]")
+            log_message(f"FILL LEDGER UNAVAILABLE | {e}")
+
+    # Collateral / margin: fills push balance changes, REST reconciles in the background (never in the loop)
+    account = AccountState(exchange, reconcile_interval=ACCOUNT_RECONCILE_SEC, log_fn=log_message)
+    if ledger is not None and sim_exchange is None:
+        ledger.listeners.append(account.on_fill)  # Simulated fills never move the real balance
+    sizer = OrderSizer(SIZE_UNIT, instrument.quantize_size)
+
+    # Other venues' books (lead-lag): composite fair value in our mark terms
+    ref_feeds = None
+    if REFERENCE_VENUES:
+        try:
+            ref_feeds = await build_reference_feeds(
+                REFERENCE_VENUES, COIN, create_exchange, symbol_create,
+                poll_ms=REFERENCE_POLL_MS,
+                max_age_ms=REFERENCE_MAX_AGE_MS,
+                basis_halflife_sec=REFERENCE_BASIS_HALFLIFE_SEC,
+            )
+            console.print(f"[dim]Reference feeds: {', '.join(f.name for f in ref_feeds.feeds)}[/dim]")
+            log_message(f"REFERENCE FEEDS | {', '.join(f.name for f in ref_feeds.feeds)}")
+        except Exception as e:
+            console.print(f"[yellow]Reference feeds unavailable ({e}), quoting from own mark only[/yellow]")
+            log_message(f"REFERENCE FEEDS UNAVAILABLE | {e}")
+
+    # Dead man's switch: own process + connection cancels everything if the loop stops beating
+    deadman = None
+    if is_live and DEADMAN_TIMEOUT_SEC > 0:
+        try:
+            deadman = DeadmanSwitch(DEADMAN_FILE, DEADMAN_TIMEOUT_SEC, log_fn=log_message)
+            if deadman.took_over:
+                log_message("DEADMAN | armed heartbeat from a previous run (unverified cancels or crash), taken over")
+            deadman.start(log_file=DEADMAN_LOG_FILE)
+            deadman.start_venue_switch(exchange)
+            log_message(f"DEADMAN | watchdog started | timeout {DEADMAN_TIMEOUT_SEC}s | log {DEADMAN_LOG_FILE}")
+        except OSError as e:
+            deadman = None
+            console.print(f"[yellow]Dead man's switch unavailable ({e})[/yellow]")
+            log_message(f"DEADMAN UNAVAILABLE | {e}")
 
     last_action = ""
 
+    # Event loop lag watchdog
+    loop_monitor = LoopLagMonitor(
+        log_fn=log_message,
+        interval=LOOP_LAG_INTERVAL,
+        threshold_ms=LOOP_LAG_THRESHOLD_MS,
+        debug_slow_callbacks=LOOP_DEBUG_SLOW_CALLBACKS,
+    )
+    loop_monitor.start()
+
+    # Signal-triggered profiler (SIGUSR1/SIGUSR2)
+    profiler_hooks = ProfilerHooks(log_fn=log_message, output_dir=PROFILE_DIR, duration=PROFILE_DURATION)
+    if profiler_hooks.install():
+        console.print(f"[dim]Profiling: kill -USR1 {os.getpid()} (start {PROFILE_DURATION}s), kill -USR2 {os.getpid()} (stop)[/dim]")
+
+    # Ingest / signal / reporting tasks and the fill queue around the decision loop
+    pipeline = Pipeline()
+
+    # Verified cancel-all for exit / restart (LIVE)
+    shutdown = ShutdownCoordinator(
+        [(exchange, symbol)],
+        timeout_sec=SHUTDOWN_CANCEL_TIMEOUT,
+        retries=SHUTDOWN_CANCEL_RETRIES,
+        poll_ms=SHUTDOWN_VERIFY_POLL_MS,
+        log_fn=log_message,
+    )
+
     try:
         # Start WS subscriptions
         console.print("Subscribing to price and orderbook...")
         if exchange.ws_client:
             await exchange.ws_client.subscribe_price(symbol)
             await exchange.ws_client.subscribe_orderbook(symbol)
+        if ref_feeds is not None:
+            await ref_feeds.start()
+        startup_timer.mark("subscribe")
 
-        # Wait for initial data
+        # Wait for first valid mark/orderbook while fetching account state in parallel
         console.print("Waiting for initial data...")
-        await asyncio.sleep(2)
+        (ready, ready_sec), collateral, initial_position, _ = await asyncio.gather(
+            wait_for_market_data(exchange, symbol, timeout=STARTUP_READY_TIMEOUT),
+            exchange.get_collateral(),
+            exchange.get_position(symbol),
+            order_mgr.fetch_orders() if is_live else asyncio.sleep(0),
+            return_exceptions=True,
+        )
+        if isinstance(collateral, Exception):
+            log_message(f"Startup collateral fetch failed: {collateral}")
+            collateral = None
+        account.apply_snapshot(collateral, source="startup")
+        account.start()
+        if collateral is None:
+            account.request_refresh()
+        if isinstance(initial_position, Exception):
+            initial_position = None
+        startup_timer.mark("ready")
+        startup_ms = (time.perf_counter() - init_start) * 1000
+        metrics.set("startup.ready_ms", startup_ms)
+        if ready:
+            log_message(f"READY | market data {ready_sec * 1000:.0f}ms | startup {startup_ms:.0f}ms")
+        else:
+            log_message(f"READY TIMEOUT | no valid market data after {STARTUP_READY_TIMEOUT}s, continuing")
+        if initial_position and float(initial_position.get("size", 0)) != 0:
+            log_message(f"Existing position at startup: {initial_position.get('side')} {initial_position.get('size')}")
 
-        # LIVE mode: Fetch existing orders
-        if is_live:
-            console.print("Fetching existing orders...")
-            await order_mgr.fetch_orders()
+        log_message(f"STARTUP | {startup_timer.total_ms():.0f}ms total | " + ", ".join(
+            f"{stage} {ms:.0f}ms" for stage, ms in startup_timer.stages))
+        if STARTUP_BENCH:
+            console.print(f"\n{startup_timer.report()}\n")
+            return
 
         # Track order existence time
         orders_exist_since: Optional[float] = None  # When orders started existing
-        countdown = float(MIN_WAIT_SEC)
+        countdown = float(rc.min_wait_sec)
 
         # Consecutive error tracking
         consecutive_errors = 0
 
-        # Snapshot tracking
-        last_snapshot_time = 0.0
-
-        # Collateral related (REST API available, refresh only when needed)
-        available_collateral = 0.0
-        total_collateral = 0.0
-        need_collateral_update = True  # True only on start + after close
-
-        # Auto restart tracking
+        # Auto restart tracking (supervisor.py staggers workers by shifting the first restart only)
         start_time = time.time()
+        restart_offset = float(os.environ.pop("MM_RESTART_OFFSET", "0") or 0)
+
+        # Config hot reload (mtime poll + SIGHUP)
+        config_watcher = ConfigWatcher(
+            path=config_module.__file__,
+            current=rc,
+            log_fn=log_message,
+            interval=CONFIG_RELOAD_INTERVAL,
+            restart_only={k: getattr(config_module, k) for k in RESTART_ONLY_KEYS},
+        )
+        config_watcher.install_signal()
 
         # Mid unstable cooldown tracking
         last_mid_unstable_time = 0.0
 
-        # Main loop (flicker-free update with Live context)
-        with Live(console=console, refresh_per_second=10, transient=True) as live:
+        # Market data age / feed latency
+        staleness = StalenessTracker(max_age_ms=STALE_DATA_MS, max_unchanged_ms=STALE_UNCHANGED_MS)
+
+        # ========== Pipeline stages (see pipeline.py) ==========
+        market = LatestValue("market")   # ingest -> signal, decision: newest tick only
+        reports = LatestValue("report")  # decision -> reporting: newest state only
+        ingest_stage = pipeline.stage("ingest")
+        signal_stage = pipeline.stage("signal") if adaptive is not None or shadow is not None else None
+        decision_stage = pipeline.stage("decision")
+        execution_stage = pipeline.stage("execution")
+        report_stage = pipeline.stage("report")
+        if ledger is not None:
+            # Every fill is booked, in order, outside the tick that produced it
+            fill_queue = pipeline.queue("fills", lambda fill: ledger.record(*fill[0], **fill[1]), maxsize=PIPELINE_FILL_QUEUE)
+            if sim_exchange is not None:
+                # Exact simulated fills (MM orders and closes)
+                sim_exchange.fill_listeners.append(
+                    lambda order_id, side, size, price, maker: fill_queue.put(((side, size, price, maker), {"order_id": order_id, "source": "sim"})))
+            else:
+                close_fill = lambda side, size, price, maker: fill_queue.put(((side, size, price, maker), {"source": "close"}))
+
+        async def ingest_market_data() -> None:
+            """Mark price + book -> market channel; channel health / resubscribe (own pace, own error count)"""
+            last_resubscribe_time = 0.0
+            errors = 0
+            while True:
+                try:
+                    with ingest_stage:
+                        now = time.time()
+
+                        # Channel health (each new REST fallback counts as a WS error)
+                        channels.update_fallbacks(exchange.get_fallback_stats())
+
+                        # Degraded market data channel: resubscribe in place (no restart)
+                        if (exchange.ws_client and not channels.is_healthy("ws_client")
+                                and (now - last_resubscribe_time) >= CHANNEL_RESUBSCRIBE_INTERVAL):
+                            last_resubscribe_time = now
+                            metrics.inc("channel.ws_client.resubscribes")
+                            log_message(f"CHANNEL DEGRADED | ws_client | resubscribing ({channels.summary_line()})")
+                            try:
+                                reconnect = getattr(exchange.ws_client, "reconnect", None)
+                                if reconnect is not None:
+                                    await reconnect()
+                                await exchange.ws_client.subscribe_price(symbol)
+                                await exchange.ws_client.subscribe_orderbook(symbol)
+                            except Exception as e:
+                                log_message(f"CHANNEL RESUBSCRIBE FAILED | ws_client | {e}")
+
+                        mark_price_str, orderbook = await asyncio.gather(
+                            exchange.get_mark_price(symbol),
+                            exchange.get_orderbook(symbol),
+                        )
+                        mark_price = staleness.stamp_mark(mark_price_str).value
+                        staleness.stamp_book(orderbook)
+                        # Invalid data (no mark / empty side) is not published: decisions go stale instead
+                        tick = build_tick(time.time(), mark_price, orderbook)
+                        if tick is not None:
+                            market.publish(tick)
+                    errors = 0
+                    await asyncio.sleep(REFRESH_INTERVAL)
+                except Exception as e:
+                    errors += 1
+                    log_message(f"INGEST ERROR [{errors}/{MAX_CONSECUTIVE_ERRORS}] {e}")
+                    if errors >= MAX_CONSECUTIVE_ERRORS:
+                        raise
+                    await asyncio.sleep(min(errors * 0.5, 10.0))
+
+        async def update_signals() -> None:
+            """Streaming signals + shadow strategies on every tick (decisions read the newest state)"""
+            seen = 0
+            while True:
+                tick, seen = await market.next(seen, stage=signal_stage)
+                with signal_stage:
+                    if adaptive is not None:
+                        signals.on_tick(tick.time, tick.mark_price, tick.bids, tick.asks)
+                    if shadow is not None:
+                        shadow.on_tick(tick.time, tick.mark_price, tick.best_bid, tick.best_ask,
+                                       tick.mid_diff_bps, sizer.last_size)
+
+        async def publish_reports() -> None:
+            """Health lines, dashboard / UI process, snapshot and shadow report from the newest decision state"""
+            last_snapshot_time = 0.0
+            last_shadow_report = time.time()
+            seen = 0
+            while True:
+                (state, budget), seen = await reports.next(seen, stage=report_stage)
+                with report_stage:
+                    now = time.time()
+                    health_lines = [
+                        loop_monitor.summary_line(),
+                        deadline_summary_line(),
+                        staleness.summary_line(),
+                        channels.summary_line(),
+                        f"{account.summary_line()}  |  {sizer.summary_line()}",
+                        pipeline.summary_line(),
+                    ]
+                    if shadow is not None:
+                        health_lines.append(shadow.summary_line())
+                    if sim_exchange is not None:
+                        health_lines.append(sim_exchange.summary_line())
+                    if ledger is not None:
+                        health_lines.append(ledger.summary_line())
+                    if adaptive is not None:
+                        health_lines.append(f"{signals.summary_line(ADAPTIVE_VOL_HORIZON_SEC)}  |  {adaptive.summary_line()}")
+                    if ref_feeds is not None:
+                        health_lines.append(ref_feeds.summary_line())
+                    if deadman is not None:
+                        health_lines.append(deadman.summary_line())
+                    if recorder is not None:
+                        health_lines.append(recorder.summary_line())
+
+                    # Plain, picklable dashboard state (rendered here or in the UI process)
+                    ui_state = {
+                        **state,
+                        "available_collateral": account.available_collateral,
+                        "total_collateral": account.total_collateral,
+                        "pos_stats": dict(position_stats),
+                        "health_lines": health_lines,
+                    }
+
+                    if ui_publisher is not None:
+                        # Dashboard + snapshot rendered in the UI process
+                        ui_publisher.publish_state(ui_state)
+                    else:
+                        # Dashboard (skipped if headless or the decision that produced it ran over budget)
+                        if not HEADLESS and budget.allow("dashboard"):
+                            live.update(build_dashboard_from_state(ui_state))
+
+                        # Snapshot files
+                        if SNAPSHOT_INTERVAL > 0 and (now - last_snapshot_time) >= SNAPSHOT_INTERVAL and budget.allow("snapshot"):
+                            try:
+                                write_snapshot(SNAPSHOT_FILE, ui_state)
+                                if STATUS_JSON_FILE:
+                                    write_status_json(STATUS_JSON_FILE, ui_state)
+                                last_snapshot_time = now
+                            except Exception:
+                                pass  # Ignore snapshot failures
+
+                    if shadow is not None and SHADOW_REPORT_INTERVAL > 0 and (now - last_shadow_report) >= SHADOW_REPORT_INTERVAL:
+                        last_shadow_report = now
+                        log_message(shadow.summary_line())
+                        try:
+                            with open(SHADOW_REPORT_FILE, "w", encoding="utf-8") as f:
+                                f.write(shadow.report() + "\n")
+                        except OSError:
+                            pass
+
+        async def restart(reason: str) -> None:
+            """Verified cancel-all, flush what does not survive execv, replace the process"""
+            cancelled = True
+            if is_live:
+                cancelled = await shutdown.cancel_all()
+                if cancelled:
+                    console.print(f"[green]All orders cancelled before restart ({shutdown.elapsed_ms:.0f}ms).[/green]")
+                else:
+                    # Unconfirmed cancels: give the exchange time (the new process adopts what is left)
+                    console.print(f"[yellow]{shutdown.left} orders not confirmed cancelled, restarting in {RESTART_DELAY}s...[/yellow]")
+                    await asyncio.sleep(RESTART_DELAY)
+            file_logger.info(reason)
+            if ui_publisher is not None:
+                ui_publisher.close()  # Same PID after execv: stop the companion explicitly
+            if ledger is not None:
+                pipeline.drain()  # Queued fills first
+                ledger.close()  # Flush pending fills (threads do not survive execv)
+            if deadman is not None:
+                if cancelled:
+                    await deadman.close()  # Orders cancelled, the new process starts its own
+                else:
+                    # Stays armed: cancels the leftovers unless the new process takes over the heartbeat in time
+                    log_message("DEADMAN | watchdog left running across restart to cancel the remaining orders")
+            if recorder is not None:
+                recorder.finish()
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+
+        # Decision + execution loop (flicker-free update with Live context, nothing rendered when headless)
+        if HEADLESS or SPLIT_MODE:
+            from plain_console import NullLive
+            live_ctx = NullLive()
+        else:
+            from rich.live import Live
+            live_ctx = Live(console=console, refresh_per_second=10, transient=True)
+        with live_ctx as live:
+            pipeline.start("ingest", ingest_market_data())
+            if signal_stage is not None:
+                pipeline.start("signal", update_signals())
+            pipeline.start("report", publish_reports())
+            tick_version = 0
+
             while True:
                 try:
+                    # A stage that gave up (ingest: too many consecutive errors) stops the bot like the loop used to
+                    failure = pipeline.failure()
+                    if failure is not None:
+                        log_message(f"PIPELINE STOPPED | {failure[0]} | {failure[1]}")
+                        console.print(f"[red]{failure[0]} stage stopped: {failure[1]}, exiting...[/red]")
+                        break
+
+                    # Newest tick (older unread ones are dropped); without new data the checks below run again
+                    tick, tick_version = await market.next(tick_version, timeout=PIPELINE_IDLE_SEC, stage=decision_stage)
+                    if tick is None:
+                        continue  # No valid market data yet
                     current_time = time.time()
+                    budget = IterationBudget(ITERATION_BUDGET)
+                    execution_before = execution_stage.total_ms
+
+                    # Apply reloaded config atomically between iterations
+                    new_rc = config_watcher.poll()
+                    if new_rc is not None:
+                        changed = rc.diff(new_rc)
+                        rc = new_rc
+                        file_logger.info(f"CONFIG RELOAD | {', '.join(k.upper() for k in changed)}")
+                        # Quotes placed with old spread/size are replaced right away
+                        if changed.keys() & {"spread_bps", "leverage", "max_size_btc"}:
+                            with execution_stage:
+                                await order_mgr.cancel_all("Config reloaded")
+                            orders_exist_since = None
+                        last_action = f"Config reloaded ({', '.join(k.upper() for k in changed)})"
 
                     # Auto restart check (time-based)
-                    if RESTART_INTERVAL > 0 and (current_time - start_time) >= RESTART_INTERVAL:
+                    if RESTART_INTERVAL > 0 and (current_time - start_time) >= RESTART_INTERVAL + restart_offset:
                         log_message(f"AUTO RESTART | Interval: {RESTART_INTERVAL}s")
                         console.print(f"\n[yellow]Restarting after {RESTART_INTERVAL}s...[/yellow]")
-                        if is_live:
-                            await order_mgr.exchange.cancel_orders(symbol=order_mgr.symbol)
-                            console.print(f"[green]All orders cancelled before restart...{RESTART_DELAY}s remains.[/green]")
-                            await asyncio.sleep(RESTART_DELAY)
-                        file_logger.info(f"AUTO RESTART | Interval: {RESTART_INTERVAL}s")
-                        os.execv(sys.executable, [sys.executable] + sys.argv)
-
-                    # WS fallback check (force restart if too many REST fallbacks)
-                    if MAX_WS_FALLBACK > 0:
-                        fallback_stats = exchange.get_fallback_stats()
-                        ws_total = fallback_stats.get("ws_client", {}).get("total", 0)
-                        order_ws_total = fallback_stats.get("order_ws_client", {}).get("total", 0)
-                        if ws_total >= MAX_WS_FALLBACK or order_ws_total >= MAX_WS_FALLBACK:
-                            log_message(f"FORCE RESTART | WS fallback exceeded (ws: {ws_total}, order_ws: {order_ws_total})")
-                            console.print(f"\n[red]WS fallback limit exceeded (ws: {ws_total}, order_ws: {order_ws_total})[/red]")
-                            console.print("[yellow]Force restarting to restore WS connection...[/yellow]")
-                            if is_live:
-                                await order_mgr.exchange.cancel_orders(symbol=order_mgr.symbol)
-                                console.print(f"[green]All orders cancelled before restart...{RESTART_DELAY}s remains.[/green]")
-                                await asyncio.sleep(RESTART_DELAY)
-                            file_logger.info(f"FORCE RESTART | WS fallback exceeded (ws: {ws_total}, order_ws: {order_ws_total})")
-                            os.execv(sys.executable, [sys.executable] + sys.argv)
-
-                    # Collateral refresh (on start or after close)
-                    if need_collateral_update:
-                        need_collateral_update = False
-                        collateral = await exchange.get_collateral()
-                        available_collateral = float(collateral.get("available_collateral", 0))
-                        total_collateral = float(collateral.get("total_collateral", 0))
+                        await restart(f"AUTO RESTART | Interval: {RESTART_INTERVAL}s")
+
+                    # Last resort: restart if a channel stays degraded too long
+                    degraded_sec = max(channels.unhealthy_for(name) for name in channels.channels)
+                    if CHANNEL_RESTART_SEC > 0 and degraded_sec >= CHANNEL_RESTART_SEC:
+                        log_message(f"FORCE RESTART | channel degraded for {degraded_sec:.0f}s ({channels.summary_line()})")
+                        console.print(f"\n[red]Channel degraded for {degraded_sec:.0f}s ({channels.summary_line()})[/red]")
+                        console.print("[yellow]Force restarting to restore WS connection...[/yellow]")
+                        await restart(f"FORCE RESTART | channel degraded for {degraded_sec:.0f}s")
 
                     # ========== 0. LIVE mode: Fetch orders from server ==========
                     if is_live:
-                        await order_mgr.fetch_orders()
-
-                    # ========== 1. Fetch real-time data ==========
-                    # Get mark_price
-                    mark_price_str = await exchange.get_mark_price(symbol)
-                    mark_price = float(mark_price_str)
-
-                    # Data validation: mark_price
-                    if mark_price <= 0:
-                        await asyncio.sleep(REFRESH_INTERVAL)
-                        continue
-
-                    # Get orderbook
-                    orderbook = await exchange.get_orderbook(symbol)
-                    bids = orderbook.get("bids", [])
-                    asks = orderbook.get("asks", [])
-
-                    # Data validation: orderbook
-                    if not bids or not asks:
-                        await asyncio.sleep(REFRESH_INTERVAL)
-                        continue
-
-                    best_bid = bids[0][0]
-                    best_ask = asks[0][0]
-                    best_bid_size = bids[0][1] if len(bids[0]) > 1 else 0
-                    best_ask_size = asks[0][1] if len(asks[0]) > 1 else 0
-
-                    # Calculate mid price drift (size-weighted average)
-                    total_size = best_bid_size + best_ask_size
-                    mid_price = (best_bid * best_bid_size + best_ask * best_ask_size) / total_size if total_size > 0 else (best_bid + best_ask) / 2
-                    mid_diff_bps = abs((mid_price - mark_price) / mark_price * 10000) if mark_price > 0 else 0
+                        with execution_stage:
+                            await order_mgr.fetch_orders()
 
+                    # ========== 1. Market data (from the ingest stage) ==========
+                    mark_price = tick.mark_price
+                    best_bid, best_ask = tick.best_bid, tick.best_ask
+                    best_bid_size, best_ask_size = tick.best_bid_size, tick.best_ask_size
+                    mid_diff_bps = tick.mid_diff_bps
 
                     # Calculate based on total (consistent size display even with orders)
-                    order_size = calc_order_size(total_collateral, mark_price)
+                    # Recomputed only when collateral / leverage / max size change or mark leaves the same-lot band
+                    order_size = sizer.size(account.total_collateral, mark_price, rc.leverage, rc.max_size_btc)
 
                     # Get position
-                    position = await exchange.get_position(symbol)
+                    with execution_stage:
+                        position = await exchange.get_position(symbol)
 
                     # ========== Auto Position Close ==========
-                    if AUTO_CLOSE_POSITION and position and float(position.get("size", 0)) != 0:
+                    if rc.auto_close_position and position and float(position.get("size", 0)) != 0:
                         # 1. Cancel all orders
-                        await order_mgr.cancel_all("Position detected - auto close")
+                        with execution_stage:
+                            await order_mgr.cancel_all("Position detected - auto close")
                         orders_exist_since = None
 
                         # 2. Collect position info
@@ -1014,23 +1316,40 @@ async def main():
                         pos_entry = float(position.get("entry_price", 0))
                         pos_pnl = float(position.get("unrealized_pnl", 0))
 
+                        # LIVE: book the fills that opened this position (ledger has not seen them)
+                        pipeline.drain()  # Queued fills first
+                        if ledger is not None and sim_exchange is None:
+                            ledger.sync_position(pos_side, pos_size, pos_entry, mark_price)
+                        pnl_before = ledger.net_pnl if ledger is not None else 0.0
+
                         # Log: Position detected
                         log_message(f"POSITION DETECTED | {pos_side} {pos_size:.6f} BTC @ {pos_entry:.2f} | uPnL: ${pos_pnl:+.2f}")
                         file_logger.info(f"POSITION DETECTED | {pos_side} {pos_size:.6f} BTC @ {pos_entry:.2f} | uPnL: ${pos_pnl:+.2f}")
-                        console.print(f"[yellow]Auto-closing {pos_side} {pos_size:.4f} via {CLOSE_METHOD} (uPnL: ${pos_pnl:+.2f})...[/yellow]")
+                        console.print(f"[yellow]Auto-closing {pos_side} {pos_size:.4f} via {rc.close_method} (uPnL: ${pos_pnl:+.2f})...[/yellow]")
 
-                        # 3. Strategic position close
+                        # 3. Strategic position close (may outlast the heartbeat timeout on purpose)
+                        if deadman is not None:
+                            deadman.disarm()
                         try:
-                            _success, elapsed_time, iterations, close_log = await close_position_strategic(
-                                exchange=exchange,
-                                symbol=symbol,
-                                position=position,
-                                method=CLOSE_METHOD,
-                                aggressive_bps=CLOSE_AGGRESSIVE_BPS,
-                                wait_sec=CLOSE_WAIT_SEC,
-                                min_size_market=CLOSE_MIN_SIZE_MARKET,
-                                max_iterations=CLOSE_MAX_ITERATIONS,
-                            )
+                            with execution_stage:
+                                _success, elapsed_time, iterations, close_log = await close_position_strategic(
+                                    exchange=exchange,
+                                    symbol=symbol,
+                                    position=position,
+                                    method=rc.close_method,
+                                    aggressive_bps=rc.close_aggressive_bps,
+                                    wait_sec=rc.close_wait_sec,
+                                    min_size_market=rc.close_min_size_market,
+                                    max_iterations=rc.close_max_iterations,
+                                    on_fill=close_fill,
+                                    instrument=instrument,
+                                )
+                            # Realized PnL of this close (net of fees) from the ledger, else the uPnL seen at detection
+                            if ledger is not None:
+                                pipeline.drain()
+                                if sim_exchange is None:
+                                    ledger.sync_position(pos_side, 0.0, 0.0, mark_price, source="reconcile")
+                                pos_pnl = ledger.net_pnl - pnl_before
 
                             # Update statistics
                             position_stats["total_closes"] += 1
@@ -1042,7 +1361,7 @@ async def main():
                             # Log: Position closed
                             close_msg = (
                                 f"POSITION CLOSED  | {pos_side} {pos_size:.6f} BTC | PnL: ${pos_pnl:+.2f} | "
-                                f"Method: {CLOSE_METHOD} | Time: {elapsed_time:.2f}s ({iterations} iter)"
+                                f"Method: {rc.close_method} | Time: {elapsed_time:.2f}s ({iterations} iter)"
                             )
                             log_message(close_msg)
                             file_logger.info(
@@ -1050,21 +1369,30 @@ async def main():
                                 f"{position_stats['total_volume']:.6f} BTC, ${position_stats['total_pnl']:+.2f}"
                             )
 
-                            last_action = f"Closed {pos_side} {pos_size:.4f} via {CLOSE_METHOD} ({elapsed_time:.1f}s, ${pos_pnl:+.2f})"
+                            last_action = f"Closed {pos_side} {pos_size:.4f} via {rc.close_method} ({elapsed_time:.1f}s, ${pos_pnl:+.2f})"
                             console.print(f"[green]{close_log} (PnL: ${pos_pnl:+.2f})[/green]")
                         except Exception as e:
                             log_message(f"POSITION CLOSE FAILED | {pos_side} {pos_size:.6f} BTC | Error: {e}")
                             file_logger.info(f"POSITION CLOSE FAILED | {pos_side} {pos_size:.6f} BTC | uPnL: ${pos_pnl:+.2f} | Error: {e}")
                             console.print(f"[red]Failed to close position: {e}[/red]")
 
-                        # Refresh collateral in next iteration
-                        need_collateral_update = True
+                        # Reconcile collateral in the background
+                        account.request_refresh()
 
                         await asyncio.sleep(REFRESH_INTERVAL)
                         continue
 
-                    # Calculate order prices
-                    buy_price, sell_price = calc_order_prices(mark_price, SPREAD_BPS)
+                    # Calculate order prices (spread / drift threshold volatility-adjusted when ADAPTIVE_QUOTING)
+                    quote_rc = rc
+                    if adaptive is not None:
+                        spread_bps, drift_threshold = adaptive.update(signals, rc.spread_bps, rc.drift_threshold)
+                        quote_rc = replace(rc, spread_bps=spread_bps, drift_threshold=drift_threshold)
+                        buy_price, sell_price = calc_skewed_order_prices(mark_price, spread_bps, adaptive.skew_bps(signals))
+                    else:
+                        buy_price, sell_price = calc_order_prices(mark_price, rc.spread_bps)
+                    # Tick grid (passive rounding), min notional checked at the lower (buy) price
+                    buy_price, sell_price = instrument.quantize_quotes(buy_price, sell_price)
+                    order_size = instrument.quantize_size(order_size, buy_price)
 
                     # Maker/taker determination
                     buy_is_maker, sell_is_maker = check_maker_taker(
@@ -1089,27 +1417,40 @@ async def main():
 
                     # ========== 2. Status Determination ==========
                     # If USE_MID_DRIFT is True, combine mark drift + mid drift; otherwise mark drift only
-                    effective_drift = (drift_bps + mid_diff_bps) if USE_MID_DRIFT else drift_bps
+                    effective_drift = (drift_bps + mid_diff_bps) if rc.use_mid_drift else drift_bps
                     # Wait for orders if mark-mid diff is too large (only when MARK_MID_DIFF_LIMIT > 0)
-                    mid_unstable = MARK_MID_DIFF_LIMIT > 0 and mid_diff_bps > MARK_MID_DIFF_LIMIT
+                    mid_unstable = rc.mark_mid_diff_limit > 0 and mid_diff_bps > rc.mark_mid_diff_limit
 
                     # Record mid unstable time and check cooldown
                     if mid_unstable:
                         last_mid_unstable_time = time.time()
                     mid_cooldown_active = (
-                        MID_UNSTABLE_COOLDOWN > 0 and
+                        rc.mid_unstable_cooldown > 0 and
                         last_mid_unstable_time > 0 and
-                        (time.time() - last_mid_unstable_time) < MID_UNSTABLE_COOLDOWN
+                        (time.time() - last_mid_unstable_time) < rc.mid_unstable_cooldown
                     )
 
+                    # Stale market data: never quote off old prices
+                    is_stale, stale_reason = staleness.check()
+
+                    # Reference venues ahead of our mark: pull / hold quotes until the mark catches up
+                    # (lead only: the mark's own drift is left to the drift rebalance)
+                    ref_lead = False
+                    if ref_feeds is not None and ref_feeds.update(current_time, mark_price) is not None:
+                        ref_lead = abs(ref_feeds.lead_bps) > REFERENCE_CANCEL_BPS
+
                     if order_size <= 0:
                         status = "NO_SIZE"
+                    elif is_stale:
+                        status = "STALE"
+                    elif ref_lead:
+                        status = "REF_LEAD"
                     elif not buy_is_maker or not sell_is_maker:
                         status = "WAITING"
                     elif (mid_unstable or mid_cooldown_active) and not has_orders:
                         status = "MID_WAIT"  # Waiting for mid drift stability (or cooldown)
                     elif has_orders:
-                        if effective_drift > DRIFT_THRESHOLD:
+                        if effective_drift > quote_rc.drift_threshold:
                             status = "REBALANCING"
                         else:
                             status = "MONITORING"
@@ -1122,88 +1463,93 @@ async def main():
                         if orders_exist_since is None:
                             orders_exist_since = now  # Orders first detected
                         time_with_orders = now - orders_exist_since
-                        countdown = max(0.0, MIN_WAIT_SEC - time_with_orders)
-                        can_modify_orders = time_with_orders >= MIN_WAIT_SEC
+                        countdown = max(0.0, rc.min_wait_sec - time_with_orders)
+                        can_modify_orders = time_with_orders >= rc.min_wait_sec
                     else:
                         orders_exist_since = None  # Reset if no orders
                         countdown = 0.0
                         can_modify_orders = True  # Can place new orders immediately if none exist
 
                     # ========== 4. Order Logic ==========
+                    # Stale data - pull quotes immediately (no MIN_WAIT_SEC)
+                    if is_stale:
+                        if has_orders:
+                            with execution_stage:
+                                await order_mgr.cancel_all(f"Stale market data ({stale_reason})")
+                            last_action = f"Cancelled: stale data ({stale_reason})"
+                            log_message(f"STALE DATA | {stale_reason} | orders cancelled")
+                            orders_exist_since = None
+
+                    # Reference venues moved first - pull quotes immediately (no MIN_WAIT_SEC)
+                    elif ref_lead:
+                        if has_orders:
+                            ref_feeds.early_cancels += 1
+                            order_mgr.rebalance()
+                            with execution_stage:
+                                await order_mgr.cancel_all(f"Reference lead ({ref_feeds.lead_bps:+.1f}bps)")
+                            last_action = f"Cancelled: reference lead {ref_feeds.lead_bps:+.1f}bps"
+                            log_message(f"REFERENCE LEAD | fair {ref_feeds.fair:,.2f} vs mark {mark_price:,.2f} | orders cancelled")
+                            orders_exist_since = None
+
                     # Drift check - rebalance (after MIN_WAIT_SEC delay)
-                    if has_orders and effective_drift > DRIFT_THRESHOLD and can_modify_orders:
+                    elif has_orders and effective_drift > quote_rc.drift_threshold and can_modify_orders:
                         order_mgr.rebalance()
-                        await order_mgr.cancel_all("Drift exceeded threshold")
-                        drift_info = f"{drift_bps:.1f}+{mid_diff_bps:.1f}" if USE_MID_DRIFT else f"{drift_bps:.1f}"
+                        with execution_stage:
+                            await order_mgr.cancel_all("Drift exceeded threshold")
+                        drift_info = f"{drift_bps:.1f}+{mid_diff_bps:.1f}" if rc.use_mid_drift else f"{drift_bps:.1f}"
                         last_action = f"Cancelled for rebalance (drift: {drift_info}bps)"
                         orders_exist_since = None
-                        await asyncio.sleep(CANCEL_AFTER_DELAY)
+                        await asyncio.sleep(rc.cancel_after_delay)
                         continue  # Place new order with fresh price in next iteration
 
                     # No orders and maker conditions met - place new orders (only when mid stable + cooldown done)
                     elif not has_orders and buy_is_maker and sell_is_maker and not mid_unstable and not mid_cooldown_active:
-                        buy_order, sell_order = await staggered_gather(
-                            order_mgr.place_order("buy", buy_price, order_size, mark_price),
-                            order_mgr.place_order("sell", sell_price, order_size, mark_price),
-                        )
+                        with execution_stage:
+                            buy_order, sell_order = await staggered_gather(
+                                order_mgr.place_order("buy", buy_price, order_size, mark_price),
+                                order_mgr.place_order("sell", sell_price, order_size, mark_price),
+                            )
                         if buy_order and sell_order:
                             # {'code': 0, 'message': 'success', 'request_id': '....'}
                             has_orders = buy_order.message == 'success' and sell_order.message == 'success'
                             last_action = f"Placed BUY @ {format_price(buy_price)}, SELL @ {format_price(sell_price)}"
                             orders_exist_since = time.time()  # Start timer
 
-                    # ========== 5. Display Dashboard ==========
-                    dashboard = build_dashboard(
-                        symbol=symbol,
-                        mark_price=mark_price,
-                        best_bid=best_bid,
-                        best_ask=best_ask,
-                        best_bid_size=best_bid_size,
-                        best_ask_size=best_ask_size,
-                        buy_is_maker=buy_is_maker,
-                        sell_is_maker=sell_is_maker,
-                        drift_bps=drift_bps,
-                        status=status,
-                        countdown=countdown,
-                        spread_bps=ob_spread_bps,
-                        order_mgr=order_mgr,
-                        available_collateral=available_collateral,
-                        total_collateral=total_collateral,
-                        order_size=order_size,
-                        position=position,
-                        pos_stats=position_stats,
-                        last_action=last_action,
-                        mode=MODE
-                    )
-                    live.update(dashboard)
-
-                    # ========== 6. Save Snapshot ==========
-                    if SNAPSHOT_INTERVAL > 0 and (current_time - last_snapshot_time) >= SNAPSHOT_INTERVAL:
-                        try:
-                            buy_order = order_mgr.get_buy_order()
-                            sell_order = order_mgr.get_sell_order()
-                            with open(SNAPSHOT_FILE, "w", encoding="utf-8") as f:
-                                f.write(f"[{MODE}] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                                f.write(f"Mark: {mark_price:,.2f} | Spread: {ob_spread_bps:.1f}bps\n")
-                                f.write(f"Total: ${total_collateral:,.2f} | Available: ${available_collateral:,.2f} | Size: {order_size:.4f} BTC\n")
-                                if buy_order:
-                                    f.write(f"BUY:  {buy_order.price:,.2f} ({buy_order.status})\n")
-                                if sell_order:
-                                    f.write(f"SELL: {sell_order.price:,.2f} ({sell_order.status})\n")
-                                if position and float(position.get("size", 0)) != 0:
-                                    f.write(f"Position: {position.get('side')} {position.get('size')} uPnL: ${position.get('unrealized_pnl', 0):+.2f}\n")
-                                f.write(f"Status: {status}\n")
-                            last_snapshot_time = current_time
-                        except Exception:
-                            pass  # Ignore snapshot failures
+                    # ========== 5. Hand the state to the reporting stage ==========
+                    # Finished first: the report task's skip policy judges this decision's own time
+                    iteration_ms = budget.finish()
+                    reports.publish(({
+                        "symbol": symbol,
+                        "mark_price": mark_price,
+                        "best_bid": best_bid,
+                        "best_ask": best_ask,
+                        "best_bid_size": best_bid_size,
+                        "best_ask_size": best_ask_size,
+                        "buy_is_maker": buy_is_maker,
+                        "sell_is_maker": sell_is_maker,
+                        "drift_bps": drift_bps,
+                        "status": status,
+                        "countdown": countdown,
+                        "spread_bps": ob_spread_bps,
+                        "orders": order_view(order_mgr),
+                        "order_size": order_size,
+                        "position": dict(position) if position else position,
+                        "last_action": last_action,
+                        "mode": MODE,
+                        "rc": quote_rc,
+                    }, budget))
 
                     # Reset error counter on success
                     consecutive_errors = 0
-                    await asyncio.sleep(REFRESH_INTERVAL)
+                    if deadman is not None:
+                        deadman.beat()
+                    decision_stage.observe(iteration_ms - (execution_stage.total_ms - execution_before))
 
                 except Exception as e:
                     consecutive_errors += 1
                     backoff = min(consecutive_errors * 0.5, 10.0)  # Max 10 seconds
+                    if is_auth_error(e):
+                        clear_cached_auth(AUTH_CACHE_FILE)  # Next start / restart logs in again
                     log_message(f"ERROR [{consecutive_errors}/{MAX_CONSECUTIVE_ERRORS}] {e}")
                     console.print(f"[red][Error {consecutive_errors}/{MAX_CONSECUTIVE_ERRORS}] {e}[/red]")
 
@@ -1217,14 +1563,34 @@ async def main():
     except KeyboardInterrupt:
         console.print("\n[yellow]Shutting down...[/yellow]")
     finally:
-        # Cancel all orders before exit (all symbol orders regardless of cache)
+        shutdown_start = time.perf_counter()
+        profiler_hooks.uninstall()
+
+        # Cancel all orders before exit (all symbol orders regardless of cache, verified),
+        # background tasks stop meanwhile
+        stopping = [("loop monitor", loop_monitor.stop()), ("account", account.stop()), ("pipeline", pipeline.stop())]
+        if ref_feeds is not None:
+            stopping.append(("reference feeds", ref_feeds.stop()))
+        cancelled = True
         if is_live:
             console.print("Cancelling all orders...")
-            try:
-                await order_mgr.exchange.cancel_orders(symbol=order_mgr.symbol)
-                console.print("[green]All orders cancelled.[/green]")
-            except Exception as e:
-                console.print(f"[red]Failed to cancel orders: {e}[/red]")
+            stopping.insert(0, ("cancel-all", shutdown.cancel_all()))
+        results = await asyncio.gather(*[coro for _name, coro in stopping], return_exceptions=True)
+        for (name, _coro), result in zip(stopping, results):
+            if isinstance(result, BaseException):
+                log_message(f"SHUTDOWN | {name} stop failed: {type(result).__name__} {result}")
+        if is_live:
+            cancelled = results[0] is True
+            if cancelled:
+                console.print(f"[green]All orders cancelled ({shutdown.summary_line()}).[/green]")
+            else:
+                console.print(f"[red]Orders not confirmed cancelled ({shutdown.summary_line()}), check the exchange![/red]")
+        if deadman is not None:
+            if cancelled:
+                await deadman.close()
+            else:
+                # Watchdog outlives us and sends its own cancel-all once this process is gone
+                log_message("DEADMAN | watchdog left running to cancel the remaining orders")
 
         console.print("\n[bold]Final Statistics:[/bold]")
         console.print(f"  Total Orders Placed:    {order_mgr.total_placed}")
@@ -1237,11 +1603,24 @@ async def main():
         if position_stats['total_close_time'] > 0:
             avg_close_time = position_stats['total_close_time'] / max(1, position_stats['total_closes'])
             console.print(f"  Total Close Time:       {position_stats['total_close_time']:.1f}s (avg: {avg_close_time:.1f}s)")
+        console.print(f"  {loop_monitor.summary_line()}")
+        console.print(f"  {deadline_summary_line()}")
+        console.print(f"  {pipeline.summary_line()}")
+        if ledger is not None:
+            ledger.close()
+            console.print(f"  {ledger.summary_line()}")
+        if shadow is not None and shadow.ticks:
+            report = shadow.report()
+            console.print(f"\n{report}")
+            log_message(report)
 
         console.print("Closing exchange connection...")
         await exchange.close()
         console.print("Done.")
-        log_message("Bot stopped")
+        log_message(f"Bot stopped | shutdown {(time.perf_counter() - shutdown_start) * 1000:.0f}ms")
+
+        if ui_publisher is not None:
+            ui_publisher.close()
 
         # Close console log file
         _console_log_file.close()
@@ -1249,6 +1628,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
+        runtime_profile.apply_profile(RUNTIME_PROFILE)  # Event loop policy must be set before asyncio.run
         asyncio.run(main())
     except KeyboardInterrupt:
         pass
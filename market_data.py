@@ -0,0 +1,158 @@
+"""
+Market Data Timestamps & Staleness
+==================================
+Every mark price / orderbook read is stamped with its exchange timestamp
+(if the payload carries one) and the local receive time.
+
+- Feed latency (receive - exchange time) is tracked as a distribution,
+  once per new exchange message.
+- Data age is checked against thresholds; stale data suppresses quoting
+  (STALE status in main loop).
+
+When the payload has no exchange timestamp (e.g. plain mark price string),
+age falls back to "time since the value last changed", which catches a
+frozen WS cache after a hiccup.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from metrics import metrics
+
+# Payload keys that may carry an exchange timestamp
+_TS_KEYS = ("timestamp", "ts", "time", "updated_at", "update_time", "E", "T")
+
+FEED_LATENCY_BUCKETS = (5, 10, 20, 50, 100, 200, 300, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+def to_seconds(ts: Any) -> float:
+    """Normalize s/ms/us/ns epoch timestamps (number or numeric string) to seconds"""
+    try:
+        ts = float(ts)
+    except (TypeError, ValueError):
+        return 0.0
+    if ts <= 0:
+        return 0.0
+    if ts > 1e17:      # ns
+        return ts / 1e9
+    if ts > 1e14:      # us
+        return ts / 1e6
+    if ts > 1e11:      # ms
+        return ts / 1e3
+    return ts
+
+
+def extract_exchange_ts(payload: Any) -> float:
+    """Exchange timestamp (sec) from a dict payload, 0.0 if absent"""
+    if not isinstance(payload, dict):
+        return 0.0
+    for key in _TS_KEYS:
+        if key in payload:
+            ts = to_seconds(payload[key])
+            if ts > 0:
+                return ts
+    return 0.0
+
+
+@dataclass
+class MarketSample:
+    """Market data value with exchange / receive timestamps (sec)"""
+    value: Any
+    exchange_ts: float = 0.0   # 0.0 = unknown
+    recv_ts: float = 0.0
+    changed_ts: float = 0.0    # last time the value itself changed
+
+    def age_ms(self, now: Optional[float] = None) -> float:
+        """Data age: vs exchange time if known, else since last value change"""
+        now = now if now is not None else time.time()
+        ref = self.exchange_ts if self.exchange_ts > 0 else self.changed_ts
+        return max(0.0, (now - ref) * 1000) if ref > 0 else 0.0
+
+
+class _FeedStamper:
+    """Stamps one feed (mark or book) and records its latency"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.sample: Optional[MarketSample] = None
+        self._last_key: Any = None
+
+    def stamp(self, value: Any, payload: Any, change_key: Any) -> MarketSample:
+        now = time.time()
+        exchange_ts = extract_exchange_ts(payload)
+        prev = self.sample
+
+        changed_ts = now if (prev is None or change_key != self._last_key) else prev.changed_ts
+        self._last_key = change_key
+
+        # Latency only once per new exchange message
+        if exchange_ts > 0 and (prev is None or exchange_ts != prev.exchange_ts):
+            latency_ms = max(0.0, (now - exchange_ts) * 1000)
+            metrics.observe(f"feed.{self.name}_latency_ms", latency_ms, FEED_LATENCY_BUCKETS)
+
+        self.sample = MarketSample(value=value, exchange_ts=exchange_ts, recv_ts=now, changed_ts=changed_ts)
+        metrics.set(f"feed.{self.name}_age_ms", self.sample.age_ms(now))
+        return self.sample
+
+
+class StalenessTracker:
+    """Stamp mark / orderbook reads and decide whether data is too old to quote on"""
+
+    def __init__(self, max_age_ms: float, max_unchanged_ms: float = 0.0):
+        """
+        Args:
+            max_age_ms: Max age vs exchange timestamp (0 to disable)
+            max_unchanged_ms: Max time a value may stay unchanged when the
+                payload has no exchange timestamp (0 to disable)
+        """
+        self.max_age_ms = max_age_ms
+        self.max_unchanged_ms = max_unchanged_ms
+        self.mark = _FeedStamper("mark")
+        self.book = _FeedStamper("book")
+
+    def stamp_mark(self, raw: Any) -> MarketSample:
+        """Stamp get_mark_price() result (str/float or dict with price + timestamp)"""
+        if isinstance(raw, dict):
+            value = float(raw.get("mark_price", raw.get("price", 0)))
+        else:
+            value = float(raw)
+        return self.mark.stamp(value, raw, value)
+
+    def stamp_book(self, orderbook: Any) -> MarketSample:
+        """Stamp get_orderbook() result (top of book used for change detection)"""
+        bids = orderbook.get("bids", []) if isinstance(orderbook, dict) else []
+        asks = orderbook.get("asks", []) if isinstance(orderbook, dict) else []
+        top = (tuple(bids[0]) if bids else None, tuple(asks[0]) if asks else None)
+        return self.book.stamp(orderbook, orderbook, top)
+
+    def check(self, now: Optional[float] = None) -> Tuple[bool, str]:
+        """(is_stale, reason)"""
+        now = now if now is not None else time.time()
+        for feed in (self.mark, self.book):
+            sample = feed.sample
+            if sample is None:
+                continue
+            age = sample.age_ms(now)
+            if sample.exchange_ts > 0:
+                limit = self.max_age_ms
+                kind = "age"
+            else:
+                limit = self.max_unchanged_ms
+                kind = "unchanged"
+            if limit > 0 and age > limit:
+                metrics.inc(f"feed.stale.{feed.name}")
+                return True, f"{feed.name} {kind} {age:.0f}ms > {limit:.0f}ms"
+        return False, ""
+
+    def summary_line(self) -> str:
+        """Feed latency / age line for dashboard / snapshot"""
+        parts = []
+        for feed in (self.mark, self.book):
+            hist = metrics.histogram(f"feed.{feed.name}_latency_ms")
+            age = metrics.get(f"feed.{feed.name}_age_ms")
+            if hist and hist.count:
+                parts.append(f"{feed.name} age {age:.0f}ms lat p50 {hist.percentile(50):.0f}/p99 {hist.percentile(99):.0f}ms")
+            else:
+                parts.append(f"{feed.name} age {age:.0f}ms")
+        return "Feed: " + "  ".join(parts)
@@ -0,0 +1,117 @@
+"""
+In-process Metrics
+==================
+Counters, gauges and fixed-bucket histograms shared by the trading loop,
+watchdogs, dashboard and snapshot file.
+
+Everything is O(1) per update and safe to call from helper threads.
+"""
+
+import bisect
+import threading
+from typing import Dict, Any, Optional, Sequence, List
+
+# Default buckets (milliseconds)
+DEFAULT_MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket histogram (bucket upper bounds, last bucket = overflow)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_MS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single value"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """
+        Approximate percentile (upper bound of the bucket containing q).
+        Overflow bucket reports the observed max.
+        """
+        if self.count == 0:
+            return 0.0
+        target = q / 100 * self.count
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target and c > 0:
+                if i < len(self.buckets):
+                    return min(float(self.buckets[i]), self.max)
+                return self.max
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Compact summary for logs/snapshots"""
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 3),
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": round(self.max, 3),
+            "last": round(self.last, 3),
+        }
+
+
+class Metrics:
+    """Named counters / gauges / histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, n: int = 1) -> None:
+        """Increment counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name: str, value: float) -> None:
+        """Set gauge"""
+        self.gauges[name] = value
+
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None) -> None:
+        """Record value into named histogram (created on first use)"""
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram(buckets or DEFAULT_MS_BUCKETS)
+            hist.observe(value)
+
+    def histogram(self, name: str) -> Optional[Histogram]:
+        return self.histograms.get(name)
+
+    def get(self, name: str, default: float = 0) -> float:
+        """Counter or gauge value"""
+        if name in self.counters:
+            return self.counters[name]
+        return self.gauges.get(name, default)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Point-in-time copy of all metrics"""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "histograms": {k: h.summary() for k, h in self.histograms.items()},
+            }
+
+
+# Process-wide registry
+metrics = Metrics()
@@ -0,0 +1,235 @@
+"""
+Trading Pipeline
+================
+main() runs as independent asyncio tasks connected by channels, so a slow
+stage only delays itself:
+
+    ingest ----market----> decision + execution ----report----> reporting
+      |                     (orders, closes)                    (health lines, dashboard,
+      +-----market----> signal                                   snapshot, shadow report)
+                        (signals, shadow strategies)
+    fill callbacks ----fills (queue)----> ledger
+
+- LatestValue: one slot; a new value replaces an unread one (counted as
+  dropped by the reader). Readers always act on the newest state and never
+  work through a backlog.
+- StageQueue: bounded FIFO for items that must all be processed (fills).
+  A sync producer that finds it full processes the backlog and its own item
+  inline (backpressure on the producer, nothing lost, order kept).
+- Stage: processing time per item (metrics histogram pipeline.<name>_ms),
+  count, errors, inputs dropped.
+
+Decision and execution share one task: the next decision has to see the
+outcome of the order calls before it (otherwise it would quote twice).
+They are timed as separate stages.
+"""
+
+import asyncio
+import time
+from typing import Optional, Dict, Any, List, Tuple, Callable, NamedTuple
+
+from metrics import metrics
+
+
+class MarketTick(NamedTuple):
+    """Validated mark price + book from one ingest read"""
+    time: float
+    mark_price: float
+    bids: list
+    asks: list
+    best_bid: float
+    best_ask: float
+    best_bid_size: float
+    best_ask_size: float
+    mid_diff_bps: float       # |size-weighted mid - mark| in bps
+
+
+def build_tick(now: float, mark_price: float, orderbook: Dict[str, Any]) -> Optional[MarketTick]:
+    """MarketTick from raw data (None if mark or either book side is missing)"""
+    bids = orderbook.get("bids", [])
+    asks = orderbook.get("asks", [])
+    if mark_price <= 0 or not bids or not asks:
+        return None
+    best_bid = bids[0][0]
+    best_ask = asks[0][0]
+    best_bid_size = bids[0][1] if len(bids[0]) > 1 else 0
+    best_ask_size = asks[0][1] if len(asks[0]) > 1 else 0
+    total_size = best_bid_size + best_ask_size
+    mid_price = (best_bid * best_bid_size + best_ask * best_ask_size) / total_size if total_size > 0 else (best_bid + best_ask) / 2
+    mid_diff_bps = abs((mid_price - mark_price) / mark_price * 10000)
+    return MarketTick(now, mark_price, bids, asks, best_bid, best_ask, best_bid_size, best_ask_size, mid_diff_bps)
+
+
+class Stage:
+    """Per-stage counters + processing time histogram"""
+
+    __slots__ = ("name", "count", "errors", "dropped", "last_ms", "total_ms", "_metric", "_started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.dropped = 0
+        self.last_ms = 0.0
+        self.total_ms = 0.0
+        self._metric = f"pipeline.{name}_ms"
+        self._started = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.last_ms = elapsed_ms
+        self.total_ms += elapsed_ms
+        metrics.observe(self._metric, elapsed_ms)
+
+    def __enter__(self) -> "Stage":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb) -> None:
+        self.observe((time.perf_counter() - self._started) * 1000)
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            self.errors += 1
+
+    def summary(self) -> str:
+        hist = metrics.histogram(self._metric)
+        p99 = f"p99 {hist.percentile(99):.0f}ms" if hist and hist.count else "-"
+        drops = f" drop {self.dropped}" if self.dropped else ""
+        errors = f" err {self.errors}" if self.errors else ""
+        return f"{self.name} {p99}{drops}{errors}"
+
+
+class LatestValue:
+    """Single-slot channel: publish() overwrites, next() waits for a newer version"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value: Any = None
+        self.version = 0
+        self._event = asyncio.Event()
+
+    def publish(self, value: Any) -> None:
+        self.value = value
+        self.version += 1
+        self._event.set()
+
+    async def next(self, seen: int, timeout: Optional[float] = None, stage: Optional[Stage] = None) -> Tuple[Any, int]:
+        """
+        Newest value after version `seen` -> (value, version).
+        On timeout the current value is returned again (readers can re-check
+        time-based conditions); stage.dropped counts versions never read.
+        """
+        if self.version <= seen:
+            self._event.clear()
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        if stage is not None and self.version > seen + 1 and seen > 0:
+            stage.dropped += self.version - seen - 1
+        return self.value, self.version
+
+    def depth(self, seen: int) -> int:
+        return 1 if self.version > seen else 0
+
+
+class StageQueue:
+    """Bounded FIFO + consumer task for items that must all be handled in order"""
+
+    def __init__(self, stage: Stage, handler: Callable[[Any], None], maxsize: int = 10000):
+        self.stage = stage
+        self.handler = handler
+        self.overflows = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def put(self, item: Any) -> None:
+        """Sync producer side (fill callbacks): never blocks, never drops"""
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.overflows += 1
+            metrics.inc(f"pipeline.{self.stage.name}.overflows")
+            self.drain()
+            self._handle(item)
+
+    def drain(self) -> None:
+        """Handle everything queued now (before reading state the handler updates)"""
+        while not self._queue.empty():
+            self._handle(self._queue.get_nowait())
+
+    def _handle(self, item: Any) -> None:
+        try:
+            with self.stage:
+                self.handler(item)
+        except Exception:
+            pass  # Counted by the stage, the next item still gets handled
+
+    async def run(self) -> None:
+        while True:
+            self._handle(await self._queue.get())
+
+
+class Pipeline:
+    """Stage registry, background tasks and the health line"""
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+        self.queues: List[StageQueue] = []
+        self._depths: List[Tuple[str, Callable[[], int]]] = []
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def stage(self, name: str) -> Stage:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = Stage(name)
+        return stage
+
+    def queue(self, name: str, handler: Callable[[Any], None], maxsize: int = 10000) -> StageQueue:
+        queue = StageQueue(self.stage(name), handler, maxsize)
+        self.queues.append(queue)
+        self.track_depth(name, lambda: queue.depth)
+        self.start(name, queue.run())
+        return queue
+
+    def track_depth(self, name: str, depth_fn: Callable[[], int]) -> None:
+        """Input backlog of a stage (exported as gauge pipeline.<name>.depth)"""
+        self._depths.append((name, depth_fn))
+
+    def start(self, name: str, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro, name=f"pipeline-{name}")
+        self._tasks[name] = task
+        return task
+
+    def failure(self) -> Optional[Tuple[str, BaseException]]:
+        """(stage, exception) of a background stage that stopped on its own"""
+        for name, task in self._tasks.items():
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                return name, task.exception()
+        return None
+
+    def drain(self) -> None:
+        """Handle everything queued in all queues (before restart / reading their results)"""
+        for queue in self.queues:
+            queue.drain()
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        for task in self._tasks.values():
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.drain()  # Fills received before shutdown still reach the ledger
+
+    def summary_line(self) -> str:
+        depths = []
+        for name, depth_fn in self._depths:
+            depth = depth_fn()
+            metrics.set(f"pipeline.{name}.depth", depth)
+            depths.append(f"{name} {depth}")
+        return (f"Pipeline: {'  '.join(s.summary() for s in self.stages.values())}"
+                + (f"  |  depth {' '.join(depths)}" if depths else ""))
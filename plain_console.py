@@ -0,0 +1,41 @@
+"""
+Plain Console (headless mode)
+=============================
+Drop-in for the parts of rich's Console / Live the bot uses, without
+importing rich. Markup tags like [red]...[/red] are stripped.
+"""
+
+import re
+import sys
+
+_MARKUP_RE = re.compile(r"\[/?[a-z0-9 #,._-]*\]", re.IGNORECASE)
+
+
+def strip_markup(text: str) -> str:
+    """Remove rich markup tags"""
+    return _MARKUP_RE.sub("", text)
+
+
+class PlainConsole:
+    """console.print() replacement writing plain text to stdout"""
+
+    def __init__(self, file=None):
+        self.file = file or sys.stdout
+
+    def print(self, *objects, **_kwargs) -> None:
+        text = " ".join(str(o) for o in objects)
+        self.file.write(strip_markup(text) + "\n")
+        self.file.flush()
+
+
+class NullLive:
+    """Live() replacement: nothing is rendered"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def update(self, *_args, **_kwargs) -> None:
+        pass
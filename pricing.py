@@ -0,0 +1,118 @@
+"""
+Pricing / Sizing Functions
+==========================
+Pure functions used by the main loop, dashboard and simulators.
+"""
+
+from typing import Optional, Tuple
+
+from config import SIZE_UNIT, LEVERAGE, MAX_SIZE_BTC
+
+
+def calc_order_prices(mark_price: float, spread_bps: float) -> Tuple[float, float]:
+    """
+    Calculate order prices at ±spread_bps from mark_price
+
+    Returns:
+        (buy_price, sell_price)
+    """
+    buy_price = mark_price * (1 - spread_bps / 10000)
+    sell_price = mark_price * (1 + spread_bps / 10000)
+    return buy_price, sell_price
+
+
+def calc_skewed_order_prices(mark_price: float, spread_bps: float, skew_bps: float = 0.0) -> Tuple[float, float]:
+    """
+    calc_order_prices around mark_price shifted by skew_bps (adaptive quoting)
+
+    Returns:
+        (buy_price, sell_price)
+    """
+    return calc_order_prices(mark_price * (1 + skew_bps / 10000), spread_bps)
+
+
+def check_maker_taker(
+    buy_price: float,
+    sell_price: float,
+    best_bid: float,
+    best_ask: float
+) -> Tuple[bool, bool]:
+    """
+    Determine if order is maker or taker
+
+    Returns:
+        (buy_is_maker, sell_is_maker)
+    """
+    # buy order: maker if price < best_ask (inside the orderbook)
+    buy_is_maker = buy_price < best_ask
+    # sell order: maker if price > best_bid (inside the orderbook)
+    sell_is_maker = sell_price > best_bid
+    return buy_is_maker, sell_is_maker
+
+
+def calc_drift_bps(current_price: float, reference_price: float) -> float:
+    """
+    Calculate the difference between current price and reference price in bps
+    """
+    if reference_price == 0:
+        return 0.0
+    return abs(current_price - reference_price) / reference_price * 10000
+
+
+def calc_spread_bps(best_bid: float, best_ask: float) -> float:
+    """
+    Calculate orderbook spread in bps
+    """
+    if best_bid == 0:
+        return 0.0
+    mid = (best_bid + best_ask) / 2
+    return (best_ask - best_bid) / mid * 10000
+
+
+def format_price(price: float, decimals: int = 2) -> str:
+    """Format price with thousand separators"""
+    return f"{price:,.{decimals}f}"
+
+
+def calc_order_size(
+    available_collateral: float,
+    mark_price: float,
+    leverage: float = LEVERAGE,
+    size_unit: float = SIZE_UNIT,
+    max_size: Optional[float] = MAX_SIZE_BTC
+) -> float:
+    """
+    Calculate order size based on collateral.
+
+    Args:
+        available_collateral: Available collateral (USD)
+        mark_price: Current mark price
+        leverage: Leverage multiplier (6x -> 3x each side for bidirectional)
+        size_unit: Minimum order unit (default 0.001 BTC)
+        max_size: Manual max size limit (None for unlimited)
+
+    Returns:
+        Order size (BTC), floored to size_unit
+
+    Example:
+        $100 collateral, BTC=$100k, leverage=6
+        -> $100 * 6 / 2 / $100k = 0.003 BTC per side
+    """
+    if mark_price <= 0 or available_collateral <= 0:
+        return 0.0
+
+    # collateral * leverage / 2 (bidirectional) / mark_price
+    # Example: $100 * 6 / 2 / $100k = 0.003 BTC per side
+    collateral_based_size = available_collateral * leverage / 2 / mark_price
+
+    # Use smaller of collateral-based or max_size if set
+    if max_size is not None and max_size > 0:
+        size = min(collateral_based_size, max_size)
+    else:
+        size = collateral_based_size
+
+    # Floor to size_unit (e.g., 0.00367 -> 0.003)
+    # Use round to handle floating-point precision
+    size = round(size / size_unit) * size_unit
+
+    return round(size, 8)  # Final precision fix
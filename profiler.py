@@ -0,0 +1,141 @@
+"""
+On-demand Profiling Hooks
+=========================
+Profile the running bot without restarting it (no cancel-all, no lost queue priority).
+
+    kill -USR1 <pid>   start profiling for PROFILE_DURATION sec (auto stop)
+    kill -USR2 <pid>   stop profiling now (or, if idle, dump asyncio task stacks only)
+
+Uses pyinstrument (sampling) if installed, cProfile otherwise.
+Output: PROFILE_DIR/profile_YYYYmmdd_HHMMSS.{html|prof|txt} + tasks_YYYYmmdd_HHMMSS.txt
+
+Unix only (signals are not available on Windows).
+"""
+
+import asyncio
+import io
+import os
+import signal
+import time
+from datetime import datetime
+from typing import Optional, Callable
+
+try:
+    from pyinstrument import Profiler as _SamplingProfiler
+except ImportError:  # optional dependency
+    _SamplingProfiler = None
+
+
+def dump_task_stacks(path: str, limit: int = 20) -> int:
+    """Write stacks of all asyncio tasks to path, return task count"""
+    tasks = asyncio.all_tasks()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# asyncio tasks @ {datetime.now().isoformat()} ({len(tasks)} tasks)\n\n")
+        for task in sorted(tasks, key=lambda t: t.get_name()):
+            f.write(f"--- {task.get_name()} | {task._coro!r}\n")
+            buf = io.StringIO()
+            task.print_stack(limit=limit, file=buf)
+            f.write(buf.getvalue())
+            f.write("\n")
+    return len(tasks)
+
+
+class ProfilerHooks:
+    """SIGUSR1/SIGUSR2-driven profiler for the running event loop"""
+
+    def __init__(self, log_fn: Callable[[str], None], output_dir: str = "profiles", duration: float = 30.0):
+        self.log_fn = log_fn
+        self.output_dir = output_dir
+        self.duration = duration
+
+        self._profiler = None
+        self._kind = ""  # "pyinstrument" or "cprofile"
+        self._started_at = 0.0
+        self._stamp = ""
+        self._stop_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def running(self) -> bool:
+        return self._profiler is not None
+
+    def install(self) -> bool:
+        """Register signal handlers on the running loop (False if unsupported)"""
+        if not hasattr(signal, "SIGUSR1"):
+            return False
+        self._loop = asyncio.get_running_loop()
+        try:
+            self._loop.add_signal_handler(signal.SIGUSR1, self.start)
+            self._loop.add_signal_handler(signal.SIGUSR2, self.stop)
+        except (NotImplementedError, RuntimeError):
+            return False
+        self.log_fn(f"Profiler hooks installed (pid {os.getpid()}): SIGUSR1=start {self.duration:.0f}s, SIGUSR2=stop/dump")
+        return True
+
+    def uninstall(self) -> None:
+        """Remove signal handlers, stop running profile"""
+        if self.running:
+            self.stop()
+        if self._loop and hasattr(signal, "SIGUSR1"):
+            self._loop.remove_signal_handler(signal.SIGUSR1)
+            self._loop.remove_signal_handler(signal.SIGUSR2)
+
+    def start(self) -> None:
+        """Start profiling (no-op if already running)"""
+        if self.running:
+            self.log_fn("PROFILE | already running")
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if _SamplingProfiler is not None:
+            self._profiler = _SamplingProfiler(interval=0.001, async_mode="disabled")
+            self._kind = "pyinstrument"
+            self._profiler.start()
+        else:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._kind = "cprofile"
+            self._profiler.enable()
+        self._started_at = time.time()
+
+        if self.duration > 0 and self._loop:
+            self._stop_handle = self._loop.call_later(self.duration, self.stop)
+        self.log_fn(f"PROFILE START | {self._kind} | {self.duration:.0f}s")
+
+    def stop(self) -> None:
+        """Stop profiling and write results (dump task stacks only if idle)"""
+        stamp = self._stamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(self.output_dir, exist_ok=True)
+        tasks_path = os.path.join(self.output_dir, f"tasks_{stamp}.txt")
+        n_tasks = dump_task_stacks(tasks_path)
+
+        if not self.running:
+            self.log_fn(f"TASK DUMP | {n_tasks} tasks -> {tasks_path}")
+            return
+
+        if self._stop_handle:
+            self._stop_handle.cancel()
+            self._stop_handle = None
+
+        profiler, kind = self._profiler, self._kind
+        self._profiler = None
+        self._stamp = ""
+        elapsed = time.time() - self._started_at
+        base = os.path.join(self.output_dir, f"profile_{stamp}")
+
+        if kind == "pyinstrument":
+            profiler.stop()
+            out_path = base + ".html"
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        else:
+            import pstats
+            profiler.disable()
+            out_path = base + ".prof"
+            profiler.dump_stats(out_path)
+            # Human-readable top list next to the binary stats
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+
+        self.log_fn(f"PROFILE STOP | {kind} | {elapsed:.1f}s -> {out_path} | {n_tasks} tasks -> {tasks_path}")
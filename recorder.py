@@ -0,0 +1,196 @@
+"""
+Exchange Session Recorder
+=========================
+Wraps the raw exchange object (innermost, below DeadlineExchange) and
+writes every call, its result or error, and its timing to a compact JSONL
+file (gzip if the name ends in .gz). replay.py feeds a recording back into
+main() on a virtual clock.
+
+    {"meta": {...}}                                first line: mode, symbol, start time, config values
+    {"t": 1.234, "m": "get_orderbook", "a": [...], "k": {...}, "d": 0.0021, "r": ...}
+    {"t": 1.240, "m": "create_order", ..., "e": ["TimeoutError", "..."]}
+    {"end": 3600.5, "records": 51234}              last line on a clean stop / restart
+
+t = seconds since start (monotonic), d = call duration, s = 1 for sync
+methods. Calls cut off by a deadline are kept as "e": ["CancelledError"].
+Market state reads (get_*) are written only when the result differs
+from the previous one for the same method and arguments: replay answers
+them with the latest value at the virtual time, so repeats carry no
+information. Reads of our own account (SEQUENCE_METHODS) depend on the
+orders we sent, so they are kept in full and replayed by virtual time
+within the stretch between two order actions.
+"""
+
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+import runtime_profile
+
+FLUSH_INTERVAL = 1.0  # Buffered writes reach the file at least this often (sec)
+SEQUENCE_METHODS = ("get_open_orders", "get_position", "get_collateral")  # Answers follow our own actions
+NOT_RECORDED = ("REFERENCE_VENUES",)  # Config values kept out of the file (venue API keys)
+
+
+def is_state_method(name: str) -> bool:
+    """Reads answered by latest value at the virtual time (account reads and actions are not)"""
+    return name.startswith("get_") and name not in SEQUENCE_METHODS
+
+
+def call_key(name: str, args: tuple, kwargs: dict) -> str:
+    """Method + arguments (state reads are tracked per key)"""
+    if not args and not kwargs:
+        return name
+    return name + runtime_profile.dumps([list(args), kwargs], sort_keys=True)
+
+
+def config_snapshot(module) -> Dict[str, Any]:
+    """UPPER_CASE config values that survive a JSON round trip"""
+    snapshot = {}
+    for name in dir(module):
+        if not name.isupper() or name in NOT_RECORDED:
+            continue
+        value = getattr(module, name)
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        snapshot[name] = value
+    return snapshot
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_recording(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """(meta, calls) from a recording file"""
+    meta: Dict[str, Any] = {}
+    calls: List[Dict[str, Any]] = []
+    with _open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = runtime_profile.loads(line)
+            except ValueError:
+                break  # Truncated last line (process killed mid-write)
+            if "meta" in row:
+                meta = row["meta"]
+            elif "end" in row:
+                meta["duration"] = row["end"]
+            else:
+                calls.append(row)
+    return meta, calls
+
+
+class RecordingExchange:
+    """Exchange wrapper that logs calls (attribute access passes through)"""
+
+    def __init__(self, exchange, path: str, meta: Optional[Dict[str, Any]] = None):
+        self._exchange = exchange
+        self.path = path.format(time=datetime.now().strftime("%Y%m%d_%H%M%S"))
+        self._file = _open(self.path, "w")
+        self._t0 = time.monotonic()
+        self._last_flush = self._t0
+        self._last_state: Dict[str, str] = {}
+        self._wrapped: Dict[str, Any] = {}
+        self.records = 0
+        self._write({"meta": {
+            "started": time.time(),
+            "ws_client": getattr(exchange, "ws_client", None) is not None,
+            **(meta or {}),
+        }})
+
+    @property
+    def inner(self):
+        return self._exchange
+
+    def _write(self, row: Dict[str, Any]) -> None:
+        self._file.write(runtime_profile.dumps(row) + "\n")
+        now = time.monotonic()
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self._last_flush = now
+            self._file.flush()
+
+    def _record(self, name: str, args: tuple, kwargs: dict, start: float, result: Any = None,
+                error: Optional[BaseException] = None, sync: bool = False) -> None:
+        row: Dict[str, Any] = {"t": round(start - self._t0, 6), "m": name}
+        if args:
+            row["a"] = list(args)
+        if kwargs:
+            row["k"] = kwargs
+        row["d"] = round(time.monotonic() - start, 6)
+        if sync:
+            row["s"] = 1
+        key = call_key(name, args, kwargs) if is_state_method(name) else ""
+        if error is not None:
+            row["e"] = [type(error).__name__, str(error)]
+            self._last_state.pop(key, None)  # Next good result is written again
+        else:
+            row["r"] = result
+            if key:
+                encoded = runtime_profile.dumps(result)
+                if self._last_state.get(key) == encoded:
+                    return
+                self._last_state[key] = encoded
+        self._write(row)
+        self.records += 1
+
+    def __getattr__(self, name: str):
+        wrapped = self._wrapped.get(name)
+        if wrapped is not None:
+            return wrapped
+
+        attr = getattr(self._exchange, name)
+        if not callable(attr):
+            return attr  # ws_client, tokens, ...
+
+        if asyncio.iscoroutinefunction(attr):
+            async def call(*args, **kwargs):
+                start = time.monotonic()
+                try:
+                    result = await attr(*args, **kwargs)
+                except asyncio.CancelledError as e:
+                    self._record(name, args, kwargs, start, error=e)  # Deadline hit (or shutdown)
+                    raise
+                except Exception as e:
+                    self._record(name, args, kwargs, start, error=e)
+                    raise
+                self._record(name, args, kwargs, start, result=result)
+                return result
+        else:
+            def call(*args, **kwargs):
+                start = time.monotonic()
+                try:
+                    result = attr(*args, **kwargs)
+                except Exception as e:
+                    self._record(name, args, kwargs, start, error=e, sync=True)
+                    raise
+                self._record(name, args, kwargs, start, result=result, sync=True)
+                return result
+
+        self._wrapped[name] = call
+        return call
+
+    def summary_line(self) -> str:
+        return f"Recording: {self.records} records -> {self.path}"
+
+    def finish(self) -> None:
+        """End marker + close the file (also used right before os.execv)"""
+        if self._file.closed:
+            return
+        self._write({"end": round(time.monotonic() - self._t0, 6), "records": self.records})
+        self._file.close()
+
+    async def close(self) -> None:
+        try:
+            await self._exchange.close()
+        finally:
+            self.finish()
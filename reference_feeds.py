@@ -0,0 +1,248 @@
+"""
+Reference Feeds (Lead-Lag)
+==========================
+Books of other venues polled concurrently (one task per venue) and merged
+into a composite fair value in StandX mark terms, so quotes can be pulled
+when the big venues move before our own mark does.
+
+- each venue's mid is mapped onto the local mark with a slow EWMA of its
+  log basis (venue mid / local mark): persistent offsets cancel out, a fast
+  move on the venue shows up as a lead over the local mark
+- fair = sum(w * mid * exp(-basis)) / sum(w), w = weight / (latency + floor),
+  latency = EWMA of data age (book timestamp) or call time; venues older
+  than max_age are left out
+- no fresh venue -> no fair value (quoting falls back to the local mark)
+
+Venue sources (REFERENCE_VENUES entries):
+    {"exchange": "hyperliquid", "coin": "BTC", "weight": 1.0}     mpdex venue
+    {"exchange": "fake", "module": "fake_exchange"}                 stand-in module (create_exchange / symbol_create)
+    {"file": "ref_btc.jsonl", "name": "replay"}                     recorded feed, lines {"ts", "bid", "ask"} or {"ts", "mid"}
+"""
+
+import asyncio
+import importlib
+import json
+import math
+import time
+from types import SimpleNamespace
+from typing import Optional, List, Dict, Any, Tuple
+
+from signals import Ewma
+
+LATENCY_FLOOR_MS = 5.0     # Keeps one very fast venue from taking all the weight
+LATENCY_HALFLIFE_SEC = 10.0
+
+
+class ExchangeSource:
+    """Best bid / ask from an exchange wrapper (ws cache after subscribe_orderbook)"""
+
+    def __init__(self, exchange, symbol: str):
+        self.exchange = exchange
+        self.symbol = symbol
+
+    async def start(self) -> None:
+        ws_client = getattr(self.exchange, "ws_client", None)
+        if ws_client:
+            await ws_client.subscribe_orderbook(self.symbol)
+
+    async def read(self) -> Optional[Tuple[float, float, Optional[float]]]:
+        """(bid, ask, data timestamp sec or None)"""
+        book = await self.exchange.get_orderbook(self.symbol)
+        bids, asks = book.get("bids") or [], book.get("asks") or []
+        if not bids or not asks:
+            return None
+        ts = book.get("timestamp")
+        return float(bids[0][0]), float(asks[0][0]), float(ts) / 1000 if ts else None
+
+    async def close(self) -> None:
+        close = getattr(self.exchange, "close", None)
+        if close:
+            await close()
+
+
+class ReplaySource:
+    """Recorded feed played back in real time (ends when the file does)"""
+
+    def __init__(self, path: str):
+        self.rows: List[Tuple[float, float, float]] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                if "mid" in row:
+                    bid = ask = float(row["mid"])
+                else:
+                    bid, ask = float(row["bid"]), float(row["ask"])
+                self.rows.append((float(row["ts"]), bid, ask))
+        self.rows.sort()
+        self._start = 0.0
+
+    async def start(self) -> None:
+        self._start = time.time()
+
+    async def read(self) -> Optional[Tuple[float, float, Optional[float]]]:
+        if not self.rows:
+            return None
+        elapsed = time.time() - self._start
+        first = self.rows[0][0]
+        # Latest row at or before the elapsed replay time
+        lo, hi = 0, len(self.rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.rows[mid][0] - first <= elapsed:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0 or (lo == len(self.rows) and elapsed - (self.rows[-1][0] - first) > 1.0):
+            return None  # Not started / past the end (goes stale)
+        ts, bid, ask = self.rows[lo - 1]
+        return bid, ask, self._start + (ts - first)
+
+    async def close(self) -> None:
+        pass
+
+
+class VenueFeed:
+    """Latest mid + latency / basis estimates for one venue"""
+
+    def __init__(self, name: str, source, weight: float, basis_halflife_sec: float):
+        self.name = name
+        self.source = source
+        self.weight = weight
+        self.mid = 0.0
+        self.updated_at = 0.0        # Data time of the latest book (venue timestamp, else receive time)
+        self.latency_ms = Ewma(LATENCY_HALFLIFE_SEC)
+        self.basis = Ewma(basis_halflife_sec)   # log(venue mid / local mark)
+        self.updates = 0
+        self.errors = 0
+        self.last_error = ""
+        self._last_key: Optional[Tuple[float, float]] = None
+
+    async def poll_once(self) -> None:
+        started = time.time()
+        try:
+            quote = await self.source.read()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            return
+        if quote is None:
+            return
+        bid, ask, data_ts = quote
+        now = time.time()
+        age_ms = (now - data_ts) * 1000 if data_ts else (now - started) * 1000
+        self.latency_ms.update(now, max(0.0, age_ms))
+        key = (bid, ask)
+        if key != self._last_key:
+            self._last_key = key
+            self.mid = (bid + ask) / 2
+            self.updates += 1
+            self.updated_at = now
+        if data_ts:
+            self.updated_at = data_ts  # Venue timestamp: unchanged book is still current
+
+
+class ReferenceFeeds:
+    """Per-venue poll tasks + latency-weighted, basis-adjusted composite"""
+
+    def __init__(self, feeds: List[VenueFeed], poll_ms: float = 20, max_age_ms: float = 1000):
+        self.feeds = feeds
+        self.poll_sec = poll_ms / 1000
+        self.max_age_ms = max_age_ms
+        self.fair: Optional[float] = None
+        self.lead_bps = 0.0          # (fair - local mark) / local mark, last tick
+        self.fresh = 0
+        self.early_cancels = 0
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        for feed in self.feeds:
+            await feed.source.start()
+            self._tasks.append(asyncio.create_task(self._poll(feed), name=f"ref-{feed.name}"))
+
+    async def _poll(self, feed: VenueFeed) -> None:
+        while True:
+            await feed.poll_once()
+            await asyncio.sleep(self.poll_sec)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for feed in self.feeds:
+            try:
+                await feed.source.close()
+            except Exception:
+                pass
+
+    def update(self, now: float, local_mark: float) -> Optional[float]:
+        """Composite fair value in local mark terms (None if no fresh venue)"""
+        total_weight = 0.0
+        weighted = 0.0
+        fresh = 0
+        for feed in self.feeds:
+            if feed.mid <= 0 or (now - feed.updated_at) * 1000 > self.max_age_ms:
+                continue
+            fresh += 1
+            basis = feed.basis.update(now, math.log(feed.mid / local_mark)) if local_mark > 0 else feed.basis.value
+            w = feed.weight / (feed.latency_ms.value + LATENCY_FLOOR_MS)
+            weighted += w * feed.mid * math.exp(-basis)
+            total_weight += w
+        self.fresh = fresh
+        if total_weight <= 0 or local_mark <= 0:
+            self.fair = None
+            self.lead_bps = 0.0
+            return None
+        self.fair = weighted / total_weight
+        self.lead_bps = (self.fair - local_mark) / local_mark * 10000
+        return self.fair
+
+    def summary_line(self) -> str:
+        if not self.feeds:
+            return "Reference: -"
+        venues = "  ".join(
+            f"{f.name} {f.latency_ms.value:.0f}ms" + (f" err {f.errors}" if f.errors else "")
+            for f in self.feeds
+        )
+        fair = f"{self.fair:,.2f}" if self.fair is not None else "-"
+        return (f"Reference: fair {fair}  lead {self.lead_bps:+.2f}bps  fresh {self.fresh}/{len(self.feeds)}  "
+                f"early cancels {self.early_cancels}  |  {venues}")
+
+
+async def build_reference_feeds(
+    venues: List[Dict[str, Any]],
+    coin: str,
+    create_exchange,
+    symbol_create,
+    poll_ms: float,
+    max_age_ms: float,
+    basis_halflife_sec: float,
+) -> ReferenceFeeds:
+    """REFERENCE_VENUES entries -> ReferenceFeeds (not started)"""
+    feeds = []
+    for i, venue in enumerate(venues):
+        weight = float(venue.get("weight", 1.0))
+        if venue.get("file"):
+            name = venue.get("name") or f"replay{i}"
+            source = ReplaySource(venue["file"])
+        else:
+            exchange_name = venue["exchange"]
+            factory_create, factory_symbol = create_exchange, symbol_create
+            if venue.get("module"):
+                module = importlib.import_module(venue["module"])
+                factory_create, factory_symbol = module.create_exchange, module.symbol_create
+            key = SimpleNamespace(**venue["key"]) if venue.get("key") else None
+            exchange = await factory_create(exchange_name, key)
+            symbol = factory_symbol(exchange_name, venue.get("coin", coin))
+            name = venue.get("name") or exchange_name
+            source = ExchangeSource(exchange, symbol)
+        feeds.append(VenueFeed(name, source, weight, basis_halflife_sec))
+    return ReferenceFeeds(feeds, poll_ms=poll_ms, max_age_ms=max_age_ms)
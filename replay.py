@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Session Replay
+==============
+Runs the real main() against a recorded session (RECORD_FILE, see
+recorder.py) on a virtual clock: sleeps, deadlines and timers advance
+simulated time instead of waiting, so an hour of trading replays in
+seconds, and the same recording always produces the same decisions.
+
+- market state reads (get_*) return the latest recorded value at the
+  virtual time
+- reads of our own orders / position / collateral return the latest value
+  at the virtual time among those recorded after as many order actions as
+  the bot has finished, so they always follow the bot's own orders
+- each order action (create / cancel / close) is matched to the next
+  recorded one of the same kind (same side first) and gets its response;
+  an action the recording has no answer for, or one further than
+  --tolerance from its recorded time, stops the replay (REPLAY DIVERGED,
+  exit 1) instead of being answered with something made up
+- every call takes its recorded duration; recorded errors are raised
+  again, calls cut off by a deadline hang until the deadline fires again
+- time.time() / time.perf_counter() follow the virtual clock, started at
+  the recording's start time
+
+The bot's own processing time is not part of the virtual clock, so its
+decisions see market data up to a few milliseconds earlier than in the
+recording: prices of a replay can differ slightly from the recorded ones,
+and a decision that sat right at a threshold can flip (a divergence),
+while every replay of the same recording is identical.
+
+The config stored in the recording is applied on top of --config; restarts,
+the dead man's switch, the feed bus, reference feeds, config reload and
+recording are switched off.
+
+Order actions the bot sends (to the exchange, or to the fill simulator in
+TEST mode) are the replay's output. --save writes them as JSONL (client
+order ids stripped); --check also compares them, arguments included, with
+a saved run and exits 1 on the first difference, which makes a recording
+of an incident a regression test for every later change
+(tests/test_replay.py does this for tests/data/session.jsonl.gz):
+
+    python replay.py incident.jsonl.gz --save incident.expected.jsonl   # once, after review
+    python replay.py incident.jsonl.gz --check incident.expected.jsonl  # after every change
+
+Usage:
+    python replay.py recordings/session.jsonl.gz
+    python replay.py session.jsonl --until 600 --workdir replay_out    # first 10 minutes, keep logs
+"""
+
+import argparse
+import asyncio
+import bisect
+import builtins
+import copy
+import json
+import os
+import selectors
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from benchmark import REPO_DIR, load_config
+from recorder import read_recording, is_state_method, call_key, SEQUENCE_METHODS
+
+# Order actions logged from the fill simulator in TEST mode
+SIM_ACTIONS = ("create_order", "cancel_order", "cancel_orders", "close_position")
+
+ACTION_TOLERANCE_SEC = 1.0  # A matched order action further than this from its recorded time is a divergence
+
+# Replay is self-contained: nothing may leave the temp dir or keep the process alive
+REPLAY_OVERRIDES = {
+    "AUTO_CONFIRM": True,
+    "RESTART_INTERVAL": 0,
+    "CHANNEL_RESTART_SEC": 0,
+    "CONFIG_RELOAD_INTERVAL": 0,
+    "DEADMAN_TIMEOUT_SEC": 0,
+    "FEED_BUS_PATH": "",
+    "REFERENCE_VENUES": [],
+    "SPLIT_UI": False,
+    "INSTRUMENT_CACHE_FILE": "",
+    "AUTH_CACHE_TTL": 0,
+    "RECORD_FILE": "",
+    "LOOP_LAG_THRESHOLD_MS": 0,  # Watchdog thread runs on real time
+}
+
+
+class ReplayedError(Exception):
+    """Recorded exception of a type that is not a builtin"""
+
+
+class ReplayDivergence(Exception):
+    """The bot sent an order action the recording has no answer for"""
+
+
+def _raise_recorded(error: List[str]) -> None:
+    name, message = error[0], error[1] if len(error) > 1 else ""
+    if name == "TimeoutError":
+        raise asyncio.TimeoutError(message)
+    cls = getattr(builtins, name, None)
+    if isinstance(cls, type) and issubclass(cls, Exception):
+        raise cls(message)
+    raise ReplayedError(f"{name}: {message}")
+
+
+def is_action(name: str) -> bool:
+    """Calls that change something on the exchange (the replay's output)"""
+    return not name.startswith("get_")
+
+
+def _strip_ids(value: Any) -> Any:
+    """Drop client / exchange order ids (random per run)"""
+    if isinstance(value, dict):
+        return {k: _strip_ids(v) for k, v in value.items() if not (k == "id" or k.lower().endswith("_id"))}
+    if isinstance(value, (list, tuple)):
+        return [_strip_ids(v) for v in value]
+    return value
+
+
+# ==================== Virtual clock ====================
+
+class _VirtualSelector:
+    """Real selector polled without blocking; waits advance the loop's virtual time instead"""
+
+    def __init__(self, loop: "VirtualClockLoop"):
+        self._loop = loop
+        self._selector = selectors.DefaultSelector()
+
+    def select(self, timeout: Optional[float] = None):
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            return self._selector.select(None)  # Nothing scheduled: only I/O can wake the loop
+        self._loop.virtual_time += timeout
+        return []
+
+    def __getattr__(self, name: str):
+        return getattr(self._selector, name)  # register / unregister / modify / get_map / close
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock jumps to the next timer instead of sleeping"""
+
+    def __init__(self):
+        self.virtual_time = 0.0
+        super().__init__(selector=_VirtualSelector(self))
+
+    def time(self) -> float:
+        return self.virtual_time
+
+
+# ==================== Replay exchange ====================
+
+class ReplayWsClient:
+    """Subscriptions are no-ops (state reads come from the recording)"""
+
+    async def subscribe_price(self, symbol: str) -> None:
+        pass
+
+    async def subscribe_orderbook(self, symbol: str) -> None:
+        pass
+
+
+class ReplayExchange:
+    """Answers exchange calls from a recording on the loop's virtual clock"""
+
+    def __init__(self, meta: Dict[str, Any], calls: List[Dict[str, Any]], loop: VirtualClockLoop,
+                 tolerance: float = 0.0, on_divergence: Optional[Callable[[], None]] = None):
+        self._loop = loop
+        self.tolerance = tolerance  # Max |replayed - recorded| time of a matched action (sec), 0 = any
+        self._t0 = loop.time()
+        self._by_key: Dict[str, Tuple[List[float], List[Dict[str, Any]]]] = {}
+        self._by_method: Dict[str, Tuple[List[float], List[Dict[str, Any]]]] = {}
+        self._account_by_key: Dict[str, Dict[int, Tuple[List[float], List[Dict[str, Any]]]]] = {}
+        self._account_by_method: Dict[str, Dict[int, Tuple[List[float], List[Dict[str, Any]]]]] = {}
+        self._recorded: List[Dict[str, Any]] = []
+        self._used: List[bool] = []
+        self._cursor = 0
+        self._sync = set()
+        self._wrapped: Dict[str, Any] = {}
+        self._on_divergence = on_divergence
+        for row in calls:
+            name = row["m"]
+            if row.get("s"):
+                self._sync.add(name)
+            if is_state_method(name):
+                indexes = ((self._by_key, call_key(name, tuple(row.get("a", ())), row.get("k", {}))),
+                           (self._by_method, name))
+            elif name in SEQUENCE_METHODS:
+                # Keyed to the number of order actions finished before it (file order = completion order)
+                epoch = len(self._recorded)
+                indexes = ((self._account_by_key.setdefault(
+                               call_key(name, tuple(row.get("a", ())), row.get("k", {})), {}), epoch),
+                           (self._account_by_method.setdefault(name, {}), epoch))
+            else:
+                self._recorded.append(row)
+                self._used.append(False)
+                continue
+            for index, key in indexes:
+                times, rows = index.setdefault(key, ([], []))
+                times.append(row["t"])
+                rows.append(row)
+        self.recorded_actions = Counter(row["m"] for row in self._recorded if is_action(row["m"]))
+        self.ws_client = ReplayWsClient() if meta.get("ws_client", True) else None
+        self.actions: List[Dict[str, Any]] = []
+        self.matched = 0  # Order actions answered from the recording
+        self.finished = 0  # ... of which returned (or were cut off): the account state the bot can see
+        self.max_offset = 0.0  # Largest |replayed - recorded| start time of a matched action
+        self.divergence = ""
+
+    @property
+    def elapsed(self) -> float:
+        return self._loop.time() - self._t0
+
+    def log_action(self, name: str, args: tuple, kwargs: dict, sim: bool = False) -> None:
+        action: Dict[str, Any] = {"t": round(self.elapsed, 3), "m": name}
+        if sim:
+            action["sim"] = 1
+        if args:
+            action["a"] = _strip_ids(args)
+        if kwargs:
+            action["k"] = _strip_ids(kwargs)
+        self.actions.append(action)
+
+    def _state_row(self, name: str, args: tuple, kwargs: dict) -> Dict[str, Any]:
+        times, rows = self._by_key.get(call_key(name, args, kwargs)) or self._by_method[name]
+        index = bisect.bisect_right(times, self.elapsed) - 1
+        return rows[max(index, 0)]  # Before the first record: the first answer
+
+    def _account_row(self, name: str, args: tuple, kwargs: dict) -> Dict[str, Any]:
+        """Latest answer at the virtual time among those recorded after as many order actions"""
+        epochs = self._account_by_key.get(call_key(name, args, kwargs)) or self._account_by_method[name]
+        epoch = self.finished
+        while epoch > 0 and epoch not in epochs:
+            epoch -= 1  # No read recorded between these actions: the last one before them
+        if epoch not in epochs:
+            epoch = min(epochs)
+        times, rows = epochs[epoch]
+        index = bisect.bisect_right(times, self.elapsed) - 1
+        return rows[max(index, 0)]  # Before the first read after the action: that read
+
+    def remaining(self) -> List[Dict[str, Any]]:
+        """Recorded order actions the replay never sent"""
+        return [row for row, used in zip(self._recorded, self._used) if not used]
+
+    @staticmethod
+    def _describe(name: str, kwargs: dict, t: float) -> str:
+        side = kwargs.get("side")
+        return f"{name}{f' {side}' if side else ''} at {t:.3f}s"
+
+    def _diverge(self, name: str, kwargs: dict, row: Optional[Dict[str, Any]] = None) -> "ReplayDivergence":
+        if not self.divergence:
+            if row is None:
+                pending = self.remaining()
+                row = pending[0] if pending else None
+            recorded = self._describe(row["m"], row.get("k") or {}, row["t"]) if row else "no further order actions"
+            self.divergence = (f"action {self.matched + 1}: bot sent {self._describe(name, kwargs, self.elapsed)}, "
+                               f"recording has {recorded}")
+            if self._on_divergence is not None:
+                self._on_divergence()
+        return ReplayDivergence(self.divergence)
+
+    def _match_action(self, name: str, kwargs: dict) -> Dict[str, Any]:
+        """Next unused recorded action of the same kind (concurrent orders: same side first)"""
+        if self.divergence:
+            raise ReplayDivergence(self.divergence)
+        while self._cursor < len(self._recorded) and self._used[self._cursor]:
+            self._cursor += 1
+        side = kwargs.get("side")
+        index = self._cursor
+        while index < len(self._recorded) and self._recorded[index]["m"] == name:
+            row = self._recorded[index]
+            if not self._used[index] and (side is None or (row.get("k") or {}).get("side") == side):
+                offset = abs(self.elapsed - row["t"])
+                if 0 < self.tolerance < offset:
+                    raise self._diverge(name, kwargs, row)  # Same action, different decision time
+                self._used[index] = True
+                self.matched += 1
+                self.max_offset = max(self.max_offset, offset)
+                return row
+            index += 1
+        raise self._diverge(name, kwargs)
+
+    def __getattr__(self, name: str):
+        wrapped = self._wrapped.get(name)
+        if wrapped is not None:
+            return wrapped
+        if name not in self._by_method and name not in self._account_by_method and name not in self.recorded_actions:
+            raise AttributeError(name)  # Never called in the recording (or not offered by the wrapper)
+        state = is_state_method(name)
+        account = name in SEQUENCE_METHODS
+        action = is_action(name)
+
+        def answer(args: tuple, kwargs: dict) -> Dict[str, Any]:
+            if state:
+                return self._state_row(name, args, kwargs)
+            if account:
+                return self._account_row(name, args, kwargs)
+            return self._match_action(name, kwargs)
+
+        if name in self._sync:
+            def call(*args, **kwargs):
+                if action and not self.divergence:
+                    self.log_action(name, args, kwargs)
+                row = answer(args, kwargs)
+                if action:
+                    self.finished += 1
+                if row.get("e"):
+                    _raise_recorded(row["e"])
+                return copy.deepcopy(row.get("r"))
+        else:
+            async def call(*args, **kwargs):
+                if action and not self.divergence:
+                    self.log_action(name, args, kwargs)
+                row = answer(args, kwargs)
+                try:
+                    if row.get("d"):
+                        await asyncio.sleep(row["d"])
+                    error = row.get("e")
+                    if error:
+                        if error[0] == "CancelledError":
+                            await asyncio.Future()  # Hangs until the caller's deadline cancels it, as recorded
+                        _raise_recorded(error)
+                    return copy.deepcopy(row.get("r"))
+                finally:
+                    if action:
+                        self.finished += 1
+
+        self._wrapped[name] = call
+        return call
+
+    async def close(self) -> None:
+        pass
+
+
+# ==================== Runner ====================
+
+async def run_replay(main_module, meta: Dict[str, Any], calls: List[Dict[str, Any]],
+                     until: float, tolerance: float = ACTION_TOLERANCE_SEC) -> Tuple[ReplayExchange, int]:
+    """main() on the recording until virtual time `until`, then a normal shutdown"""
+    from deadlines import IterationBudget
+    loop = asyncio.get_running_loop()
+    iterations = 0
+    replay: List[ReplayExchange] = []
+
+    class CountingBudget(IterationBudget):
+        def finish(self) -> float:
+            nonlocal iterations
+            iterations += 1
+            return super().finish()
+
+    class LoggedSimExchange(main_module.SimExchange):
+        pass
+
+    def log_sim(name: str):
+        base = getattr(main_module.SimExchange, name)
+
+        async def method(self, *args, **kwargs):
+            replay[0].log_action(name, args, kwargs, sim=True)
+            return await base(self, *args, **kwargs)
+        return method
+
+    for name in SIM_ACTIONS:
+        setattr(LoggedSimExchange, name, log_sim(name))
+
+    diverged = asyncio.Event()
+
+    async def create_exchange(*_args, **_kwargs):
+        replay.append(ReplayExchange(meta, calls, loop, tolerance, on_divergence=diverged.set))
+        return replay[0]
+
+    main_module.IterationBudget = CountingBudget
+    main_module.SimExchange = LoggedSimExchange
+    main_module.create_exchange = create_exchange
+    main_module.symbol_create = lambda _exchange, coin: meta.get("symbol") or coin
+
+    bot = asyncio.create_task(main_module.main())
+    divergence = asyncio.create_task(diverged.wait())
+    await asyncio.wait([bot, divergence], timeout=until, return_when=asyncio.FIRST_COMPLETED)
+    divergence.cancel()
+    if not bot.done():
+        bot.cancel()  # Also stops at the first divergence: nothing after it is answered
+    try:
+        await bot
+    except asyncio.CancelledError:
+        pass
+    if not replay:
+        raise RuntimeError("main() exited before creating the exchange (see console_log.txt)")
+    return replay[0], iterations
+
+
+def compare_actions(actions: List[Dict[str, Any]], path: str) -> Optional[str]:
+    """First difference to a saved action log (None if identical)"""
+    with open(path, "r", encoding="utf-8") as f:
+        expected = [json.loads(line) for line in f if line.strip()]
+    actual = [json.loads(json.dumps(a, default=str)) for a in actions]
+    for i, (want, got) in enumerate(zip(expected, actual)):
+        if want != got:
+            return f"action {i + 1} differs\n  expected {json.dumps(want)}\n  got      {json.dumps(got)}"
+    if len(expected) != len(actual):
+        return f"{len(actual)} actions, expected {len(expected)}"
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded session (RECORD_FILE) on a virtual clock")
+    parser.add_argument("recording", help="Recording file (.jsonl or .jsonl.gz)")
+    parser.add_argument("--config", default=os.path.join(REPO_DIR, "config.example.py"),
+                        help="Base config (recorded values are applied on top)")
+    parser.add_argument("--until", type=float, default=0.0, help="Stop after this many recorded seconds")
+    parser.add_argument("--save", default="", help="Write the bot's order actions as JSONL")
+    parser.add_argument("--check", default="", help="Compare order actions with a saved run, exit 1 on a difference")
+    parser.add_argument("--tolerance", type=float, default=ACTION_TOLERANCE_SEC,
+                        help="Max seconds between a replayed order action and its recorded time, 0 = any")
+    parser.add_argument("--workdir", default="", help="Keep log / ledger files here (default: temp dir, removed)")
+    args = parser.parse_args()
+
+    # Set iteration order must not differ between runs
+    if os.environ.get("PYTHONHASHSEED") != "0":
+        os.environ["PYTHONHASHSEED"] = "0"
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    recording = os.path.abspath(args.recording)
+    save = os.path.abspath(args.save) if args.save else ""
+    check = os.path.abspath(args.check) if args.check else ""
+    meta, calls = read_recording(recording)
+    if not calls:
+        print(f"No calls in {recording}")
+        return 1
+    duration = meta.get("duration") or max(row["t"] + row.get("d", 0) for row in calls)
+    until = min(args.until, duration) if args.until > 0 else duration
+
+    import fake_exchange
+    sys.modules["exchange_factory"] = fake_exchange  # Imported by main, replaced in run_replay
+    os.environ["MM_HEADLESS"] = "1"
+    config = load_config(os.path.abspath(args.config))
+    for name, value in {**meta.get("config", {}), **REPLAY_OVERRIDES}.items():
+        setattr(config, name, value)
+
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="mm-replay-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    real_time, real_perf = time.time, time.perf_counter
+    loop = VirtualClockLoop()
+    started = float(meta.get("started", real_time()))
+    wall_start = real_perf()
+    try:
+        import main as main_module
+        from plain_console import PlainConsole
+        main_module.console = PlainConsole(file=open(os.devnull, "w"))
+
+        time.time = lambda: started + loop.virtual_time
+        time.perf_counter = lambda: loop.virtual_time
+        asyncio.set_event_loop(loop)
+        replay, iterations = loop.run_until_complete(run_replay(main_module, meta, calls, until, args.tolerance))
+    finally:
+        time.time, time.perf_counter = real_time, real_perf
+        asyncio.set_event_loop(None)
+        loop.close()
+        os.chdir(REPO_DIR)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    wall = real_perf() - wall_start
+
+    print(f"Replay | {os.path.basename(recording)} | {meta.get('mode', '?')} {meta.get('symbol', '?')} | "
+          f"{len(calls)} records")
+    print(f"  Virtual time:  {replay.elapsed:,.1f}s of {duration:,.1f}s recorded")
+    print(f"  Wall time:     {wall:.2f}s ({replay.elapsed / wall if wall > 0 else 0:,.0f}x)")
+    print(f"  Iterations:    {iterations}")
+    replayed = Counter(a["m"] for a in replay.actions if not a.get("sim"))
+    for name in sorted(set(replayed) | set(replay.recorded_actions)):
+        print(f"  {name:<15}{replayed[name]:>6} replayed  {replay.recorded_actions[name]:>6} recorded")
+    if replay.matched:
+        print(f"  Timing:        {replay.matched} actions matched, max offset {replay.max_offset * 1000:,.0f}ms")
+    simulated = Counter(a["m"] for a in replay.actions if a.get("sim"))
+    for name in sorted(simulated):
+        print(f"  {name:<15}{simulated[name]:>6} simulated")
+
+    remaining = replay.remaining()
+    if not replay.divergence and remaining and until >= duration:
+        first = remaining[0]
+        replay.divergence = (f"{len(remaining)} recorded actions never sent, first "
+                             f"{replay._describe(first['m'], first.get('k') or {}, first['t'])}")
+    if replay.divergence:
+        print(f"REPLAY DIVERGED | {replay.divergence}")
+        return 1
+
+    if save:
+        with open(save, "w", encoding="utf-8") as f:
+            for action in replay.actions:
+                f.write(json.dumps(action, default=str) + "\n")
+        print(f"Saved: {save} ({len(replay.actions)} actions)")
+    if check:
+        difference = compare_actions(replay.actions, check)
+        if difference:
+            print(f"CHECK FAILED | {difference}")
+            return 1
+        print(f"CHECK OK | {len(replay.actions)} actions match {os.path.basename(check)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Runtime Config (hot reload)
+===========================
+Strategy parameters as a validated, immutable object that can be swapped
+between loop iterations without restarting the bot.
+
+ConfigWatcher polls config.py's mtime (and reloads immediately on SIGHUP).
+A changed file is executed in an isolated namespace, validated, and only
+applied if valid; every changed value is logged. Connection-level settings
+(MODE, EXCHANGE, COIN) still need a restart and only produce a warning.
+"""
+
+import os
+import runpy
+import signal
+import time
+import asyncio
+from dataclasses import dataclass, fields, asdict
+from typing import Optional, List, Dict, Any, Callable, Mapping
+
+CLOSE_METHODS = ("market", "aggressive", "chase")
+
+# Settings that cannot change while running
+RESTART_ONLY_KEYS = ("MODE", "EXCHANGE", "COIN")
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """Hot-reloadable strategy parameters (names = lowercase config.py names)"""
+    spread_bps: float
+    drift_threshold: float
+    use_mid_drift: bool
+    mark_mid_diff_limit: float
+    mid_unstable_cooldown: float
+    min_wait_sec: float
+    cancel_after_delay: float
+    leverage: float
+    max_size_btc: Optional[float]
+    auto_close_position: bool
+    close_method: str
+    close_aggressive_bps: float
+    close_wait_sec: float
+    close_min_size_market: float
+    close_max_iterations: int
+
+    @classmethod
+    def from_mapping(cls, values: Mapping[str, Any]) -> "RuntimeConfig":
+        """Build from config.py namespace (UPPERCASE keys)"""
+        return cls(**{f.name: values[f.name.upper()] for f in fields(cls)})
+
+    @classmethod
+    def from_module(cls, module) -> "RuntimeConfig":
+        return cls.from_mapping(vars(module))
+
+    def validate(self) -> List[str]:
+        """List of validation errors (empty = valid)"""
+        errors = []
+
+        def number(name: str, min_value: float, strict: bool = False) -> None:
+            value = getattr(self, name)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                errors.append(f"{name.upper()} must be a number (got {value!r})")
+            elif value < min_value or (strict and value == min_value):
+                op = ">" if strict else ">="
+                errors.append(f"{name.upper()} must be {op} {min_value} (got {value})")
+
+        number("spread_bps", 0, strict=True)
+        number("drift_threshold", 0, strict=True)
+        number("mark_mid_diff_limit", 0)
+        number("mid_unstable_cooldown", 0)
+        number("min_wait_sec", 0)
+        number("cancel_after_delay", 0)
+        number("leverage", 0, strict=True)
+        number("close_aggressive_bps", 0)
+        number("close_wait_sec", 0, strict=True)
+        number("close_min_size_market", 0)
+        number("close_max_iterations", 1)
+        if self.max_size_btc is not None:
+            number("max_size_btc", 0, strict=True)
+        for name in ("use_mid_drift", "auto_close_position"):
+            if not isinstance(getattr(self, name), bool):
+                errors.append(f"{name.upper()} must be True/False")
+        if self.close_method not in CLOSE_METHODS:
+            errors.append(f"CLOSE_METHOD must be one of {CLOSE_METHODS} (got {self.close_method!r})")
+        return errors
+
+    def diff(self, other: "RuntimeConfig") -> Dict[str, tuple]:
+        """{name: (old, new)} for changed fields"""
+        old, new = asdict(self), asdict(other)
+        return {k: (old[k], new[k]) for k in old if old[k] != new[k]}
+
+
+class ConfigWatcher:
+    """Poll config.py for changes and produce validated RuntimeConfig updates"""
+
+    def __init__(
+        self,
+        path: str,
+        current: RuntimeConfig,
+        log_fn: Callable[[str], None],
+        interval: float = 1.0,
+        restart_only: Optional[Mapping[str, Any]] = None,
+    ):
+        self.path = path
+        self.current = current
+        self.log_fn = log_fn
+        self.interval = interval
+        self.restart_only = dict(restart_only or {})
+        self.reload_count = 0
+        self._mtime = self._stat()
+        self._last_check = time.monotonic()
+        self._force = False
+
+    def _stat(self) -> float:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return 0.0
+
+    def request_reload(self) -> None:
+        """Force reload on next poll (SIGHUP)"""
+        self._force = True
+
+    def install_signal(self) -> bool:
+        """Reload on SIGHUP (Unix only)"""
+        if not hasattr(signal, "SIGHUP"):
+            return False
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.request_reload)
+        except (NotImplementedError, RuntimeError):
+            return False
+        return True
+
+    def poll(self) -> Optional[RuntimeConfig]:
+        """
+        Call once per loop iteration. Returns the new config if the file
+        changed and is valid, otherwise None (current config stays).
+        """
+        if not self._force:
+            if self.interval <= 0:
+                return None
+            now = time.monotonic()
+            if now - self._last_check < self.interval:
+                return None
+            self._last_check = now
+            mtime = self._stat()
+            if mtime == self._mtime:
+                return None
+            self._mtime = mtime
+        self._force = False
+
+        try:
+            namespace = runpy.run_path(self.path)
+            new = RuntimeConfig.from_mapping(namespace)
+        except Exception as e:
+            self.log_fn(f"CONFIG RELOAD FAILED | {type(e).__name__}: {e} | keeping current config")
+            return None
+
+        errors = new.validate()
+        if errors:
+            self.log_fn(f"CONFIG RELOAD REJECTED | {'; '.join(errors)} | keeping current config")
+            return None
+
+        for key, value in self.restart_only.items():
+            if key in namespace and namespace[key] != value:
+                self.log_fn(f"CONFIG | {key} changed ({value!r} -> {namespace[key]!r}), requires restart - ignored")
+
+        changes = self.current.diff(new)
+        if not changes:
+            return None
+        self.reload_count += 1
+        self.log_fn("CONFIG RELOAD | " + ", ".join(f"{k.upper()}: {o!r} -> {n!r}" for k, (o, n) in changes.items()))
+        self.current = new
+        return new
@@ -0,0 +1,170 @@
+"""
+Runtime Profile
+===============
+RUNTIME_PROFILE = "fast" swaps in a faster event loop and JSON codec when
+they are installed, and falls back to the standard library per piece when
+they are not:
+
+    event loop    uvloop                     -> asyncio
+    JSON codec    orjson -> ujson            -> json
+
+apply_profile() runs before asyncio.run(). The codec is used by loads() /
+dumps() here (session recorder, load test feed) and, through patch_json(),
+for decoding inside the exchange library's modules (WS messages, REST
+answers). Only decoding is swapped in library modules:
+encoded request bodies stay byte-identical to the standard json output, so
+nothing that signs or compares them changes.
+
+Inputs the fast codec rejects (NaN, integers above 64 bit, non-string
+keys) are retried with the standard json module, so results never differ
+in what is accepted.
+
+    pip install uvloop orjson      # optional, Linux / macOS (uvloop has no Windows build)
+"""
+
+import asyncio
+import json
+import sys
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import uvloop
+except ImportError:  # optional dependency
+    uvloop = None
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # optional dependency
+    ujson = None
+
+PROFILES = ("default", "fast")
+LIBRARY_MODULES = ("mpdex", "exchange_factory")  # Exchange client packages whose decoding patch_json() speeds up
+
+
+def _json_loads(data: Any) -> Any:
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any, sort_keys: bool = False) -> str:
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys, default=str)
+
+
+def _orjson_loads(data: Any) -> Any:
+    try:
+        return orjson.loads(data)
+    except ValueError:
+        return json.loads(data)  # NaN / big ints (or the real decode error)
+
+
+def _orjson_dumps(obj: Any, sort_keys: bool = False) -> str:
+    try:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode()
+    except TypeError:
+        return _json_dumps(obj, sort_keys)  # Non-string keys, big ints
+
+
+def _ujson_loads(data: Any) -> Any:
+    try:
+        return ujson.loads(data)
+    except ValueError:
+        return json.loads(data)
+
+
+def _ujson_dumps(obj: Any, sort_keys: bool = False) -> str:
+    try:
+        return ujson.dumps(obj, sort_keys=sort_keys, default=str, escape_forward_slashes=False)
+    except (TypeError, OverflowError):
+        return _json_dumps(obj, sort_keys)
+
+
+# name -> (loads, dumps), fastest first; only installed codecs are listed
+CODECS: Dict[str, tuple] = {}
+if orjson is not None:
+    CODECS["orjson"] = (_orjson_loads, _orjson_dumps)
+if ujson is not None:
+    CODECS["ujson"] = (_ujson_loads, _ujson_dumps)
+CODECS["json"] = (_json_loads, _json_dumps)
+
+# Active codec (set by apply_profile)
+codec = "json"
+loads: Callable[[Any], Any] = _json_loads
+dumps: Callable[..., str] = _json_dumps
+
+
+class RuntimeProfile:
+    """What apply_profile() actually installed"""
+
+    def __init__(self, name: str, loop: str, codec_name: str, missing: List[str]):
+        self.name = name
+        self.loop = loop
+        self.codec = codec_name
+        self.missing = missing
+        self.patched_modules = 0
+
+    def summary_line(self) -> str:
+        patched = f"  patched {self.patched_modules} modules" if self.patched_modules else ""
+        missing = f"  (not installed: {', '.join(self.missing)})" if self.missing else ""
+        return f"Runtime: {self.name}  loop {self.loop}  json {self.codec}{patched}{missing}"
+
+
+active = RuntimeProfile("default", "asyncio", "json", [])
+
+
+def apply_profile(name: str) -> RuntimeProfile:
+    """Install the event loop policy and codec for `name` (call before asyncio.run)"""
+    global active, codec, loads, dumps
+    if name not in PROFILES:
+        raise ValueError(f"RUNTIME_PROFILE must be one of {PROFILES}, got {name!r}")
+    missing = []
+    loop = "asyncio"
+    codec_name = "json"
+    if name == "fast":
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            loop = "uvloop"
+        else:
+            missing.append("uvloop")
+        codec_name = next(iter(CODECS))
+        if codec_name == "json":
+            missing.append("orjson")
+    codec = codec_name
+    loads, dumps = CODECS[codec_name]
+    active = RuntimeProfile(name, loop, codec_name, missing)
+    return active
+
+
+def _library_json(fast_loads: Callable[[Any], Any]) -> types.ModuleType:
+    """Copy of the json module whose loads() uses the fast codec (keyword arguments -> stdlib)"""
+    shim = types.ModuleType("json")
+    shim.__dict__.update({k: v for k, v in vars(json).items() if not k.startswith("__")})
+
+    def shim_loads(data, **kwargs):
+        if kwargs:
+            return json.loads(data, **kwargs)
+        return fast_loads(data)
+
+    shim.loads = shim_loads
+    return shim
+
+
+def patch_json(prefixes: Tuple[str, ...] = LIBRARY_MODULES) -> int:
+    """Point `json` in loaded modules under `prefixes` at the fast decoder, return module count"""
+    if active.codec == "json":
+        return 0
+    shim: Optional[types.ModuleType] = None
+    count = 0
+    for module_name, module in list(sys.modules.items()):
+        if module is None or not any(module_name == p or module_name.startswith(p + ".") for p in prefixes):
+            continue
+        if getattr(module, "json", None) is json:
+            shim = shim or _library_json(loads)
+            module.json = shim
+            count += 1
+    active.patched_modules += count
+    return count
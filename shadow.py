@@ -0,0 +1,293 @@
+"""
+Shadow Strategies
+=================
+N simulated strategy variants (different spread / drift / close settings)
+evaluated next to the running bot on the same market data, at almost no
+extra cost: the state of all variants lives in arrays and every tick is
+one vectorized step (numpy if installed and N is large enough to amortize
+its per-call overhead, plain Python loop otherwise).
+
+Simulation per variant, mirroring the main loop:
+- place BUY/SELL at mark ± spread when both are maker and mark-mid is stable
+- rebalance when drift exceeds the threshold (after MIN_WAIT_SEC)
+- crossing fill model: BUY fills when best ask trades down to it, SELL
+  when best bid trades up to it
+- a fill is closed right away with the variant's CLOSE_METHOD:
+    market      taker at best bid/ask
+    aggressive  mark ∓ CLOSE_AGGRESSIVE_BPS (taker at best price if that crosses)
+    chase       maker at best ask/bid (optimistic: assumes it fills)
+
+Results are rough (no queue position, no latency) but the same model is
+used for every variant, so they are comparable with each other.
+"""
+
+from typing import List, Dict, Any, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional
+    np = None
+
+CLOSE_CODES = {"market": 0, "aggressive": 1, "chase": 2}
+
+# Below this many variants the plain loop is faster than numpy's per-op overhead
+NUMPY_MIN_VARIANTS = 64
+
+# Fields a variant may override (defaults come from the running config)
+VARIANT_FIELDS = (
+    "spread_bps", "drift_threshold", "use_mid_drift", "mark_mid_diff_limit",
+    "min_wait_sec", "close_method", "close_aggressive_bps",
+)
+
+
+def build_variants(base, overrides: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Variant parameter dicts: "live" (running config) first, then each override.
+
+    Args:
+        base: RuntimeConfig of the running bot
+        overrides: SHADOW_VARIANTS entries, e.g. {"name": "wide", "spread_bps": 10}
+    """
+    live = {f: getattr(base, f) for f in VARIANT_FIELDS}
+    variants = [dict(live, name="live")]
+    for i, override in enumerate(overrides):
+        unknown = set(override) - set(VARIANT_FIELDS) - {"name"}
+        if unknown:
+            raise ValueError(f"SHADOW_VARIANTS[{i}]: unknown keys {sorted(unknown)}")
+        if override.get("close_method", live["close_method"]) not in CLOSE_CODES:
+            raise ValueError(f"SHADOW_VARIANTS[{i}]: close_method must be one of {tuple(CLOSE_CODES)}")
+        variant = dict(live, **override)
+        variant.setdefault("name", f"v{i + 1}")
+        variants.append(variant)
+    return variants
+
+
+class ShadowBook:
+    """State + per-tick step for all variants"""
+
+    def __init__(self, variants: List[Dict[str, Any]], maker_fee_bps: float = 0.0, taker_fee_bps: float = 0.0,
+                 use_numpy: Optional[bool] = None):
+        self.variants = variants
+        self.names = [v["name"] for v in variants]
+        self.n = len(variants)
+        self.maker_fee = maker_fee_bps / 10000
+        self.taker_fee = taker_fee_bps / 10000
+        if use_numpy is None:
+            use_numpy = self.n >= NUMPY_MIN_VARIANTS
+        self.use_numpy = use_numpy and np is not None
+        self.first_tick = 0.0
+        self.last_tick = 0.0
+        self.ticks = 0
+
+        params = {
+            "spread": [float(v["spread_bps"]) for v in variants],
+            "drift": [float(v["drift_threshold"]) for v in variants],
+            "use_mid": [bool(v["use_mid_drift"]) for v in variants],
+            "mid_limit": [float(v["mark_mid_diff_limit"]) for v in variants],
+            "min_wait": [float(v["min_wait_sec"]) for v in variants],
+            "close": [CLOSE_CODES[v["close_method"]] for v in variants],
+            "close_bps": [float(v["close_aggressive_bps"]) for v in variants],
+        }
+        state = {
+            "has": [False] * self.n,       # orders resting
+            "buy_px": [0.0] * self.n,
+            "sell_px": [0.0] * self.n,
+            "ref_px": [0.0] * self.n,      # mark at placement
+            "placed_at": [0.0] * self.n,
+            "pnl": [0.0] * self.n,         # realized, after fees (USD)
+            "volume": [0.0] * self.n,      # filled notional incl. close (USD)
+            "fills": [0] * self.n,
+            "placed": [0] * self.n,
+            "rebalances": [0] * self.n,
+            "quoting_sec": [0.0] * self.n, # time with resting orders
+        }
+        if self.use_numpy:
+            self.p = {k: np.array(v) for k, v in params.items()}
+            self.s = {k: np.array(v) for k, v in state.items()}
+        else:
+            self.p = params
+            self.s = state
+
+    # ---------- tick ----------
+
+    def on_tick(self, now: float, mark: float, best_bid: float, best_ask: float,
+                mid_diff_bps: float, size: float) -> None:
+        """Advance all variants by one market data update"""
+        if mark <= 0 or best_bid <= 0 or best_ask <= 0:
+            return
+        dt = now - self.last_tick if self.last_tick > 0 else 0.0
+        if self.first_tick == 0.0:
+            self.first_tick = now
+        self.last_tick = now
+        self.ticks += 1
+        if self.use_numpy:
+            self._step_numpy(now, dt, mark, best_bid, best_ask, mid_diff_bps, size)
+        else:
+            for i in range(self.n):
+                self._step_one(i, now, dt, mark, best_bid, best_ask, mid_diff_bps, size)
+
+    def _step_numpy(self, now, dt, mark, best_bid, best_ask, mid_diff_bps, size) -> None:
+        p, s = self.p, self.s
+        has = s["has"]
+        s["quoting_sec"] += np.where(has, dt, 0.0)
+
+        # Fills (crossing model)
+        buy_fill = has & (best_ask <= s["buy_px"])
+        sell_fill = has & (best_bid >= s["sell_px"])
+        filled = buy_fill | sell_fill
+        if filled.any():
+            # Close price / fee per method
+            close = p["close"]
+            aggressive_sell = mark * (1 - p["close_bps"] / 10000)
+            aggressive_buy = mark * (1 + p["close_bps"] / 10000)
+            sell_cross = aggressive_sell <= best_bid
+            buy_cross = aggressive_buy >= best_ask
+            sell_close = np.select([close == 0, close == 1], [np.full(self.n, best_bid), np.where(sell_cross, best_bid, aggressive_sell)], best_ask)
+            buy_close = np.select([close == 0, close == 1], [np.full(self.n, best_ask), np.where(buy_cross, best_ask, aggressive_buy)], best_bid)
+            sell_fee = np.where((close == 0) | ((close == 1) & sell_cross), self.taker_fee, self.maker_fee)
+            buy_fee = np.where((close == 0) | ((close == 1) & buy_cross), self.taker_fee, self.maker_fee)
+
+            both = buy_fill & sell_fill
+            long_only = buy_fill & ~sell_fill
+            short_only = sell_fill & ~buy_fill
+            buy_px, sell_px = s["buy_px"], s["sell_px"]
+            maker = self.maker_fee
+            pnl = np.zeros(self.n)
+            pnl = np.where(both, (sell_px - buy_px - (buy_px + sell_px) * maker) * size, pnl)
+            pnl = np.where(long_only, (sell_close - buy_px - buy_px * maker - sell_close * sell_fee) * size, pnl)
+            pnl = np.where(short_only, (sell_px - buy_close - sell_px * maker - buy_close * buy_fee) * size, pnl)
+            volume = np.where(both, buy_px + sell_px, 0.0)
+            volume = np.where(long_only, buy_px + sell_close, volume)
+            volume = np.where(short_only, sell_px + buy_close, volume)
+            s["pnl"] += pnl
+            s["volume"] += volume * size
+            s["fills"] += filled
+            has = has & ~filled
+
+        # Drift / rebalance
+        ref = np.where(s["ref_px"] > 0, s["ref_px"], mark)
+        drift = np.abs(mark - ref) / ref * 10000
+        effective = np.where(p["use_mid"], drift + mid_diff_bps, drift)
+        rebalance = has & (effective > p["drift"]) & ((now - s["placed_at"]) >= p["min_wait"])
+        s["rebalances"] += rebalance
+        has = has & ~rebalance
+
+        # Placement
+        buy_px = mark * (1 - p["spread"] / 10000)
+        sell_px = mark * (1 + p["spread"] / 10000)
+        mid_ok = (p["mid_limit"] <= 0) | (mid_diff_bps <= p["mid_limit"])
+        place = ~has & ~rebalance & (buy_px < best_ask) & (sell_px > best_bid) & mid_ok & (size > 0)
+        s["buy_px"] = np.where(place, buy_px, s["buy_px"])
+        s["sell_px"] = np.where(place, sell_px, s["sell_px"])
+        s["ref_px"] = np.where(place, mark, s["ref_px"])
+        s["placed_at"] = np.where(place, now, s["placed_at"])
+        s["placed"] += place
+        s["has"] = has | place
+
+    def _step_one(self, i, now, dt, mark, best_bid, best_ask, mid_diff_bps, size) -> None:
+        """Same as _step_numpy for variant i (fallback without numpy)"""
+        p, s = self.p, self.s
+        has = s["has"][i]
+        if has:
+            s["quoting_sec"][i] += dt
+
+        buy_fill = has and best_ask <= s["buy_px"][i]
+        sell_fill = has and best_bid >= s["sell_px"][i]
+        if buy_fill or sell_fill:
+            buy_px, sell_px = s["buy_px"][i], s["sell_px"][i]
+            maker = self.maker_fee
+            close, close_bps = p["close"][i], p["close_bps"][i]
+            if buy_fill and sell_fill:
+                pnl = (sell_px - buy_px - (buy_px + sell_px) * maker) * size
+                volume = buy_px + sell_px
+            elif buy_fill:
+                if close == 0:
+                    close_px, fee = best_bid, self.taker_fee
+                elif close == 1:
+                    limit = mark * (1 - close_bps / 10000)
+                    close_px, fee = (best_bid, self.taker_fee) if limit <= best_bid else (limit, maker)
+                else:
+                    close_px, fee = best_ask, maker
+                pnl = (close_px - buy_px - buy_px * maker - close_px * fee) * size
+                volume = buy_px + close_px
+            else:
+                if close == 0:
+                    close_px, fee = best_ask, self.taker_fee
+                elif close == 1:
+                    limit = mark * (1 + close_bps / 10000)
+                    close_px, fee = (best_ask, self.taker_fee) if limit >= best_ask else (limit, maker)
+                else:
+                    close_px, fee = best_bid, maker
+                pnl = (sell_px - close_px - sell_px * maker - close_px * fee) * size
+                volume = sell_px + close_px
+            s["pnl"][i] += pnl
+            s["volume"][i] += volume * size
+            s["fills"][i] += 1
+            has = False
+
+        rebalance = False
+        if has:
+            ref = s["ref_px"][i] if s["ref_px"][i] > 0 else mark
+            drift = abs(mark - ref) / ref * 10000
+            effective = drift + mid_diff_bps if p["use_mid"][i] else drift
+            if effective > p["drift"][i] and (now - s["placed_at"][i]) >= p["min_wait"][i]:
+                rebalance = True
+                s["rebalances"][i] += 1
+                has = False
+
+        if not has and not rebalance and size > 0:
+            buy_px = mark * (1 - p["spread"][i] / 10000)
+            sell_px = mark * (1 + p["spread"][i] / 10000)
+            mid_ok = p["mid_limit"][i] <= 0 or mid_diff_bps <= p["mid_limit"][i]
+            if buy_px < best_ask and sell_px > best_bid and mid_ok:
+                s["buy_px"][i], s["sell_px"][i] = buy_px, sell_px
+                s["ref_px"][i], s["placed_at"][i] = mark, now
+                s["placed"][i] += 1
+                has = True
+        s["has"][i] = has
+
+    # ---------- report ----------
+
+    def results(self) -> List[Dict[str, Any]]:
+        """Per-variant results, best realized PnL first"""
+        elapsed = max(1e-9, self.last_tick - self.first_tick)  # Tick time (works for replayed data too)
+        rows = []
+        for i, variant in enumerate(self.variants):
+            pnl = float(self.s["pnl"][i])
+            rows.append({
+                "name": variant["name"],
+                "params": {k: variant[k] for k in VARIANT_FIELDS},
+                "pnl": pnl,
+                "pnl_per_hour": pnl / elapsed * 3600,
+                "fills": int(self.s["fills"][i]),
+                "volume": float(self.s["volume"][i]),
+                "placed": int(self.s["placed"][i]),
+                "rebalances": int(self.s["rebalances"][i]),
+                "quoting_pct": float(self.s["quoting_sec"][i]) / elapsed * 100,
+            })
+        rows.sort(key=lambda r: r["pnl"], reverse=True)
+        return rows
+
+    def summary_line(self) -> str:
+        """One line for dashboard / snapshot"""
+        rows = self.results()
+        live = next(r for r in rows if r["name"] == "live")
+        best = rows[0]
+        return (f"Shadow: {self.n} variants  best {best['name']} ${best['pnl']:+.2f} ({best['fills']} fills)  "
+                f"live ${live['pnl']:+.2f} ({live['fills']} fills)")
+
+    def report(self) -> str:
+        """Plain-text table of all variants"""
+        elapsed = self.last_tick - self.first_tick
+        lines = [
+            f"Shadow report | {self.n} variants | {elapsed / 60:.1f} min | {self.ticks} ticks",
+            f"{'Variant':<16}{'Spread':>7}{'Drift':>7}{'Close':>11}{'Fills':>7}{'PnL $':>10}{'$/h':>9}{'Volume $':>12}{'Rebal':>7}{'Quoting':>9}",
+        ]
+        for r in self.results():
+            p = r["params"]
+            lines.append(
+                f"{r['name']:<16}{p['spread_bps']:>7.1f}{p['drift_threshold']:>7.1f}{p['close_method']:>11}"
+                f"{r['fills']:>7}{r['pnl']:>+10.2f}{r['pnl_per_hour']:>+9.2f}{r['volume']:>12,.0f}"
+                f"{r['rebalances']:>7}{r['quoting_pct']:>8.0f}%"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,153 @@
+"""
+Shutdown Coordinator
+====================
+Cancel-all on exit / restart that checks its own work. All targets
+(exchange, symbol) are handled in parallel:
+
+    round 1    cancel_orders(symbol)                   everything on the symbol, cache or not
+    verify     get_open_orders(symbol) every poll      (order stream cache) until empty or round deadline
+    round 2+   cancel_orders(symbol, open_orders=left) only what is still open,
+               per-order cancel_order if that fails (orders without a
+               client order id can't be cancelled that way and stay left)
+
+The whole run is bounded by one deadline; orders still open at the end are
+returned (and logged) instead of being assumed gone. Cancel latency, rounds
+and leftovers go to the log and the shutdown.* metrics.
+"""
+
+import asyncio
+import time
+from typing import Optional, List, Dict, Any, Tuple, Callable
+
+from metrics import metrics
+
+VERIFY_SHARE = 0.5  # Share of the remaining time one verify round may wait for the book to empty
+
+
+class CancelResult:
+    """Outcome for one (exchange, symbol)"""
+
+    __slots__ = ("symbol", "rounds", "left", "error", "elapsed_ms")
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.rounds = 0
+        self.left: List[Dict[str, Any]] = []   # Still open at the end (empty = verified)
+        self.error = ""                        # Last cancel / verify error
+        self.elapsed_ms = 0.0
+
+    @property
+    def verified(self) -> bool:
+        return not self.left and not self.error
+
+
+class ShutdownCoordinator:
+    """Parallel, verified cancel-all for a set of (exchange, symbol) targets"""
+
+    def __init__(self, targets: List[Tuple[Any, str]], timeout_sec: float = 5.0, retries: int = 3,
+                 poll_ms: float = 100, log_fn: Optional[Callable[[str], None]] = None):
+        self.targets = targets
+        self.timeout_sec = timeout_sec
+        self.retries = retries
+        self.poll_sec = poll_ms / 1000
+        self.log_fn = log_fn or (lambda _msg: None)
+        self.results: List[CancelResult] = []
+        self.elapsed_ms = 0.0
+
+    @property
+    def verified(self) -> bool:
+        return bool(self.results) and all(r.verified for r in self.results)
+
+    @property
+    def left(self) -> int:
+        return sum(len(r.left) for r in self.results)
+
+    async def cancel_all(self) -> bool:
+        """Cancel + verify every target, True if all books were confirmed empty"""
+        start = time.perf_counter()
+        deadline = _now() + self.timeout_sec
+        self.results = list(await asyncio.gather(*[
+            self._clear(exchange, symbol, deadline) for exchange, symbol in self.targets
+        ]))
+        self.elapsed_ms = (time.perf_counter() - start) * 1000
+        metrics.observe("shutdown.cancel_ms", self.elapsed_ms)
+        metrics.set("shutdown.orders_left", self.left)
+        for result in self.results:
+            if not result.verified:
+                ids = ", ".join(str(o.get("client_order_id", o.get("order_id", "?"))) for o in result.left)
+                self.log_fn(f"SHUTDOWN CANCEL UNVERIFIED | {result.symbol} | {len(result.left)} open"
+                            f"{f' ({ids})' if ids else ''}{f' | {result.error}' if result.error else ''}")
+        self.log_fn(f"SHUTDOWN | {self.summary_line()}")
+        return self.verified
+
+    async def _clear(self, exchange, symbol: str, deadline: float) -> CancelResult:
+        result = CancelResult(symbol)
+        start = time.perf_counter()
+        left: Optional[List[Dict[str, Any]]] = None  # None = unknown, cancel everything on the symbol
+        result.error = "no time left"
+        while result.rounds < max(1, self.retries) and _now() < deadline:
+            result.rounds += 1
+            if left:
+                metrics.inc("shutdown.retried_orders", len(left))
+            cancel_error = await self._cancel(exchange, symbol, left, deadline)
+            left, verify_error = await self._wait_empty(exchange, symbol, deadline)
+            if left == []:
+                result.error = ""
+                break
+            result.error = verify_error or cancel_error
+        result.left = left or []
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    async def _cancel(self, exchange, symbol: str, orders: Optional[List[Dict[str, Any]]], deadline: float) -> str:
+        """One cancel round, "" on success"""
+        try:
+            if orders is None:
+                await asyncio.wait_for(exchange.cancel_orders(symbol=symbol), _remaining(deadline))
+                return ""
+            try:
+                await asyncio.wait_for(exchange.cancel_orders(symbol=symbol, open_orders=orders), _remaining(deadline))
+            except Exception:
+                # Bulk cancel failed: one request per order (some may still go through)
+                ids = [o.get("client_order_id") for o in orders]
+                await asyncio.wait_for(asyncio.gather(*[
+                    exchange.cancel_order(client_order_id=i) for i in ids if i
+                ], return_exceptions=True), _remaining(deadline))
+                missing = sum(1 for i in ids if not i)
+                if missing:
+                    return f"cancel: {missing} order(s) without client order id"
+            return ""
+        except Exception as e:
+            return f"cancel: {type(e).__name__} {e}".strip()
+
+    async def _wait_empty(self, exchange, symbol: str, deadline: float) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+        """Poll open orders until none are left or this round's share of the time is up -> (open orders, error)"""
+        round_end = _now() + max(self.poll_sec, _remaining(deadline) * VERIFY_SHARE)
+        left: Optional[List[Dict[str, Any]]] = None
+        error = ""
+        while True:
+            try:
+                left = list(await asyncio.wait_for(exchange.get_open_orders(symbol), _remaining(deadline)) or [])
+                error = ""
+                if not left:
+                    return left, ""
+            except Exception as e:
+                error = f"verify: {type(e).__name__} {e}".strip()
+            if _now() + self.poll_sec > min(round_end, deadline):
+                return left, error
+            await asyncio.sleep(self.poll_sec)
+
+    def summary_line(self) -> str:
+        rounds = max((r.rounds for r in self.results), default=0)
+        state = "verified empty" if self.verified else f"{self.left} orders left"
+        return (f"cancel {len(self.results)} symbol(s) in {self.elapsed_ms:.0f}ms  "
+                f"{rounds} round(s)  {state}")
+
+
+def _now() -> float:
+    """Event loop clock (deadlines follow the loop's own timers, virtual ones included)"""
+    return asyncio.get_running_loop().time()
+
+
+def _remaining(deadline: float) -> float:
+    return max(0.01, deadline - _now())
@@ -0,0 +1,213 @@
+"""
+Streaming Market Signals & Adaptive Quoting
+===========================================
+O(1) estimators updated once per loop tick, fixed memory, no history:
+
+- EwmaVolatility  variance rate of log mark returns (time-decayed, handles
+                  irregular tick spacing), reported as bps over a horizon
+- Ewma            time-decayed average (reference feed latency / basis)
+- UpdateRate      market data changes per second seen by the ingest poll
+                  (decayed event count); the poll reads the WS cache once per
+                  REFRESH_INTERVAL, so this is capped at 1 / REFRESH_INTERVAL
+                  and shows how often the bot saw a new price, not the raw
+                  feed message rate
+- microprice      multi-level book imbalance price (fixed number of levels)
+
+AdaptiveQuoting turns them into the spread / drift threshold actually used:
+SPREAD_BPS / DRIFT_THRESHOLD are the values at the reference volatility,
+quieter markets quote tighter, faster markets wider with a wider drift
+tolerance (fewer cancel/replace cycles). A new value is only adopted when
+it differs from the current one by more than the hysteresis, so noise in
+the estimate does not move the quotes.
+"""
+
+import math
+from typing import Optional, List, Tuple
+
+LN2 = math.log(2)
+
+
+def _decay(dt: float, halflife_sec: float) -> float:
+    """EWMA weight of a new observation after dt seconds"""
+    return 1.0 - math.exp(-dt * LN2 / halflife_sec)
+
+
+class Ewma:
+    """Time-decayed EWMA (weight depends on time since last update)"""
+
+    def __init__(self, halflife_sec: float):
+        self.halflife_sec = halflife_sec
+        self.value = 0.0
+        self.last_time = 0.0
+
+    def update(self, now: float, x: float) -> float:
+        if self.last_time == 0.0:
+            self.value = x
+        elif now > self.last_time:
+            self.value += _decay(now - self.last_time, self.halflife_sec) * (x - self.value)
+        self.last_time = now
+        return self.value
+
+
+class EwmaVolatility:
+    """EWMA variance rate of log returns (per second)"""
+
+    def __init__(self, halflife_sec: float):
+        self.halflife_sec = halflife_sec
+        self.var_rate = 0.0        # Variance of log return per second
+        self.last_price = 0.0
+        self.last_time = 0.0
+        self.started = 0.0
+
+    def update(self, now: float, price: float) -> None:
+        if price <= 0:
+            return
+        if self.last_price <= 0:
+            self.last_price, self.last_time, self.started = price, now, now
+            return
+        dt = now - self.last_time
+        if dt <= 0:
+            return  # Same timestamp: the move is counted with the next tick
+        r = math.log(price / self.last_price)
+        # alpha * r^2 / dt ~ r^2 / tau for small dt: bounded for any tick spacing
+        self.var_rate += _decay(dt, self.halflife_sec) * (r * r / dt - self.var_rate)
+        self.last_price, self.last_time = price, now
+
+    def bps(self, horizon_sec: float) -> float:
+        """Expected move (1 sigma) over horizon_sec, in bps"""
+        return math.sqrt(self.var_rate * horizon_sec) * 10000
+
+    def warm(self, now: float) -> bool:
+        """True once one half-life of data has been seen"""
+        return self.started > 0 and now - self.started >= self.halflife_sec
+
+
+class UpdateRate:
+    """Events per second (exponentially decayed count / time constant)"""
+
+    def __init__(self, halflife_sec: float):
+        self.tau = halflife_sec / LN2
+        self.rate = 0.0
+        self.last_time = 0.0
+
+    def event(self, now: float) -> float:
+        if self.last_time > 0:
+            self.rate *= math.exp(-(now - self.last_time) / self.tau)
+        self.rate += 1.0 / self.tau
+        self.last_time = now
+        return self.rate
+
+    def current(self, now: float) -> float:
+        if self.last_time <= 0:
+            return 0.0
+        return self.rate * math.exp(-(now - self.last_time) / self.tau)
+
+
+def microprice(bids: List[List[float]], asks: List[List[float]], levels: int = 3) -> float:
+    """
+    Book-imbalance price from the first `levels` levels:
+    best_ask * bid_depth / total + best_bid * ask_depth / total.
+    """
+    best_bid, best_ask = float(bids[0][0]), float(asks[0][0])
+    bid_depth = sum(float(b[1]) for b in bids[:levels] if len(b) > 1)
+    ask_depth = sum(float(a[1]) for a in asks[:levels] if len(a) > 1)
+    total = bid_depth + ask_depth
+    if total <= 0:
+        return (best_bid + best_ask) / 2
+    return (best_ask * bid_depth + best_bid * ask_depth) / total
+
+
+class SignalEngine:
+    """All estimators, fed once per loop tick"""
+
+    def __init__(self, halflife_sec: float = 30.0, micro_levels: int = 3):
+        self.volatility = EwmaVolatility(halflife_sec)
+        self.update_rate = UpdateRate(halflife_sec)  # Poll changes / sec
+        self.micro_levels = micro_levels
+        self.micro_offset_bps = 0.0    # microprice - mid (bps), latest tick
+        self.last_time = 0.0
+        self._last_key: Optional[Tuple[float, float, float]] = None
+
+    def on_tick(self, now: float, mark_price: float, bids: List[List[float]], asks: List[List[float]]) -> None:
+        best_bid, best_ask = float(bids[0][0]), float(asks[0][0])
+        mid = (best_bid + best_ask) / 2
+        self.last_time = now
+        key = (mark_price, best_bid, best_ask)
+        if key != self._last_key:
+            self._last_key = key
+            self.update_rate.event(now)
+        self.volatility.update(now, mark_price)
+        if mid > 0:
+            self.micro_offset_bps = (microprice(bids, asks, self.micro_levels) - mid) / mid * 10000
+
+    def summary_line(self, horizon_sec: float) -> str:
+        return (
+            f"Signals: vol {self.volatility.bps(horizon_sec):.1f}bps/{horizon_sec:g}s  "
+            f"micro {self.micro_offset_bps:+.2f}bps  "
+            f"poll changes {self.update_rate.current(self.last_time):.1f}/s"
+        )
+
+
+class AdaptiveQuoting:
+    """Volatility-scaled spread / drift threshold with hysteresis"""
+
+    def __init__(
+        self,
+        horizon_sec: float,
+        vol_ref_bps: float,
+        spread_vol_mult: float,
+        drift_vol_mult: float,
+        spread_range: Tuple[float, float],
+        drift_range: Tuple[float, float],
+        hysteresis_bps: float,
+        micro_skew: float = 0.0,
+    ):
+        if horizon_sec <= 0 or vol_ref_bps < 0 or hysteresis_bps < 0:
+            raise ValueError("horizon must be > 0, reference vol and hysteresis >= 0")
+        if not 0 < spread_range[0] <= spread_range[1] or not 0 < drift_range[0] <= drift_range[1]:
+            raise ValueError("spread / drift ranges must be 0 < min <= max")
+        if not 0 <= micro_skew <= 1:
+            raise ValueError("micro skew must be 0~1")
+        self.horizon_sec = horizon_sec
+        self.vol_ref_bps = vol_ref_bps
+        self.spread_vol_mult = spread_vol_mult
+        self.drift_vol_mult = drift_vol_mult
+        self.spread_range = spread_range
+        self.drift_range = drift_range
+        self.hysteresis_bps = hysteresis_bps
+        self.micro_skew = micro_skew
+        self.spread_bps: Optional[float] = None
+        self.drift_threshold: Optional[float] = None
+        self.changes = 0
+
+    @staticmethod
+    def _clamp(value: float, bounds: Tuple[float, float]) -> float:
+        return min(max(value, bounds[0]), bounds[1])
+
+    def _apply(self, current: Optional[float], target: float) -> float:
+        if current is None or abs(target - current) > self.hysteresis_bps:
+            self.changes += current is not None
+            return target
+        return current
+
+    def update(self, signals: SignalEngine, base_spread: float, base_drift: float) -> Tuple[float, float]:
+        """(spread_bps, drift_threshold) to use this tick"""
+        vol = signals.volatility
+        if vol.warm(signals.last_time):
+            excess = vol.bps(self.horizon_sec) - self.vol_ref_bps
+            target_spread = self._clamp(base_spread + self.spread_vol_mult * excess, self.spread_range)
+            target_drift = self._clamp(base_drift + self.drift_vol_mult * excess, self.drift_range)
+        else:
+            target_spread, target_drift = base_spread, base_drift
+        self.spread_bps = self._apply(self.spread_bps, target_spread)
+        self.drift_threshold = self._apply(self.drift_threshold, target_drift)
+        return self.spread_bps, self.drift_threshold
+
+    def skew_bps(self, signals: SignalEngine) -> float:
+        """Quote center shift toward the microprice (bps of mark)"""
+        return self.micro_skew * signals.micro_offset_bps
+
+    def summary_line(self) -> str:
+        if self.spread_bps is None:
+            return "Adaptive: -"
+        return f"Adaptive: spread {self.spread_bps:.1f}bps  drift {self.drift_threshold:.1f}bps  changes {self.changes}"
@@ -0,0 +1,71 @@
+"""
+Startup Helpers
+===============
+- StartupTimer: import / init cost of each startup stage (`python main.py --startup-bench`)
+- Event-driven readiness instead of a fixed sleep: the bot starts quoting as
+  soon as the first valid mark price and orderbook have arrived.
+
+For a per-module import breakdown use `python -X importtime main.py --startup-bench`.
+"""
+
+import asyncio
+import time
+from typing import Tuple, List
+
+from metrics import metrics
+
+
+class StartupTimer:
+    """Wall time per startup stage (ms), measured between consecutive marks"""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self._last = self.t0
+        self.stages: List[Tuple[str, float]] = []
+
+    def mark(self, stage: str) -> float:
+        """Close current stage, return its duration (ms)"""
+        now = time.perf_counter()
+        elapsed_ms = (now - self._last) * 1000
+        self._last = now
+        self.stages.append((stage, elapsed_ms))
+        metrics.set(f"startup.{stage}_ms", elapsed_ms)
+        return elapsed_ms
+
+    def total_ms(self) -> float:
+        return (self._last - self.t0) * 1000
+
+    def report(self) -> str:
+        """Plain-text stage table"""
+        total = self.total_ms() or 1.0
+        lines = [f"{'Stage':<22}{'ms':>10}{'%':>7}"]
+        for stage, ms in self.stages:
+            lines.append(f"{stage:<22}{ms:>10.1f}{ms / total * 100:>6.1f}%")
+        lines.append(f"{'TOTAL':<22}{self.total_ms():>10.1f}")
+        return "\n".join(lines)
+
+
+async def wait_for_market_data(exchange, symbol: str, timeout: float = 5.0, poll: float = 0.02) -> Tuple[bool, float]:
+    """
+    Poll mark price + orderbook until both are valid.
+
+    Returns:
+        (ready, elapsed_sec) - ready=False if timeout expired first
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    while True:
+        try:
+            mark_price, orderbook = await asyncio.gather(
+                exchange.get_mark_price(symbol),
+                exchange.get_orderbook(symbol),
+            )
+            if float(mark_price) > 0 and orderbook.get("bids") and orderbook.get("asks"):
+                elapsed = time.perf_counter() - start
+                metrics.set("startup.market_data_ms", elapsed * 1000)
+                return True, elapsed
+        except Exception:
+            pass  # WS not ready yet (empty cache / REST fallback error)
+        if time.perf_counter() >= deadline:
+            return False, time.perf_counter() - start
+        await asyncio.sleep(poll)
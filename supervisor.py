@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Multi-Account Supervisor
+========================
+Runs one bot process per account from a manifest (accounts.json):
+
+- each worker runs `main.py --headless` in its own directory
+  (accounts/<name>/), so status.txt, status.json, logs and the auth cache
+  are per account; wallet credentials come from the account's env
+- workers are pinned to CPU cores (Linux) so GC pauses / restarts of one
+  account don't steal time from another
+- auto restarts are staggered (MM_RESTART_OFFSET) and crashed workers are
+  relaunched with backoff, never two launches closer than SUPERVISOR_RESTART_GAP
+- stats and health of all workers are aggregated into one view
+  (terminal + supervisor_status.txt)
+
+Strategy settings come from the shared config.py.
+
+Usage:
+    python supervisor.py                  # accounts.json
+    python supervisor.py my_accounts.json
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from dotenv import dotenv_values
+
+from config import (
+    MODE, AUTO_CONFIRM, RESTART_INTERVAL, STATUS_JSON_FILE,
+    SUPERVISOR_MANIFEST, SUPERVISOR_DIR, SUPERVISOR_PIN_CPUS,
+    SUPERVISOR_RESTART_GAP, SUPERVISOR_STATUS_INTERVAL, SUPERVISOR_STOP_TIMEOUT,
+)
+from plain_console import PlainConsole
+
+console = PlainConsole()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_SCRIPT = os.path.join(BASE_DIR, "main.py")
+STATUS_FILE = "supervisor_status.txt"
+WORKER_OUTPUT = "worker_output.log"
+MAX_BACKOFF = 300  # Max crash restart backoff (sec)
+
+
+@dataclass
+class Worker:
+    """One account process"""
+    name: str
+    env: Dict[str, str]
+    workdir: str
+    cpu: Optional[int] = None
+    restart_offset: float = 0.0
+    process: Optional[asyncio.subprocess.Process] = None
+    started_at: float = 0.0
+    launches: int = 0
+    crashes: int = 0
+    last_exit: Optional[int] = None
+    history: List[str] = field(default_factory=list)
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    def read_status(self) -> Dict[str, Any]:
+        """Worker's status.json ({} if not written yet)"""
+        if not STATUS_JSON_FILE:
+            return {}
+        try:
+            with open(os.path.join(self.workdir, STATUS_JSON_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+def load_manifest(path: str) -> List[Worker]:
+    """
+    Manifest format:
+        {"accounts": [
+            {"name": "main", "env_file": "accounts/main.env", "cpu": 2},
+            {"name": "alt", "env": {"WALLET_ADDRESS": "0x...", "PRIVATE_KEY": "..."}}
+        ]}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest_dir = os.path.dirname(os.path.abspath(path))
+
+    workers = []
+    names = set()
+    for entry in manifest.get("accounts", []):
+        if not entry.get("enabled", True):
+            continue
+        name = entry["name"]
+        if name in names:
+            raise ValueError(f"Duplicate account name: {name}")
+        names.add(name)
+
+        env: Dict[str, str] = {}
+        if entry.get("env_file"):
+            env_file = os.path.join(manifest_dir, entry["env_file"])
+            env.update({k: v for k, v in dotenv_values(env_file).items() if v is not None})
+        env.update({k: str(v) for k, v in (entry.get("env") or {}).items()})
+        if not env.get("WALLET_ADDRESS") or not env.get("PRIVATE_KEY"):
+            raise ValueError(f"{name}: WALLET_ADDRESS / PRIVATE_KEY missing (env or env_file)")
+
+        workdir = os.path.join(BASE_DIR, SUPERVISOR_DIR, name)
+        workers.append(Worker(name=name, env=env, workdir=workdir, cpu=entry.get("cpu")))
+    return workers
+
+
+def assign_cpus(workers: List[Worker]) -> None:
+    """Round-robin cores for workers without an explicit "cpu" (core 0 left to the OS/supervisor)"""
+    if not SUPERVISOR_PIN_CPUS or not hasattr(os, "sched_getaffinity"):
+        return
+    cores = sorted(os.sched_getaffinity(0))
+    if len(cores) > 1:
+        cores = cores[1:]
+    for i, worker in enumerate(w for w in workers if w.cpu is None):
+        worker.cpu = cores[i % len(cores)]
+
+
+def pin(pid: int, cpu: Optional[int]) -> bool:
+    """Pin process to one core (Linux only)"""
+    if cpu is None or not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(pid, {cpu})
+    except OSError:
+        return False
+    return True
+
+
+class Supervisor:
+    def __init__(self, workers: List[Worker]):
+        self.workers = workers
+        self.stopping = False
+        self._last_launch = 0.0
+        self._launch_lock = asyncio.Lock()
+
+        # Spread first auto restarts evenly over RESTART_INTERVAL
+        if RESTART_INTERVAL > 0 and workers:
+            step = RESTART_INTERVAL / len(workers)
+            for i, worker in enumerate(workers):
+                worker.restart_offset = i * step
+
+    async def launch(self, worker: Worker) -> None:
+        """Start worker, keeping launches SUPERVISOR_RESTART_GAP apart"""
+        async with self._launch_lock:
+            wait = self._last_launch + SUPERVISOR_RESTART_GAP - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if self.stopping:
+                return
+
+            os.makedirs(worker.workdir, exist_ok=True)
+            env = dict(os.environ)
+            env.update(worker.env)
+            env["MM_RESTART_OFFSET"] = str(worker.restart_offset if worker.launches == 0 else 0)
+            env["PYTHONUNBUFFERED"] = "1"
+
+            output = open(os.path.join(worker.workdir, WORKER_OUTPUT), "ab")
+            worker.process = await asyncio.create_subprocess_exec(
+                sys.executable, MAIN_SCRIPT, "--headless",
+                cwd=worker.workdir,
+                env=env,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=output,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,  # Ctrl+C is handled by the supervisor
+            )
+            output.close()
+            self._last_launch = time.time()
+            worker.started_at = self._last_launch
+            worker.launches += 1
+            pinned = pin(worker.process.pid, worker.cpu)
+            self._event(worker, f"started pid {worker.process.pid}" + (f" on cpu {worker.cpu}" if pinned else ""))
+
+    async def run_worker(self, worker: Worker) -> None:
+        """Keep one worker running until stop"""
+        backoff = max(SUPERVISOR_RESTART_GAP, 1.0)
+        while not self.stopping:
+            await self.launch(worker)
+            if worker.process is None:
+                return
+            code = await worker.process.wait()
+            worker.last_exit = code
+            if self.stopping:
+                return
+            worker.crashes += 1
+            uptime = time.time() - worker.started_at
+            # Ran for a while -> treat as a fresh failure, otherwise back off
+            backoff = max(SUPERVISOR_RESTART_GAP, 1.0) if uptime > MAX_BACKOFF else min(backoff * 2, MAX_BACKOFF)
+            self._event(worker, f"exited with {code} after {uptime:.0f}s, relaunch in {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+
+    async def stop(self) -> None:
+        """SIGINT every worker (they cancel their orders), kill after SUPERVISOR_STOP_TIMEOUT"""
+        self.stopping = True
+        running = [w for w in self.workers if w.alive]
+        for worker in running:
+            try:
+                worker.process.send_signal(signal.SIGINT)
+            except ProcessLookupError:
+                pass
+        deadline = time.time() + SUPERVISOR_STOP_TIMEOUT
+        for worker in running:
+            try:
+                await asyncio.wait_for(worker.process.wait(), max(0.1, deadline - time.time()))
+            except asyncio.TimeoutError:
+                self._event(worker, "did not stop in time, killing")
+                worker.process.kill()
+                await worker.process.wait()
+
+    def _event(self, worker: Worker, message: str) -> None:
+        line = f"[{datetime.now().strftime('%H:%M:%S')}] {worker.name}: {message}"
+        worker.history = (worker.history + [line])[-5:]
+        console.print(line)
+
+    def status_view(self) -> str:
+        """Aggregated table of all workers"""
+        now = time.time()
+        lines = [
+            f"Supervisor | {MODE} | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | {len(self.workers)} accounts",
+            f"{'Account':<12}{'State':<9}{'CPU':>4}{'Up':>8}{'Restarts':>9}  {'Status':<12}{'Collateral':>12}{'Position':>12}{'uPnL':>10}{'rPnL':>10}{'Orders':>8}  {'Age':>5}",
+        ]
+        totals = {"collateral": 0.0, "upnl": 0.0, "rpnl": 0.0, "placed": 0}
+        unhealthy = []
+        for w in self.workers:
+            st = w.read_status()
+            state = "running" if w.alive else ("stopped" if self.stopping else "down")
+            uptime = f"{(now - w.started_at) / 60:.0f}m" if w.alive else "-"
+            age = now - st["time"] if st.get("time") else None
+            if st:
+                totals["collateral"] += st.get("total_collateral", 0)
+                totals["upnl"] += st.get("unrealized_pnl", 0)
+                totals["rpnl"] += st.get("realized_pnl", 0)
+                totals["placed"] += st.get("total_placed", 0)
+            if (not w.alive and not self.stopping) or st.get("status") in ("STALE", "NO_SIZE"):
+                unhealthy.append(w.name)
+            position = f"{st.get('position_side', '')[:1].upper()}{abs(st.get('position_size', 0)):.4f}" if st.get("position_size") else "-"
+            lines.append(
+                f"{w.name:<12}{state:<9}{w.cpu if w.cpu is not None else '-':>4}{uptime:>8}{max(0, w.launches - 1):>9}  "
+                f"{st.get('status', '-'):<12}{st.get('total_collateral', 0):>12,.2f}{position:>12}"
+                f"{st.get('unrealized_pnl', 0):>+10.2f}{st.get('realized_pnl', 0):>+10.2f}{st.get('total_placed', 0):>8}  "
+                f"{(f'{age:.0f}s' if age is not None else '-'):>5}"
+            )
+        lines.append(
+            f"{'TOTAL':<12}{'':<9}{'':>4}{'':>8}{'':>9}  {'':<12}{totals['collateral']:>12,.2f}{'':>12}"
+            f"{totals['upnl']:>+10.2f}{totals['rpnl']:>+10.2f}{totals['placed']:>8}"
+        )
+        if unhealthy:
+            lines.append(f"Attention: {', '.join(unhealthy)}")
+        return "\n".join(lines)
+
+    async def report_loop(self) -> None:
+        while not self.stopping:
+            await asyncio.sleep(SUPERVISOR_STATUS_INTERVAL)
+            view = self.status_view()
+            console.print(view + "\n")
+            try:
+                with open(os.path.join(BASE_DIR, STATUS_FILE), "w", encoding="utf-8") as f:
+                    f.write(view + "\n")
+            except OSError:
+                pass
+
+
+async def main() -> None:
+    manifest_path = sys.argv[1] if len(sys.argv) > 1 else SUPERVISOR_MANIFEST
+    try:
+        workers = load_manifest(manifest_path)
+    except (OSError, ValueError, KeyError) as e:
+        console.print(f"Invalid manifest {manifest_path}: {e}")
+        return
+    if not workers:
+        console.print(f"No enabled accounts in {manifest_path}")
+        return
+    if MODE == "LIVE" and not AUTO_CONFIRM:
+        console.print("LIVE mode workers cannot prompt for confirmation: set AUTO_CONFIRM = True")
+        return
+
+    assign_cpus(workers)
+    supervisor = Supervisor(workers)
+    console.print(f"Supervisor | {MODE} | {len(workers)} accounts | launch gap {SUPERVISOR_RESTART_GAP}s")
+
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    tasks = [asyncio.create_task(supervisor.run_worker(w)) for w in workers]
+    tasks.append(asyncio.create_task(supervisor.report_loop()))
+    try:
+        await stop_event.wait()
+    finally:
+        console.print("Stopping workers (orders are cancelled by each worker)...")
+        await supervisor.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        console.print(supervisor.status_view())
+        console.print("Done.")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
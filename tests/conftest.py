@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Flat modules at the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from auth_cache import is_auth_error, session_warning
+
+
+class _StatusError(Exception):
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+def test_auth_error_matches_status_and_whole_words():
+    assert is_auth_error(Exception("HTTP 401: session expired"))
+    assert is_auth_error(Exception("401."))
+    assert is_auth_error(Exception("Unauthorized"))
+    assert is_auth_error(_StatusError("request failed", 401))
+    response = SimpleNamespace(status_code=401)
+    error = Exception("request failed")
+    error.response = response
+    assert is_auth_error(error)
+
+
+def test_auth_error_ignores_401_inside_numbers():
+    assert not is_auth_error(Exception("price 100401.5 outside band"))
+    assert not is_auth_error(Exception("order 4012 rejected"))
+    assert not is_auth_error(Exception("size 0.401 below minimum"))
+    assert not is_auth_error(_StatusError("rate limited", 429))
+    response = SimpleNamespace(status_code=500)
+    error = Exception("server error")
+    error.response = response
+    assert not is_auth_error(error)
+
+
+def test_session_warning_reports_missing_or_ignored_token():
+    assert "no session token" in session_warning(SimpleNamespace(), None)
+    wrapper = SimpleNamespace(auth=SimpleNamespace(jwt="fresh"))
+    assert session_warning(wrapper, None) is None
+    assert session_warning(wrapper, "fresh") is None
+    assert "not consumed" in session_warning(wrapper, "cached")
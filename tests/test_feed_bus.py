@@ -0,0 +1,34 @@
+from feed_bus import FeedBusReader, FeedBusWriter
+
+
+def test_bus_carries_multiple_book_levels(tmp_path):
+    path = str(tmp_path / "bus.bin")
+    writer = FeedBusWriter(path, "BTC-USD", slots=8, levels=3)
+    reader = FeedBusReader(path, "BTC-USD")
+    assert reader.levels == 3
+
+    bids = [[100.0, 1.0], [99.5, 2.0], [99.0, 3.0], [98.5, 4.0]]
+    asks = [[100.5, 1.5], [101.0, 2.5]]
+    seq = writer.publish_book(100.2, {"bids": bids, "asks": asks})
+    tick = reader.latest()
+    assert tick.seq == seq
+    assert tick.mark == 100.2
+    assert tick.bids == bids[:3]       # Capped at the bus depth
+    assert tick.asks == asks           # Missing levels left out
+    assert (tick.bid, tick.ask) == (100.0, 100.5)
+
+    assert writer.publish_book(100.2, {"bids": bids, "asks": asks}) is None  # Unchanged
+    writer.close()
+    reader.close()
+
+
+def test_ring_wraps_and_lapped_reads_return_none(tmp_path):
+    path = str(tmp_path / "bus.bin")
+    writer = FeedBusWriter(path, "BTC-USD", slots=4, levels=1)
+    reader = FeedBusReader(path)
+    for i in range(1, 7):
+        writer.publish(100.0 + i, [[100.0 + i, 1.0]], [[101.0 + i, 1.0]])
+    assert reader.latest().mark == 106.0
+    assert reader.read(1) is None  # Overwritten
+    writer.close()
+    reader.close()
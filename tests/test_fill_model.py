@@ -0,0 +1,43 @@
+import asyncio
+
+from fill_model import SimExchange
+
+
+class _Book:
+    """Market data source stand-in (SimExchange only needs it for passthrough)"""
+
+
+def _sim_long(size: float) -> SimExchange:
+    sim = SimExchange(_Book(), "BTC-USD")
+    sim.on_book([[100.0, 1.0]], [[101.0, 1.0]])
+    asyncio.run(sim.create_order("BTC-USD", "buy", size, order_type="market"))
+    assert sim.position.size == size
+    return sim
+
+
+def test_resting_reduce_only_fill_is_clamped_to_position():
+    sim = _sim_long(0.5)
+    asyncio.run(sim.create_order("BTC-USD", "sell", 0.5, price=102.0, is_reduce_only=True))
+    # Position shrinks while the reduce-only order rests
+    asyncio.run(sim.create_order("BTC-USD", "sell", 0.3, order_type="market"))
+    assert abs(sim.position.size - 0.2) < 1e-12
+
+    sim.on_book([[103.0, 1.0]], [[104.0, 1.0]])  # Book crosses the resting sell
+    assert sim.position.size == 0.0  # Closed, never flipped short
+    assert not sim.model.orders
+
+
+def test_resting_reduce_only_is_cancelled_when_flat():
+    sim = _sim_long(0.5)
+    asyncio.run(sim.create_order("BTC-USD", "sell", 0.5, price=102.0, is_reduce_only=True))
+    asyncio.run(sim.create_order("BTC-USD", "sell", 0.5, order_type="market"))
+    sim.on_book([[103.0, 1.0]], [[104.0, 1.0]])
+    assert sim.position.size == 0.0
+    assert not sim.model.orders
+
+
+def test_plain_resting_order_can_flip_position():
+    sim = _sim_long(0.2)
+    asyncio.run(sim.create_order("BTC-USD", "sell", 0.5, price=102.0))
+    sim.on_book([[103.0, 1.0]], [[104.0, 1.0]])
+    assert abs(sim.position.size + 0.3) < 1e-12
@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+from loop_monitor import LoopLagMonitor, _task_name
+
+
+def test_blocked_loop_is_attributed_to_the_running_task():
+    logs = []
+
+    async def run():
+        monitor = LoopLagMonitor(logs.append, interval=0.05, threshold_ms=100)
+        monitor.start()
+
+        async def blocker():
+            time.sleep(0.4)  # Blocks the loop on purpose
+
+        await asyncio.sleep(0.1)
+        await asyncio.create_task(blocker(), name="blocker-task")
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(run())
+    assert monitor.last_stall is not None
+    assert monitor.last_stall["task"] == "blocker-task"
+    assert any(line.startswith("LOOP BLOCKED") for line in logs)
+
+
+def test_task_name_without_loop_is_reported_unknown():
+    assert _task_name(None).startswith("<unknown")
@@ -0,0 +1,127 @@
+import asyncio
+
+from deadlines import IterationBudget
+from pipeline import LatestValue, Pipeline, Stage, StageQueue
+
+
+def test_latest_value_returns_newest_and_counts_dropped():
+    async def run():
+        channel = LatestValue("market")
+        stage = Stage("decision")
+        channel.publish("a")
+        value, seen = await channel.next(0, stage=stage)
+        assert (value, seen) == ("a", 1)
+        assert stage.dropped == 0  # First read never counts as a drop
+
+        for value in ("b", "c", "d"):
+            channel.publish(value)
+        value, seen = await channel.next(seen, stage=stage)
+        assert (value, seen) == ("d", 4)
+        assert stage.dropped == 2  # b and c were never read
+        assert channel.depth(seen) == 0
+
+    asyncio.run(run())
+
+
+def test_latest_value_timeout_returns_current_value():
+    async def run():
+        channel = LatestValue("market")
+        channel.publish(1)
+        value, seen = await channel.next(1, timeout=0.01)
+        assert (value, seen) == (1, 1)
+
+    asyncio.run(run())
+
+
+def test_latest_value_wakes_waiting_reader():
+    async def run():
+        channel = LatestValue("report")
+        reader = asyncio.create_task(channel.next(0))
+        await asyncio.sleep(0)
+        channel.publish("x")
+        assert await asyncio.wait_for(reader, 1) == ("x", 1)
+
+    asyncio.run(run())
+
+
+def test_stage_queue_overflow_keeps_every_item_in_order():
+    async def run():
+        handled = []
+        queue = StageQueue(Stage("fills"), handled.append, maxsize=2)
+        for item in range(1, 6):
+            queue.put(item)
+        # 3 found the queue full: backlog (1, 2) first, then 3 inline
+        assert handled == [1, 2, 3]
+        assert queue.overflows == 1
+        assert queue.depth == 2
+        queue.drain()
+        assert handled == [1, 2, 3, 4, 5]
+        assert queue.stage.count == 5
+
+    asyncio.run(run())
+
+
+def test_stage_queue_handler_error_is_counted_and_next_item_handled():
+    async def run():
+        handled = []
+
+        def handler(item):
+            if item == "bad":
+                raise ValueError(item)
+            handled.append(item)
+
+        queue = StageQueue(Stage("fills"), handler)
+        for item in ("a", "bad", "b"):
+            queue.put(item)
+        queue.drain()
+        assert handled == ["a", "b"]
+        assert queue.stage.errors == 1
+        assert queue.stage.count == 3
+
+    asyncio.run(run())
+
+
+def test_pipeline_consumer_and_stop_drain_in_order():
+    async def run():
+        handled = []
+        pipeline = Pipeline()
+        queue = pipeline.queue("fills", handled.append, maxsize=100)
+        queue.put(1)
+        queue.put(2)
+        await asyncio.sleep(0)  # Consumer task runs
+        queue.put(3)
+        queue.put(4)
+        await pipeline.stop()  # Cancels the consumer, queued items still handled
+        assert handled == [1, 2, 3, 4]
+        assert "fills" in pipeline.summary_line()
+
+    asyncio.run(run())
+
+
+def test_pipeline_failure_reports_crashed_stage():
+    async def run():
+        async def crash():
+            raise RuntimeError("ingest gave up")
+
+        pipeline = Pipeline()
+        pipeline.start("ingest", crash())
+        await asyncio.sleep(0)
+        name, error = pipeline.failure()
+        assert name == "ingest" and str(error) == "ingest gave up"
+        await pipeline.stop()
+
+    asyncio.run(run())
+
+
+def test_iteration_budget_is_frozen_after_finish():
+    budget = IterationBudget(0.0001)
+    while budget.remaining() > 0:
+        pass
+    elapsed_ms = budget.finish()
+    assert budget.elapsed() * 1000 == elapsed_ms
+    assert not budget.allow("dashboard")  # Judged on the decision's own time
+    assert budget.allow("cancel")
+
+    fast = IterationBudget(10.0)
+    fast.finish()
+    assert fast.allow("dashboard")  # Report delay after finish() does not count
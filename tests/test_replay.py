@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from replay import ReplayDivergence, ReplayExchange, VirtualClockLoop, REPO_DIR
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def _run(coro_fn, calls, tolerance=0.0):
+    loop = VirtualClockLoop()
+    try:
+        replay = ReplayExchange({}, calls, loop, tolerance)
+        return replay, loop.run_until_complete(coro_fn(replay, loop))
+    finally:
+        loop.close()
+
+
+def test_recorded_session_replays_to_expected_actions():
+    result = subprocess.run(
+        [sys.executable, os.path.join(REPO_DIR, "replay.py"), os.path.join(DATA_DIR, "session.jsonl.gz"),
+         "--check", os.path.join(DATA_DIR, "session.expected.jsonl")],
+        cwd=REPO_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "CHECK OK" in result.stdout
+    assert "DIVERGED" not in result.stdout
+
+
+def test_account_reads_follow_the_bots_own_actions():
+    order = {"side": "buy", "price": 100.0, "size": 1.0}
+    calls = [
+        {"t": 0.0, "m": "get_open_orders", "a": ["X"], "r": []},
+        {"t": 0.5, "m": "create_order", "k": {"side": "buy"}, "r": {"code": 0}},
+        {"t": 0.6, "m": "get_open_orders", "a": ["X"], "r": [order]},
+    ]
+
+    async def scenario(replay, loop):
+        loop.virtual_time = 2.0  # Later than the recorded order, but not placed yet
+        before = await replay.get_open_orders("X")
+        await replay.create_order(side="buy")
+        after = await replay.get_open_orders("X")
+        return before, after
+
+    replay, (before, after) = _run(scenario, calls)
+    assert before == []
+    assert after == [order]
+    assert replay.matched == 1
+
+
+def test_unrecorded_action_fails_loudly():
+    calls = [{"t": 0.0, "m": "create_order", "k": {"side": "buy"}, "r": {"code": 0}}]
+
+    async def scenario(replay, _loop):
+        await replay.create_order(side="buy")
+        await replay.create_order(side="buy")
+
+    with pytest.raises(ReplayDivergence, match="no further order actions"):
+        _run(scenario, calls)
+
+
+def test_action_far_from_recorded_time_is_a_divergence():
+    calls = [{"t": 5.0, "m": "cancel_orders", "k": {"symbol": "X"}, "r": []}]
+
+    async def scenario(replay, _loop):
+        await replay.cancel_orders(symbol="X")
+
+    with pytest.raises(ReplayDivergence, match="recording has cancel_orders at 5.000s"):
+        _run(scenario, calls, tolerance=1.0)
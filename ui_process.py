@@ -0,0 +1,340 @@
+"""
+UI Companion Process (split mode)
+=================================
+With SPLIT_UI the trading process only publishes plain data; a separate
+process (python ui_process.py, started by UIPublisher) owns everything
+expensive that doesn't affect orders:
+
+    trading process                         UI companion process
+    ---------------                         --------------------
+    dashboard state (deltas)   --pipe-->    rich Live dashboard
+    log_message / console.print             console_log.txt, terminal
+    file_logger records                     position_log.txt
+                                            status.txt snapshot
+
+The companion is a plain subprocess (like the deadman watchdog), so it
+never imports main.py or the exchange library. Messages are pickled onto
+its stdin by a writer thread; the trading side only does a non-blocking
+put into a bounded queue. If the companion falls behind:
+
+- dashboard state / console prints are dropped (counted), and the next
+  state publish is a full state again
+- log lines are never dropped: the trading process appends them to the
+  log file itself
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+from metrics import metrics
+
+# Message kinds
+MSG_STATE = "state"          # dashboard state delta
+MSG_LOG = "log"              # console_log.txt line
+MSG_POSITION_LOG = "plog"    # position_log.txt line
+MSG_PRINT = "print"          # console.print()
+MSG_STOP = "stop"
+
+_STOP = (MSG_STOP,)
+_MISSING = object()
+
+
+class UIPublisher:
+    """Trading-process side: push state deltas and log records to the companion"""
+
+    def __init__(self, maxsize: int = 1000):
+        self.maxsize = maxsize
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._process: Optional[subprocess.Popen] = None
+        self._writer: Optional[threading.Thread] = None
+        self._alive = False
+        self._log_files = {MSG_LOG: "console_log.txt", MSG_POSITION_LOG: "position_log.txt"}
+        self._last_state: Dict[str, Any] = {}
+        self.sent = 0
+        self.dropped = 0
+        self.local_logs = 0
+
+    def start(self, console_log_file: str = "console_log.txt", position_log_file: str = "position_log.txt",
+              snapshot_file: str = "status.txt", status_json_file: str = "", snapshot_interval: float = 60,
+              refresh_per_second: float = 10, headless: bool = False) -> None:
+        """Launch the companion process and the pipe writer thread"""
+        self._log_files = {MSG_LOG: console_log_file, MSG_POSITION_LOG: position_log_file}
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui_process.py")
+        args = [sys.executable, script, "--pid", str(os.getpid()),
+                "--console-log", console_log_file, "--position-log", position_log_file,
+                "--snapshot", snapshot_file, "--status-json", status_json_file,
+                "--snapshot-interval", str(snapshot_interval), "--refresh", str(refresh_per_second),
+                "--queue-size", str(self.maxsize)]
+        if headless:
+            args.append("--headless")
+        self._process = subprocess.Popen(args, stdin=subprocess.PIPE)
+        self._alive = True
+        self._writer = threading.Thread(target=self._pump, name="mm-ui-writer", daemon=True)
+        self._writer.start()
+
+    def _pump(self) -> None:
+        """Writer thread: pickle queued messages onto the companion's stdin"""
+        pipe = self._process.stdin
+        try:
+            while True:
+                msg = self._queue.get()
+                pickle.dump(msg, pipe, protocol=pickle.HIGHEST_PROTOCOL)
+                if msg is _STOP or self._queue.empty():
+                    pipe.flush()
+                if msg is _STOP:
+                    return
+        except (OSError, ValueError):
+            pass  # Companion gone (log lines fall back to local writes)
+        finally:
+            self._alive = False
+
+    def _send(self, msg: tuple) -> bool:
+        if not self._alive:
+            return False
+        try:
+            self._queue.put_nowait(msg)
+        except queue.Full:
+            return False
+        self.sent += 1
+        return True
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        metrics.inc("ui.dropped")
+
+    def publish_state(self, state: Dict[str, Any]) -> None:
+        """Send only the keys that changed since the last successful publish"""
+        delta = {k: v for k, v in state.items() if self._last_state.get(k, _MISSING) != v}
+        if not delta:
+            return
+        if self._send((MSG_STATE, delta)):
+            self._last_state.update(delta)
+        else:
+            self._drop()
+            self._last_state = {}  # Resync with a full state next time
+
+    def _log_record(self, kind: str, created: float, message: str) -> None:
+        if self._send((kind, created, message)):
+            return
+        # Queue full / companion gone: audit lines are written here instead of dropped
+        self.local_logs += 1
+        metrics.inc("ui.local_logs")
+        with open(self._log_files[kind], "a", encoding="utf-8") as f:
+            f.write(format_log_line(kind, created, message))
+
+    def log(self, message: str) -> None:
+        self._log_record(MSG_LOG, time.time(), message)
+
+    def position_log(self, created: float, message: str) -> None:
+        self._log_record(MSG_POSITION_LOG, created, message)
+
+    def print(self, text: str) -> None:
+        if not self._send((MSG_PRINT, text)):
+            self._drop()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush, stop and wait for the companion"""
+        if self._process is None:
+            return
+        if self._alive:
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+        if self._writer is not None:
+            self._writer.join(timeout)
+            if self._writer.is_alive():
+                self._process.terminate()  # Stuck companion: the broken pipe releases the writer
+                self._writer.join(timeout)
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._process.terminate()
+        self._alive = False
+        self._process = None
+
+
+class ProxyConsole:
+    """console.print() replacement forwarding text (markup intact) to the companion"""
+
+    def __init__(self, publisher: UIPublisher):
+        self.publisher = publisher
+
+    def print(self, *objects, **_kwargs) -> None:
+        self.publisher.print(" ".join(str(o) for o in objects))
+
+
+class PublisherLogHandler(logging.Handler):
+    """logging handler forwarding records to the companion's position log"""
+
+    def __init__(self, publisher: UIPublisher):
+        super().__init__()
+        self.publisher = publisher
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.publisher.position_log(record.created, record.getMessage())
+        except Exception:
+            self.handleError(record)
+
+
+def _timestamp(created: float) -> str:
+    return datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def format_log_line(kind: str, created: float, message: str) -> str:
+    """Line as written to console_log.txt (MSG_LOG) / position_log.txt (MSG_POSITION_LOG)"""
+    if kind == MSG_LOG:
+        return f"[{_timestamp(created)}] {message}\n"
+    return f"{_timestamp(created)} | {message}\n"
+
+
+def _read_messages(stream, msg_queue: queue.Queue) -> None:
+    """Reader thread: unpickle messages from stdin (EOF = trading process gone -> stop)"""
+    while True:
+        try:
+            msg = pickle.load(stream)
+        except Exception:
+            msg = _STOP
+        msg_queue.put(msg)
+        if msg[0] == MSG_STOP:
+            return
+
+
+def companion_main(
+    msg_queue: queue.Queue,
+    parent_pid: int,
+    console_log_file: str = "console_log.txt",
+    position_log_file: str = "position_log.txt",
+    snapshot_file: str = "status.txt",
+    status_json_file: str = "",
+    snapshot_interval: float = 60,
+    refresh_per_second: float = 10,
+    headless: bool = False,
+) -> None:
+    """UI process entry point: render latest state, write logs and snapshots"""
+    from dashboard import build_dashboard_from_state, write_snapshot, write_status_json
+
+    # Ctrl+C reaches the whole process group: keep running until the trading
+    # process has cancelled its orders and sent stop (or died)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if headless:
+        from plain_console import PlainConsole, NullLive
+        console = PlainConsole()
+        live_ctx = NullLive()
+    else:
+        from rich.console import Console
+        from rich.live import Live
+        console = Console()
+        live_ctx = Live(console=console, refresh_per_second=refresh_per_second, transient=True)
+
+    render_interval = 1.0 / refresh_per_second if refresh_per_second > 0 else 0.1
+    state: Dict[str, Any] = {}
+    dirty = False
+    last_render = 0.0
+    last_snapshot = 0.0
+
+    console_log = open(console_log_file, "a", encoding="utf-8")
+    position_log = open(position_log_file, "a", encoding="utf-8")
+    try:
+        with live_ctx as live:
+            while True:
+                try:
+                    msg = msg_queue.get(timeout=render_interval)
+                except queue.Empty:
+                    msg = None
+                    if not _pid_alive(parent_pid):
+                        break  # Trading process died without sending stop
+
+                if msg is not None:
+                    kind = msg[0]
+                    if kind == MSG_STOP:
+                        break
+                    if kind == MSG_STATE:
+                        state.update(msg[1])
+                        dirty = True
+                    elif kind == MSG_LOG:
+                        console_log.write(format_log_line(kind, msg[1], msg[2]))
+                        console_log.flush()
+                    elif kind == MSG_POSITION_LOG:
+                        position_log.write(format_log_line(kind, msg[1], msg[2]))
+                        position_log.flush()
+                    elif kind == MSG_PRINT:
+                        console.print(msg[1])
+
+                # Render only the latest state, at most refresh_per_second
+                now = time.monotonic()
+                if dirty and "orders" in state and now - last_render >= render_interval:
+                    dirty = False
+                    last_render = now
+                    if not headless:
+                        live.update(build_dashboard_from_state(state))
+                    if snapshot_interval > 0 and now - last_snapshot >= snapshot_interval:
+                        last_snapshot = now
+                        try:
+                            write_snapshot(snapshot_file, state)
+                            if status_json_file:
+                                write_status_json(status_json_file, state)
+                        except Exception:
+                            pass  # Ignore snapshot failures
+    finally:
+        console_log.close()
+        position_log.close()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # Exists, other owner
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="UI companion process (started by main.py with SPLIT_UI)")
+    parser.add_argument("--pid", type=int, required=True, help="Trading process pid")
+    parser.add_argument("--console-log", default="console_log.txt")
+    parser.add_argument("--position-log", default="position_log.txt")
+    parser.add_argument("--snapshot", default="status.txt")
+    parser.add_argument("--status-json", default="")
+    parser.add_argument("--snapshot-interval", type=float, default=60)
+    parser.add_argument("--refresh", type=float, default=10, help="Dashboard refreshes per second")
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+
+    # Bounded: a slow companion fills the pipe, and the trading side starts dropping state
+    msg_queue: queue.Queue = queue.Queue(maxsize=max(1, args.queue_size))
+    threading.Thread(target=_read_messages, args=(sys.stdin.buffer, msg_queue),
+                     name="ui-reader", daemon=True).start()
+    companion_main(
+        msg_queue, args.pid,
+        console_log_file=args.console_log,
+        position_log_file=args.position_log,
+        snapshot_file=args.snapshot,
+        status_json_file=args.status_json,
+        snapshot_interval=args.snapshot_interval,
+        refresh_per_second=args.refresh,
+        headless=args.headless,
+    )
+
+
+if __name__ == "__main__":
+    main()